@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Header, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Literal
 import os
 import sys
 import json
@@ -10,13 +11,24 @@ import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importar la clase Simulation desde el proyecto original
-from src.simulation import Simulation
+from src.simulation import Simulation, MAX_ADDED_PRACTICANTES
+from src.api_state import state_response, advance_params, advance, add_practicantes, STREAM_HEADERS
+from src.session_api import router as sessions_router, registry
+from contextlib import asynccontextmanager
+from src.stream import StateBroadcaster
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Detener las ejecuciones automáticas de las sesiones al cerrar el servidor"""
+    yield
+    registry.close_all()
 
 # Crear la instancia de FastAPI
 app = FastAPI(
     title="Zombie Building Simulation API",
     description="API para la Simulación de Edificio con Zombies",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -28,14 +40,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Rutas para simulaciones independientes por sesión
+app.include_router(sessions_router)
+
 # Crear una instancia global de Simulation para ser compartida entre solicitudes
 simulation = Simulation()
 
+# Difusión del estado a los clientes suscritos al flujo de eventos
+broadcaster = StateBroadcaster(simulation)
+
 # Modelos Pydantic para validar solicitudes
 class BuildingConfig(BaseModel):
     floors: int = Field(3, ge=1, description="Número de pisos")
     roomsPerFloor: int = Field(5, ge=1, description="Habitaciones por piso")
     initialZombies: int = Field(1, ge=0, description="Zombies iniciales")
+    backend: Literal["objects", "compact"] = Field("objects", description="Almacenamiento del edificio: 'objects' o 'compact' para edificios muy grandes")
+    seed: Optional[int] = Field(None, ge=0, description="Semilla para una simulación reproducible")
 
 class RoomAction(BaseModel):
     floor: int = Field(..., ge=0, description="Índice del piso")
@@ -46,54 +66,25 @@ class AutoRunConfig(BaseModel):
 
 # Rutas de la API
 @app.get("/api/simulation/state", response_model=Dict[str, Any])
-async def get_simulation_state():
-    """Obtener el estado actual de la simulación"""
+async def get_simulation_state(since: Optional[str] = Query(None, description="Solo las habitaciones modificadas después de esta versión (<state_id>-<versión>, el valor del ETag)"),
+                               if_none_match: Optional[str] = Header(None)):
+    """Obtener el estado actual de la simulación (admite ETag/If-None-Match y since=<state_id>-<versión>)"""
     if not simulation.building:
         raise HTTPException(status_code=404, detail="No hay edificio configurado")
     
-    state = simulation.get_building_state()
-    
-    # Agregar información adicional para el frontend
-    state['game_over'] = simulation.is_game_over()
-    state['game_over_reason'] = simulation.game_over_reason
-    state['zombie_generation_enabled'] = simulation.zombie_generation_enabled
-    
-    # Agregar información del practicante si existe
-    if simulation.practicante:
-        state['practicante'] = {
-            'floor': simulation.practicante.floor_number,
-            'room': simulation.practicante.room_number
-        }
-    else:
-        state['practicante'] = None
-    
-    # Agregar estructura del edificio
-    building_data = []
-    for floor_idx, floor in enumerate(simulation.building.floors):
-        floor_data = []
-        for room_idx, room in enumerate(floor.get_rooms()):
-            room_data = {
-                'floor': floor_idx,
-                'room': room.room_number,
-                'has_zombies': room.has_zombies,
-                'is_staircase': hasattr(room, 'connected_floors'),
-            }
-            
-            # Agregar datos del sensor para habitaciones regulares
-            if not room_data['is_staircase']:
-                room_data['sensor_alert'] = room.sensor.is_alert()
-            
-            floor_data.append(room_data)
-        building_data.append(floor_data)
-    
-    state['building'] = building_data
-    
-    return state
+    return state_response(simulation, if_none_match, since)
+
+@app.get("/api/simulation/stream")
+async def stream_simulation_state():
+    """Recibir el estado de la simulación como Server-Sent Events: una instantánea y después los cambios"""
+    return StreamingResponse(broadcaster.stream(), media_type="text/event-stream", headers=STREAM_HEADERS)
 
 @app.post("/api/simulation/setup", response_model=Dict[str, Any])
 async def setup_simulation(config: BuildingConfig):
     """Configurar un nuevo edificio para la simulación"""
-    result = simulation.setup_building(config.floors, config.roomsPerFloor)
+    if config.seed is not None:
+        simulation.set_seed(config.seed)
+    result = simulation.setup_building(config.floors, config.roomsPerFloor, config.backend)
     zombies_added = simulation.add_initial_zombies(config.initialZombies)
     
     return {
@@ -103,13 +94,12 @@ async def setup_simulation(config: BuildingConfig):
     }
 
 @app.post("/api/simulation/advance", response_model=Dict[str, Any])
-async def advance_simulation():
-    """Avanzar la simulación un turno"""
+async def advance_simulation(params: Dict[str, Any] = Depends(advance_params)):
+    """Avanzar la simulación un turno, o varios turnos devolviendo un resumen agregado"""
     if not simulation.building:
         raise HTTPException(status_code=404, detail="No hay edificio configurado")
     
-    result = simulation.advance_turn()
-    return result
+    return advance(simulation, params)
 
 @app.post("/api/simulation/add-zombie", response_model=Dict[str, Any])
 async def add_zombie():
@@ -121,12 +111,12 @@ async def add_zombie():
     return result
 
 @app.post("/api/simulation/add-practicante", response_model=Dict[str, Any])
-async def add_practicante():
-    """Agregar un practicante en una habitación sin zombies"""
+async def add_practicante(count: int = Query(1, ge=1, le=MAX_ADDED_PRACTICANTES, description="Número de practicantes a agregar")):
+    """Agregar practicantes en habitaciones sin zombies"""
     if not simulation.building:
         raise HTTPException(status_code=404, detail="No hay edificio configurado")
     
-    result = simulation.add_practicante()
+    result = add_practicantes(simulation, count)
     return result
 
 @app.post("/api/simulation/clean-room", response_model=Dict[str, Any])
@@ -167,4 +157,5 @@ async def reset_simulation():
     """Reiniciar la simulación"""
     global simulation
     simulation = Simulation()
+    broadcaster.attach(simulation)
     return {"success": True} 
\ No newline at end of file
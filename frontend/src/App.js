@@ -19,7 +19,7 @@ import BuildingVisualization from './components/BuildingVisualization';
 import ControlPanel from './components/ControlPanel';
 import StatsPanel from './components/StatsPanel';
 import ConfigPanel from './components/ConfigPanel';
-import { fetchSimulationState, setupBuilding, advanceSimulation, addZombie, addPracticante, cleanRoom, resetSensor, toggleZombieGeneration, triggerSecretWeapon, autoRun, resetSimulation } from './api/simulationApi';
+import { fetchSimulationState, setupBuilding, advanceSimulation, addZombie, addPracticante, cleanRoom, resetSensor, toggleZombieGeneration, triggerSecretWeapon, autoRun, resetSimulation, subscribeToSimulationState, applyStateDiff } from './api/simulationApi';
 
 // Create a theme
 const theme = createTheme({
@@ -51,19 +51,14 @@ function App() {
     loadSimulationState();
   }, []);
 
-  // Auto refresh when auto-running
+  // Live updates pushed by the server (snapshot first, then only the changes)
   useEffect(() => {
-    let interval;
-    if (autoRunning) {
-      interval = setInterval(() => {
-        loadSimulationState();
-      }, 1000);
-    }
-
-    return () => {
-      if (interval) clearInterval(interval);
-    };
-  }, [autoRunning]);
+    const unsubscribe = subscribeToSimulationState(
+      (snapshot) => setSimulationState(snapshot),
+      (diff) => setSimulationState((state) => applyStateDiff(state, diff))
+    );
+    return unsubscribe;
+  }, []);
 
   const loadSimulationState = async () => {
     try {
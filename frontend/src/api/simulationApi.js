@@ -133,6 +133,42 @@ export const resetSimulation = async () => {
     }
 };
 
+// Subscribe to the server-sent state stream: a full snapshot first, then per-change diffs.
+// Returns a function that closes the stream.
+export const subscribeToSimulationState = (onSnapshot, onDiff, onError) => {
+    const source = new EventSource(`${API_BASE_URL}/simulation/stream`);
+    source.addEventListener('snapshot', (event) => onSnapshot(JSON.parse(event.data)));
+    source.addEventListener('diff', (event) => onDiff(JSON.parse(event.data)));
+    if (onError) {
+        source.onerror = onError;
+    }
+    return () => source.close();
+};
+
+// Apply a diff from the state stream to a full simulation state
+export const applyStateDiff = (state, diff) => {
+    if (!state) return state;
+    const building = state.building.slice();
+    diff.rooms.forEach((room) => {
+        if (building[room.floor] === state.building[room.floor]) {
+            building[room.floor] = building[room.floor].slice();
+        }
+        building[room.floor][room.room] = room;
+    });
+    return {
+        ...state,
+        turn: diff.turn,
+        infested_rooms: diff.infested_rooms,
+        alerting_sensors: diff.alerting_sensors,
+        game_over: diff.game_over,
+        game_over_reason: diff.game_over_reason,
+        zombie_generation_enabled: diff.zombie_generation_enabled,
+        practicante: diff.practicante,
+        occupants: diff.occupants,
+        building
+    };
+};
+
 // Helper function to handle API errors
 const handleApiError = (error) => {
     if (error.response) {
@@ -98,6 +98,11 @@ const BuildingVisualization = ({ data, onRoomClick, selectedRoom }) => {
   // Reversing to display the highest floor at the top
   const floors = [...data.building].reverse();
 
+  // Rooms with at least one practicante, from the aggregated occupancy
+  const occupiedRooms = new Set(
+    (data.occupants ? data.occupants.rooms : []).map(([floor, room]) => `${floor}-${room}`)
+  );
+
   return (
     <Box sx={{ py: 2 }}>
       {floors.map((floor, floorIndex) => {
@@ -117,9 +122,7 @@ const BuildingVisualization = ({ data, onRoomClick, selectedRoom }) => {
                   selectedRoom.floor === room.floor && 
                   selectedRoom.room === room.room;
                 
-                const hasPracticante = data.practicante && 
-                  data.practicante.floor === room.floor && 
-                  data.practicante.room === room.room;
+                const hasPracticante = occupiedRooms.has(`${room.floor}-${room.room}`);
                 
                 // Formateamos el número de habitación según el nuevo formato
                 const formattedRoomNumber = formatRoomNumber(room.floor, room.room);
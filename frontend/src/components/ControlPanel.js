@@ -43,9 +43,6 @@ const ControlPanel = ({
   // Check if the game is over
   const isGameOver = simulationState && simulationState.game_over;
   
-  // Check if we have a practicante already
-  const hasPracticante = simulationState && simulationState.practicante !== null;
-  
   // Formatear la habitación seleccionada si existe
   const formattedSelectedRoom = selectedRoom 
     ? formatRoomNumber(selectedRoom.floor, selectedRoom.room)
@@ -125,7 +122,7 @@ const ControlPanel = ({
             color="primary"
             startIcon={<PersonAddIcon />}
             onClick={onAddPracticante}
-            disabled={loading || isGameOver || !simulationState || hasPracticante}
+            disabled={loading || isGameOver || !simulationState}
             fullWidth
           >
             Agregar Practicante
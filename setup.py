@@ -29,6 +29,8 @@ setup(
     entry_points={
         "console_scripts": [
             "zombie-sim=src.run:main",
+            "zombie-batch=src.batch:main",
+            "zombie-benchmark=src.benchmark:main",
         ],
     },
 ) 
\ No newline at end of file
@@ -1,23 +1,61 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any, Union
-from src.simulation import Simulation
+from typing import Dict, List, Optional, Any, Union, Literal
+from src.simulation import Simulation, MAX_ADVANCE_TURNS, MAX_ADDED_PRACTICANTES
+from src.api_state import (state_response, advance_params, advance_in_threadpool, run_locked, STREAM_HEADERS,
+                           require_admin, profile_params, profile_response, add_practicantes,
+                           layout_params, read_uploaded_layout, setup_from_layout)
+from src.session_api import router as sessions_router, registry
+from src.stream import StateBroadcaster
+from src.scheduler import AutoRunner
+from src.api_metrics import MetricsMiddleware, router as metrics_router
+from src import metrics
+from contextlib import asynccontextmanager
 import threading
-import time
 import logging
+import os
 import uvicorn
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Optional snapshot file: the simulation is restored from it on startup and saved to it on shutdown
+SNAPSHOT_PATH = os.environ.get("ZOMBIE_SNAPSHOT_PATH")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Restore the snapshot on startup; stop the schedulers and save the snapshot on shutdown"""
+    global simulation
+    if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH):
+        try:
+            simulation = Simulation.load_snapshot(SNAPSHOT_PATH)
+            broadcaster.attach(simulation)
+            logger.info("Simulation restored from %s at turn %s", SNAPSHOT_PATH, simulation.turn)
+        except (OSError, ValueError) as e:
+            logger.error("Could not restore snapshot %s: %s", SNAPSHOT_PATH, e)
+    yield
+    await runner.stop()
+    registry.close_all()
+    if SNAPSHOT_PATH:
+        with simulation_lock:
+            if simulation.building:
+                simulation.save_snapshot(SNAPSHOT_PATH)
+
 app = FastAPI(
     title="Zombie Building Simulation API",
     description="API for controlling and visualizing a zombie-infested building simulation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Per-phase turn timers and API metrics, served from /metrics (disable with ZOMBIE_METRICS=0)
+metrics.set_enabled(os.environ.get("ZOMBIE_METRICS", "1") != "0")
+app.add_middleware(MetricsMiddleware)
+app.include_router(metrics_router)
+
 # Enable CORS
 app.add_middleware(
     CORSMiddleware,
@@ -27,17 +65,23 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Endpoints for independent per-session simulations
+app.include_router(sessions_router)
+
 # Global simulation instance
 simulation = Simulation()
-simulation_lock = threading.Lock()
-simulation_running = False
-simulation_thread = None
+simulation_lock = metrics.TimedLock("global")
+broadcaster = StateBroadcaster(simulation)
+# Auto-run scheduler; it looks up the global simulation on every tick so it survives resets
+runner = AutoRunner(lambda: simulation, simulation_lock)
 
 # Pydantic models for request and response validation
 class BuildingConfig(BaseModel):
     floors: int = Field(3, ge=1, description="Number of floors in the building")
     roomsPerFloor: int = Field(5, ge=1, description="Number of rooms per floor")
     initialZombies: int = Field(1, ge=0, description="Initial number of zombies")
+    backend: Literal["objects", "compact"] = Field("objects", description="Building storage backend: 'objects' or 'compact' for very large buildings")
+    seed: Optional[int] = Field(None, ge=0, description="Random seed for a reproducible simulation")
 
 class RoomAction(BaseModel):
     floor: int = Field(..., ge=0, description="Floor index")
@@ -45,72 +89,42 @@ class RoomAction(BaseModel):
 
 class AutoRunConfig(BaseModel):
     run: bool = Field(False, description="Whether to enable auto-running")
+    ticksPerSecond: float = Field(1.0, gt=0, le=1000, description="Turns per second when not fast-forwarding")
+    fastForward: bool = Field(False, description="Advance as fast as possible instead of at a fixed rate")
+    turns: Optional[int] = Field(None, ge=1, description="Stop after this many turns (default: until game over or stopped)")
 
-# Background task for auto-running the simulation
-def run_simulation_task():
-    """Background task function to advance simulation automatically"""
-    global simulation_running
-    while simulation_running:
-        with simulation_lock:
-            if simulation.building and not simulation.is_game_over():
-                simulation.advance_turn()
-        time.sleep(1)  # Wait for 1 second between turns
+class ProfileConfig(BaseModel):
+    turns: Optional[int] = Field(None, ge=1, le=MAX_ADVANCE_TURNS, description="Profile the next N turns")
+    seconds: Optional[float] = Field(None, gt=0, le=3600, description="Profile the turns of the next T seconds")
 
 def get_simulation_lock():
     """Dependency to provide the simulation lock"""
     return simulation_lock
 
 @app.get("/api/simulation/state", response_model=Dict[str, Any], tags=["Simulation"])
-async def get_simulation_state(lock: threading.Lock = Depends(get_simulation_lock)):
-    """Get the current state of the simulation"""
+def get_simulation_state(since: Optional[str] = Query(None, description="Only return rooms changed after this state version (<state_id>-<version>, the ETag value)"),
+                         if_none_match: Optional[str] = Header(None),
+                         lock: threading.Lock = Depends(get_simulation_lock)):
+    """Get the current state of the simulation (supports ETag/If-None-Match and since=<state_id>-<version>)"""
     with lock:
         if not simulation.building:
             raise HTTPException(status_code=404, detail="No building configured")
         
-        state = simulation.get_building_state()
-        
-        # Add additional information for the front-end
-        state['game_over'] = simulation.is_game_over()
-        state['game_over_reason'] = simulation.game_over_reason
-        state['zombie_generation_enabled'] = simulation.zombie_generation_enabled
-        
-        # Add practicante information if exists
-        if simulation.practicante:
-            state['practicante'] = {
-                'floor': simulation.practicante.floor_number,
-                'room': simulation.practicante.room_number
-            }
-        else:
-            state['practicante'] = None
-        
-        # Add building structure
-        building_data = []
-        for floor_idx, floor in enumerate(simulation.building.floors):
-            floor_data = []
-            for room_idx, room in enumerate(floor.get_rooms()):
-                room_data = {
-                    'floor': floor_idx,
-                    'room': room.room_number,
-                    'has_zombies': room.has_zombies,
-                    'is_staircase': hasattr(room, 'connected_floors'),
-                }
-                
-                # Add sensor data for regular rooms
-                if not room_data['is_staircase']:
-                    room_data['sensor_alert'] = room.sensor.is_alert()
-                
-                floor_data.append(room_data)
-            building_data.append(floor_data)
-        
-        state['building'] = building_data
-        
-        return state
+        return state_response(simulation, if_none_match, since)
+
+@app.get("/api/simulation/stream", tags=["Simulation"])
+async def stream_simulation_state():
+    """Stream the simulation state as Server-Sent Events: a snapshot followed by per-change diffs"""
+    return StreamingResponse(broadcaster.stream(simulation_lock), media_type="text/event-stream",
+                             headers=STREAM_HEADERS)
 
 @app.post("/api/simulation/setup", response_model=Dict[str, Any], tags=["Simulation"])
-async def setup_simulation(config: BuildingConfig, lock: threading.Lock = Depends(get_simulation_lock)):
+def setup_simulation(config: BuildingConfig, lock: threading.Lock = Depends(get_simulation_lock)):
     """Setup a new building for the simulation"""
     with lock:
-        result = simulation.setup_building(config.floors, config.roomsPerFloor)
+        if config.seed is not None:
+            simulation.set_seed(config.seed)
+        result = simulation.setup_building(config.floors, config.roomsPerFloor, config.backend)
         zombies_added = simulation.add_initial_zombies(config.initialZombies)
         
         return {
@@ -119,18 +133,22 @@ async def setup_simulation(config: BuildingConfig, lock: threading.Lock = Depend
             "zombies_added": zombies_added
         }
 
+@app.post("/api/simulation/setup-layout", response_model=Dict[str, Any], tags=["Simulation"])
+async def setup_simulation_from_layout(file: UploadFile = File(..., description="Building layout as JSON Lines or CSV"),
+                                       params: Dict[str, Any] = Depends(layout_params),
+                                       lock: threading.Lock = Depends(get_simulation_lock)):
+    """Setup a new building from an uploaded layout file (rooms, edges, staircases and elevators)"""
+    layout = await read_uploaded_layout(file, params)
+    return await run_locked(lock, lambda: setup_from_layout(simulation, layout, params))
+
 @app.post("/api/simulation/advance", response_model=Dict[str, Any], tags=["Simulation"])
-async def advance_simulation(lock: threading.Lock = Depends(get_simulation_lock)):
-    """Advance the simulation by one turn"""
-    with lock:
-        if not simulation.building:
-            raise HTTPException(status_code=404, detail="No building configured")
-        
-        result = simulation.advance_turn()
-        return result
+async def advance_simulation(params: Dict[str, Any] = Depends(advance_params),
+                             lock: threading.Lock = Depends(get_simulation_lock)):
+    """Advance the simulation by one turn, or by several turns returning an aggregated summary"""
+    return await advance_in_threadpool(lambda: simulation, lock, params)
 
 @app.post("/api/simulation/add-zombie", response_model=Dict[str, Any], tags=["Zombies"])
-async def add_zombie(lock: threading.Lock = Depends(get_simulation_lock)):
+def add_zombie(lock: threading.Lock = Depends(get_simulation_lock)):
     """Add a zombie to a random room"""
     with lock:
         if not simulation.building:
@@ -140,17 +158,18 @@ async def add_zombie(lock: threading.Lock = Depends(get_simulation_lock)):
         return result
 
 @app.post("/api/simulation/add-practicante", response_model=Dict[str, Any], tags=["Practicante"])
-async def add_practicante(lock: threading.Lock = Depends(get_simulation_lock)):
-    """Add a practicante to a random room without zombies"""
+def add_practicante(count: int = Query(1, ge=1, le=MAX_ADDED_PRACTICANTES, description="Number of practicantes to add"),
+                    lock: threading.Lock = Depends(get_simulation_lock)):
+    """Add practicantes to random rooms without zombies"""
     with lock:
         if not simulation.building:
             raise HTTPException(status_code=404, detail="No building configured")
         
-        result = simulation.add_practicante()
+        result = add_practicantes(simulation, count)
         return result
 
 @app.post("/api/simulation/clean-room", response_model=Dict[str, Any], tags=["Rooms"])
-async def clean_room(room_data: RoomAction, lock: threading.Lock = Depends(get_simulation_lock)):
+def clean_room(room_data: RoomAction, lock: threading.Lock = Depends(get_simulation_lock)):
     """Clean a room (remove zombies)"""
     with lock:
         if not simulation.building:
@@ -160,7 +179,7 @@ async def clean_room(room_data: RoomAction, lock: threading.Lock = Depends(get_s
         return result
 
 @app.post("/api/simulation/reset-sensor", response_model=Dict[str, Any], tags=["Rooms"])
-async def reset_sensor(room_data: RoomAction, lock: threading.Lock = Depends(get_simulation_lock)):
+def reset_sensor(room_data: RoomAction, lock: threading.Lock = Depends(get_simulation_lock)):
     """Reset a sensor in a room"""
     with lock:
         if not simulation.building:
@@ -170,14 +189,14 @@ async def reset_sensor(room_data: RoomAction, lock: threading.Lock = Depends(get
         return result
 
 @app.post("/api/simulation/toggle-zombie-generation", response_model=Dict[str, Any], tags=["Zombies"])
-async def toggle_zombie_generation(lock: threading.Lock = Depends(get_simulation_lock)):
+def toggle_zombie_generation(lock: threading.Lock = Depends(get_simulation_lock)):
     """Toggle automatic zombie generation"""
     with lock:
         enabled = simulation.toggle_zombie_generation()
         return {"zombie_generation_enabled": enabled}
 
 @app.post("/api/simulation/use-secret-weapon", response_model=Dict[str, Any], tags=["Weapons"])
-async def use_secret_weapon(lock: threading.Lock = Depends(get_simulation_lock)):
+def use_secret_weapon(lock: threading.Lock = Depends(get_simulation_lock)):
     """Use the secret weapon to clean multiple rooms"""
     with lock:
         if not simulation.building:
@@ -186,37 +205,58 @@ async def use_secret_weapon(lock: threading.Lock = Depends(get_simulation_lock))
         cleaned_count = simulation.use_secret_weapon()
         return {"cleaned_count": cleaned_count}
 
-@app.post("/api/simulation/auto-run", response_model=Dict[str, bool], tags=["Simulation"])
-async def toggle_auto_run(config: AutoRunConfig, background_tasks: BackgroundTasks, lock: threading.Lock = Depends(get_simulation_lock)):
-    """Toggle automatic simulation running"""
-    global simulation_running, simulation_thread
-    
+@app.post("/api/simulation/auto-run", response_model=Dict[str, Any], tags=["Simulation"])
+async def toggle_auto_run(config: AutoRunConfig):
+    """Start (or reconfigure) or stop automatic simulation running"""
+    if config.run:
+        await runner.start(config.ticksPerSecond, config.turns, config.fastForward)
+    else:
+        await runner.stop()
+    return runner.status()
+
+@app.get("/api/simulation/auto-run", response_model=Dict[str, Any], tags=["Simulation"])
+async def get_auto_run_status():
+    """Get the status of automatic simulation running"""
+    return runner.status()
+
+@app.post("/api/simulation/profile", response_model=Dict[str, Any], tags=["Admin"],
+          dependencies=[Depends(require_admin)])
+def start_profiling(config: ProfileConfig, lock: threading.Lock = Depends(get_simulation_lock)):
+    """Arm a cProfile profiler for the next N turns or the turns of the next T seconds"""
     with lock:
-        should_run = config.run
-        
-        if should_run and not simulation_running:
-            # Start auto-running
-            simulation_running = True
-            background_tasks.add_task(run_simulation_task)
-            return {"auto_running": True}
-        elif not should_run and simulation_running:
-            # Stop auto-running
-            simulation_running = False
-            return {"auto_running": False}
-        
-        # Return current state
-        return {"auto_running": simulation_running}
+        try:
+            return simulation.start_profiling(config.turns, config.seconds)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/simulation/profile", tags=["Admin"], dependencies=[Depends(require_admin)])
+def get_profile(params: Dict[str, Any] = Depends(profile_params),
+                lock: threading.Lock = Depends(get_simulation_lock)):
+    """Get the profiler status and stats sorted by cumulative time, or download them as pstats or collapsed stacks"""
+    with lock:
+        return profile_response(simulation, params)
+
+@app.delete("/api/simulation/profile", response_model=Dict[str, bool], tags=["Admin"],
+            dependencies=[Depends(require_admin)])
+def stop_profiling(lock: threading.Lock = Depends(get_simulation_lock)):
+    """Disarm the profiler and discard its stats"""
+    with lock:
+        return {"success": simulation.stop_profiling() is not None}
 
 @app.post("/api/simulation/reset", response_model=Dict[str, bool], tags=["Simulation"])
 async def reset_simulation(lock: threading.Lock = Depends(get_simulation_lock)):
     """Reset the simulation"""
-    global simulation
-    
-    with lock:
+    await runner.stop()
+
+    def replace_simulation():
+        global simulation
         # Create a new simulation instance
         simulation = Simulation()
+        broadcaster.attach(simulation)
         return {"success": True}
 
+    return await run_locked(lock, replace_simulation)
+
 # Swagger UI will be available at /docs
 # ReDoc will be available at /redoc
 
@@ -0,0 +1,42 @@
+import time
+from fastapi import APIRouter, Response
+from src import metrics
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that counts API requests and times them per route template.
+
+    The duration is measured until the response starts, so long-lived
+    responses such as the Server-Sent Events streams are not counted as slow.
+    Requests that match no route share the "unmatched" label to keep the
+    number of series bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.is_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                route = scope.get("route")
+                route_path = getattr(route, "path", "unmatched")
+                metrics.API_REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route_path)
+                metrics.API_REQUESTS.inc(scope["method"], route_path, str(message["status"]))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Serve the collected metrics in the Prometheus text format"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,166 @@
+from fastapi import Response, Query, Header, HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from typing import Callable, Optional, Dict, Any, Literal
+from src.simulation import MAX_ADVANCE_TURNS
+from src.state import simulation_state, simulation_changes, state_etag, etag_matches
+from src.metrics import STATE_SERIALIZATION_SECONDS
+from src.layout_import import read_layout, layout_format
+from src.models.layout import BuildingLayout, LayoutError
+import hmac
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Disable caching and proxy buffering so that events reach the client immediately
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Optional token required by the admin endpoints (profiling) in the X-Admin-Token header
+ADMIN_TOKEN = os.environ.get("ZOMBIE_ADMIN_TOKEN")
+
+def state_response(simulation, if_none_match: Optional[str] = None, since: Optional[str] = None) -> Response:
+    """
+    Build the response of a state endpoint, shared by every API module.
+
+    Returns 304 Not Modified when the client's ETag matches the current state
+    version, only the rooms changed after `since` (`<state_id>-<version>`) when
+    it belongs to this simulation, and the full state otherwise. The caller must hold the simulation lock.
+    """
+    etag = state_etag(simulation)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if since is not None:
+        with STATE_SERIALIZATION_SECONDS.time("since"):
+            return JSONResponse(simulation_changes(simulation, since), headers=headers)
+    with STATE_SERIALIZATION_SECONDS.time("full"):
+        return JSONResponse(simulation_state(simulation), headers=headers)
+
+def advance_params(turns: Optional[int] = Query(None, ge=1, le=MAX_ADVANCE_TURNS, description="Number of turns to advance"),
+                   untilGameOver: bool = Query(False, description="Advance until the game is over"),
+                   maxTurns: int = Query(MAX_ADVANCE_TURNS, ge=1, le=MAX_ADVANCE_TURNS, description="Turn cap when advancing until game over"),
+                   series: bool = Query(False, description="Include a compact per-turn series in the summary")) -> Dict[str, Any]:
+    """Dependency with the query parameters of the advance endpoints"""
+    return {"turns": turns, "until_game_over": untilGameOver, "max_turns": maxTurns, "series": series}
+
+def advance(simulation, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Advance a simulation according to the advance_params query parameters.
+
+    Without parameters a single turn is advanced and the per-turn result is
+    returned, as before; with `turns` or `untilGameOver` all the turns run in
+    one call and an aggregated summary is returned. The caller must hold the
+    simulation lock.
+    """
+    if params["turns"] is None and not params["until_game_over"]:
+        return simulation.advance_turn()
+    return simulation.advance_turns(params["turns"] or 1, params["until_game_over"],
+                                    params["max_turns"], params["series"])
+
+async def run_locked(lock, function: Callable[[], Any]) -> Any:
+    """
+    Call `function` in a worker thread while holding the simulation lock.
+
+    The simulation locks are threading locks that a worker thread may hold for
+    a long time (a multi-turn advance, a large setup), so async endpoints must
+    never take them on the event loop; plain `def` endpoints already run in
+    the threadpool, and async ones that await something go through this helper.
+    """
+    def run() -> Any:
+        with lock:
+            return function()
+
+    return await run_in_threadpool(run)
+
+async def advance_in_threadpool(get_simulation, lock, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run advance() in a worker thread while holding the simulation lock, so that
+    a long multi-turn advance does not block the event loop (SSE streams,
+    /metrics and the other sessions keep being served). `get_simulation` is
+    called under the lock, so a simulation replaced by a reset is never advanced.
+    """
+    def run() -> Dict[str, Any]:
+        simulation = get_simulation()
+        if not simulation.building:
+            raise HTTPException(status_code=404, detail="No building configured")
+        return advance(simulation, params)
+
+    return await run_locked(lock, run)
+
+def add_practicantes(simulation, count: int = 1) -> Dict[str, Any]:
+    """
+    Add `count` practicantes to a simulation. A single practicante keeps the
+    per-person response with its room; larger batches return aggregated counts.
+    The caller must hold the simulation lock.
+    """
+    if count == 1:
+        return simulation.add_practicante()
+    return simulation.add_practicantes(count)
+
+def layout_params(format: Optional[Literal["jsonl", "csv"]] = Query(None, description="Layout file format (default: from the file extension or its content)"),
+                  floors: Optional[int] = Query(None, ge=1, description="Number of floors (default: the highest floor in the file + 1)"),
+                  roomsPerFloor: Optional[int] = Query(None, ge=0, description="Rooms per floor (default: the highest room number in the file)"),
+                  initialZombies: int = Query(1, ge=0, description="Initial number of zombies"),
+                  backend: Literal["objects", "compact"] = Query("objects", description="Building storage backend: 'objects' or 'compact' for very large buildings"),
+                  seed: Optional[int] = Query(None, ge=0, description="Random seed for a reproducible simulation")) -> Dict[str, Any]:
+    """Dependency with the query parameters of the layout upload endpoints"""
+    return {"format": format, "floors": floors, "rooms_per_floor": roomsPerFloor,
+            "initial_zombies": initialZombies, "backend": backend, "seed": seed}
+
+async def read_uploaded_layout(upload: UploadFile, params: Dict[str, Any]) -> BuildingLayout:
+    """
+    Parse an uploaded layout file in a worker thread, without holding any
+    simulation lock, so that large floor plans do not block the event loop.
+    Invalid layouts are reported as 400 Bad Request.
+    """
+    def progress(status: Dict[str, int]) -> None:
+        logger.info("Layout %s: %s records, %s/%s bytes", upload.filename, status["records"],
+                    status["bytes"], status["total_bytes"])
+
+    try:
+        return await run_in_threadpool(read_layout, upload.file, params["format"] or layout_format(upload.filename),
+                                       params["floors"], params["rooms_per_floor"], progress)
+    except LayoutError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def setup_from_layout(simulation, layout: BuildingLayout, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Set up a simulation with an imported layout, as the setup endpoints do
+    with plain dimensions. The caller must hold the simulation lock.
+    """
+    if params["seed"] is not None:
+        simulation.set_seed(params["seed"])
+    result = simulation.setup_building(backend=params["backend"], layout=layout)
+    zombies_added = simulation.add_initial_zombies(params["initial_zombies"])
+    return {"success": True, "building": result, "zombies_added": zombies_added}
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Dependency that checks the X-Admin-Token header when ZOMBIE_ADMIN_TOKEN is set"""
+    if ADMIN_TOKEN and not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def profile_params(format: Literal["json", "pstats", "collapsed"] = Query("json", description="Stats as JSON, a pstats file or collapsed stacks for flamegraphs"),
+                   limit: int = Query(30, ge=1, le=1000, description="Number of functions in the JSON stats"),
+                   sort: Literal["cumulative", "tottime", "calls"] = Query("cumulative", description="Sort order of the JSON stats")) -> Dict[str, Any]:
+    """Dependency with the query parameters of the profile endpoints"""
+    return {"format": format, "limit": limit, "sort": sort}
+
+def profile_response(simulation, params: Dict[str, Any]) -> Response:
+    """
+    Build the response of a profile endpoint, shared by every API module.
+
+    Returns the profiler status with the top functions as JSON, or the
+    profile as a downloadable pstats or collapsed-stack file. The caller
+    must hold the simulation lock.
+    """
+    profiler = simulation.profiler
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="No profiler armed")
+    if params["format"] == "pstats":
+        return Response(profiler.pstats_bytes(), media_type="application/octet-stream",
+                        headers={"Content-Disposition": 'attachment; filename="zombie-turns.pstats"'})
+    if params["format"] == "collapsed":
+        return PlainTextResponse(profiler.collapsed(),
+                                 headers={"Content-Disposition": 'attachment; filename="zombie-turns.collapsed.txt"'})
+    return JSONResponse(dict(profiler.status(), stats=profiler.stats(params["limit"], params["sort"])))
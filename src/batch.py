@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Ejecutor por lotes (sin interfaz) de la Simulación de Zombis.
+
+Recorre una rejilla de configuraciones (tamaño del edificio, zombis iniciales y
+generación de zombis), ejecuta N simulaciones con semilla hasta el final del
+juego repartidas en un ProcessPoolExecutor y guarda un resumen por ejecución en
+un archivo columnar compacto.
+
+Ejemplo:
+    python -m src.batch --floors 5 20 --rooms 10 --zombies 1 5 \\
+        --generation on off --runs 200 --seed 7 --output resultados.zcol
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from src.simulation import Simulation
+from src import logger
+
+# Cabecera del formato columnar
+COLUMNAR_MAGIC = b"ZSCOL1\n"
+
+# Columnas del resumen y su tipo (códigos de array); -1 indica "no ocurrió"
+RESULT_COLUMNS = (
+    ("floors", "q"),
+    ("rooms_per_floor", "q"),
+    ("initial_zombies", "q"),
+    ("generation", "b"),
+    ("seed", "Q"),
+    ("turns", "q"),
+    ("turns_to_full_infestation", "q"),
+    ("practicante_survival_turn", "q"),
+    ("final_infested", "q"),
+)
+
+
+def run_single(task):
+    """
+    Ejecuta una simulación completa hasta el final del juego o el límite de turnos.
+
+    Args:
+        task (dict): Parámetros de la ejecución (floors, rooms_per_floor,
+            initial_zombies, generation, seed, max_turns, practicante, backend)
+
+    Returns:
+        dict: Resumen de la ejecución con las columnas de RESULT_COLUMNS
+    """
+    # La semilla de la simulación hace la ejecución reproducible en cualquier proceso
+    simulation = Simulation(seed=task["seed"])
+    simulation.setup_building(task["floors"], task["rooms_per_floor"], task.get("backend", "objects"))
+    simulation.add_initial_zombies(task["initial_zombies"])
+    if task.get("practicante", True):
+        simulation.add_practicante()
+    if task["generation"]:
+        simulation.toggle_zombie_generation()
+
+    turns_to_full_infestation = -1
+    practicante_survival_turn = -1
+    while simulation.turn < task["max_turns"] and not simulation.is_game_over():
+        simulation.advance_turn()
+
+    if simulation.game_over_reason == "practicante_capturado":
+        practicante_survival_turn = simulation.turn
+    elif simulation.is_game_over():
+        turns_to_full_infestation = simulation.turn
+
+    return {
+        "floors": task["floors"],
+        "rooms_per_floor": task["rooms_per_floor"],
+        "initial_zombies": task["initial_zombies"],
+        "generation": int(task["generation"]),
+        "seed": task["seed"],
+        "turns": simulation.turn,
+        "turns_to_full_infestation": turns_to_full_infestation,
+        "practicante_survival_turn": practicante_survival_turn,
+        "final_infested": simulation.building.infested_count,
+    }
+
+
+def build_tasks(floors, rooms, zombies, generation, runs, seed=0, max_turns=1000,
+                practicante=True, backend="objects"):
+    """
+    Genera la lista de ejecuciones para todas las combinaciones de la rejilla.
+
+    Args:
+        floors (list): Números de pisos a probar
+        rooms (list): Habitaciones regulares por piso a probar
+        zombies (list): Zombis iniciales a probar
+        generation (list): Valores de generación de zombis (bool) a probar
+        runs (int): Ejecuciones por combinación
+        seed (int): Semilla base de la que se derivan las semillas de cada ejecución
+        max_turns (int): Límite de turnos por ejecución
+        practicante (bool): Añadir un practicante en cada ejecución
+        backend (str): Backend del edificio ("objects" o "compact")
+
+    Returns:
+        list: Una lista de diccionarios de parámetros para run_single
+    """
+    seeds = random.Random(seed)
+    tasks = []
+    for floors_count, rooms_per_floor, initial_zombies, enabled in itertools.product(
+            floors, rooms, zombies, generation):
+        for _ in range(runs):
+            tasks.append({
+                "floors": floors_count,
+                "rooms_per_floor": rooms_per_floor,
+                "initial_zombies": initial_zombies,
+                "generation": enabled,
+                "seed": seeds.getrandbits(63),
+                "max_turns": max_turns,
+                "practicante": practicante,
+                "backend": backend,
+            })
+    return tasks
+
+
+def run_batch(tasks, workers=None, chunksize=None):
+    """
+    Ejecuta todas las tareas en un pool de procesos y agrupa los resultados por columnas.
+
+    Args:
+        tasks (list): Tareas generadas por build_tasks
+        workers (int): Número de procesos (por defecto, uno por núcleo)
+        chunksize (int): Tareas que se envían juntas a cada proceso
+
+    Returns:
+        dict: Columnas del resultado (nombre -> array tipado), en el orden de las tareas
+    """
+    columns = {name: array(typecode) for name, typecode in RESULT_COLUMNS}
+    if not tasks:
+        return columns
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // ((workers or 4) * 8))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(run_single, tasks, chunksize=chunksize):
+            for name, _ in RESULT_COLUMNS:
+                columns[name].append(result[name])
+    return columns
+
+
+def write_columnar(path, columns):
+    """
+    Guarda columnas tipadas en un archivo binario compacto.
+    El archivo contiene una cabecera, una línea JSON con el esquema y, a
+    continuación, los bytes de cada columna uno detrás de otro.
+
+    Args:
+        path (str): Ruta del archivo de salida
+        columns (dict): Columnas (nombre -> array tipado) de igual longitud
+    """
+    rows = len(next(iter(columns.values()))) if columns else 0
+    schema = {
+        "rows": rows,
+        "byteorder": sys.byteorder,
+        "columns": [[name, column.typecode] for name, column in columns.items()],
+    }
+    with open(path, "wb") as output:
+        output.write(COLUMNAR_MAGIC)
+        output.write(json.dumps(schema).encode("utf-8") + b"\n")
+        for column in columns.values():
+            column.tofile(output)
+
+
+def read_columnar(path):
+    """
+    Lee un archivo escrito con write_columnar.
+
+    Args:
+        path (str): Ruta del archivo
+
+    Returns:
+        dict: Columnas (nombre -> array tipado)
+
+    Raises:
+        ValueError: Si el archivo no tiene el formato esperado
+    """
+    with open(path, "rb") as source:
+        if source.readline() != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} no es un archivo columnar de la simulación")
+        schema = json.loads(source.readline())
+        columns = {}
+        for name, typecode in schema["columns"]:
+            column = array(typecode)
+            column.fromfile(source, schema["rows"])
+            if schema["byteorder"] != sys.byteorder:
+                column.byteswap()
+            columns[name] = column
+    return columns
+
+
+def _parse_switch(value):
+    """Convierte 'on'/'off' (o equivalentes) de la línea de comandos en bool."""
+    value = value.lower()
+    if value in ("on", "true", "1", "si", "sí"):
+        return True
+    if value in ("off", "false", "0", "no"):
+        return False
+    raise argparse.ArgumentTypeError(f"Valor de generación no válido: {value}")
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos del ejecutor por lotes."""
+    parser = argparse.ArgumentParser(description="Ejecuta barridos Monte Carlo de la simulación de zombis")
+    parser.add_argument("--floors", type=int, nargs="+", default=[3], help="Números de pisos")
+    parser.add_argument("--rooms", type=int, nargs="+", default=[5], help="Habitaciones regulares por piso")
+    parser.add_argument("--zombies", type=int, nargs="+", default=[1], help="Zombis iniciales")
+    parser.add_argument("--generation", type=_parse_switch, nargs="+", default=[True],
+                        help="Generación de zombis (on/off)")
+    parser.add_argument("--runs", type=int, default=100, help="Ejecuciones por combinación")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla base")
+    parser.add_argument("--max-turns", type=int, default=1000, help="Límite de turnos por ejecución")
+    parser.add_argument("--no-practicante", action="store_true", help="No añadir practicante")
+    parser.add_argument("--backend", choices=["objects", "compact"], default="objects",
+                        help="Backend del edificio")
+    parser.add_argument("--workers", type=int, default=None, help="Número de procesos")
+    parser.add_argument("--output", default="batch_results.zcol", help="Archivo de resultados")
+    args = parser.parse_args(argv)
+
+    tasks = build_tasks(args.floors, args.rooms, args.zombies, args.generation, args.runs,
+                        seed=args.seed, max_turns=args.max_turns,
+                        practicante=not args.no_practicante, backend=args.backend)
+    logger.info("Ejecutando %s simulaciones por lotes", len(tasks))
+    columns = run_batch(tasks, workers=args.workers)
+    write_columnar(args.output, columns)
+    print(f"{len(tasks)} simulaciones completadas. Resultados en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
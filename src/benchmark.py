@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Banco de pruebas de rendimiento del núcleo de la simulación y del API.
+
+Mide la construcción del edificio, advance_turn, generate_random_zombie,
+use_secret_weapon, move_practicante, get_building_state y la serialización de
+/api/simulation/state sobre una matriz de tamaños (de 10² a 10⁶ habitaciones),
+densidades de infestación y backends. Los resultados se guardan en JSON y
+pueden compararse con una línea base guardada para detectar regresiones.
+
+Ejemplo:
+    python -m src.benchmark --sizes 2 3 4 --densities 0.01 0.3 --output resultados.json
+    python -m src.benchmark --sizes 2 3 4 --output nuevos.json --baseline resultados.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from src.simulation import Simulation, BUILDING_BACKENDS
+from src import logger
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+# Exponentes de 10 de la matriz de tamaños por defecto (10² a 10⁶ habitaciones)
+DEFAULT_SIZES = (2, 3, 4, 5, 6)
+DEFAULT_DENSITIES = (0.01, 0.1, 0.5)
+
+# Por encima de este tamaño el backend de objetos necesita demasiada memoria
+OBJECT_BACKEND_MAX_ROOMS = 10 ** 5
+
+# Tolerancia por defecto antes de marcar una medición como regresión (25% más lenta)
+DEFAULT_THRESHOLD = 0.25
+
+# Duración mínima de cada repetición: las operaciones rápidas se ejecutan varias
+# veces seguidas para que la medición no quede dominada por el ruido del reloj
+MIN_SAMPLE_SECONDS = 0.005
+MAX_CALLS_PER_SAMPLE = 1000
+
+RESULTS_VERSION = 1
+
+
+def building_shape(exponent):
+    """
+    Calcula pisos y habitaciones por piso para un edificio de unas 10**exponent habitaciones.
+
+    Args:
+        exponent (int): Exponente de 10 del número de habitaciones
+
+    Returns:
+        tuple: (pisos, habitaciones regulares por piso); cada piso suma además su escalera
+    """
+    floors = 10 ** (exponent // 2)
+    return floors, 10 ** exponent // floors - 1
+
+
+def _state_response_body(simulation):
+    """Construye la respuesta de /api/simulation/state como lo hace el API."""
+    from src.api_state import state_response
+    return state_response(simulation).body
+
+
+def _api_available():
+    try:
+        import src.api_state  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Casos medidos: nombre -> (función medida, si modifica el estado)
+# La función recibe la simulación preparada; la construcción del edificio
+# recibe en cambio las dimensiones y el backend.
+CASES = {
+    "building_construction": None,
+    "advance_turn": (lambda simulation: simulation.advance_turn(), True),
+    "generate_random_zombie": (lambda simulation: simulation.generate_random_zombie(), True),
+    "use_secret_weapon": (lambda simulation: simulation.use_secret_weapon(), True),
+    "move_practicante": (lambda simulation: simulation.move_practicante(), True),
+    "get_building_state": (lambda simulation: simulation.get_building_state(), False),
+    "api_state_serialization": (_state_response_body, False),
+}
+
+
+def prepare_simulation(floors, rooms_per_floor, backend, density, seed=0):
+    """
+    Crea la simulación de partida de un caso: edificio, zombis según la densidad,
+    practicante y generación de zombis activada.
+
+    Args:
+        floors (int): Número de pisos
+        rooms_per_floor (int): Habitaciones regulares por piso
+        backend (str): Backend del edificio
+        density (float): Fracción de habitaciones con zombis
+        seed (int): Semilla de la simulación
+
+    Returns:
+        Simulation: La simulación preparada
+    """
+    simulation = Simulation(seed=seed)
+    simulation.setup_building(floors, rooms_per_floor, backend)
+    simulation.add_initial_zombies(max(1, int(simulation.building.total_rooms * density)))
+    simulation.add_practicante()
+    simulation.toggle_zombie_generation()
+    return simulation
+
+
+def _calls_per_sample(run, setup):
+    """Número de llamadas seguidas a run para que una repetición dure al menos MIN_SAMPLE_SECONDS."""
+    argument = setup()
+    start = time.perf_counter()
+    run(argument)
+    elapsed = time.perf_counter() - start
+    if elapsed <= 0:
+        return MAX_CALLS_PER_SAMPLE
+    return max(1, min(MAX_CALLS_PER_SAMPLE, int(MIN_SAMPLE_SECONDS / elapsed) + 1))
+
+
+def _timings(run, setup, repeat):
+    """
+    Mide repeat repeticiones de run sobre setup() y devuelve el tiempo por
+    llamada de cada repetición, en segundos.
+    """
+    calls = _calls_per_sample(run, setup)
+    timings = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        for _ in range(calls):
+            run(argument)
+        timings.append((time.perf_counter() - start) / calls)
+    return timings, calls
+
+
+def _result(case, backend, floors, rooms_per_floor, density, measurement):
+    timings, calls = measurement
+    return {
+        "case": case,
+        "backend": backend,
+        "floors": floors,
+        "rooms_per_floor": rooms_per_floor,
+        "rooms": floors * (rooms_per_floor + 1),
+        "density": density,
+        "repeat": len(timings),
+        "calls": calls,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, densities=DEFAULT_DENSITIES, backends=("objects", "compact"),
+                   cases=None, repeat=5, seed=0, progress=None):
+    """
+    Ejecuta la matriz de casos.
+
+    Los casos que modifican el estado (advance_turn, use_secret_weapon...)
+    parten en cada repetición de la misma simulación, restaurada desde una
+    instantánea, así que todas las repeticiones miden el mismo trabajo. Los
+    tiempos son por llamada; las operaciones rápidas se repiten varias veces
+    seguidas dentro de cada repetición.
+
+    Args:
+        sizes (iterable): Exponentes de 10 del número de habitaciones
+        densities (iterable): Fracciones de habitaciones con zombis
+        backends (iterable): Backends del edificio
+        cases (iterable): Nombres de los casos (por defecto, todos)
+        repeat (int): Repeticiones por medición
+        seed (int): Semilla de las simulaciones
+        progress (callable): Función que recibe cada resultado al terminar
+
+    Returns:
+        list: Un diccionario por medición (caso, backend, tamaño, densidad y tiempos)
+    """
+    cases = list(cases or CASES)
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        raise ValueError(f"Casos desconocidos: {', '.join(unknown)}")
+    if "api_state_serialization" in cases and not _api_available():
+        logger.warning("FastAPI no está instalado: se omite api_state_serialization")
+        cases.remove("api_state_serialization")
+
+    results = []
+
+    def record(*args):
+        results.append(_result(*args))
+        if progress:
+            progress(results[-1])
+
+    with tempfile.TemporaryDirectory() as directory:
+        for exponent in sizes:
+            floors, rooms_per_floor = building_shape(exponent)
+            for backend in backends:
+                if backend == "objects" and 10 ** exponent > OBJECT_BACKEND_MAX_ROOMS:
+                    continue
+                building_class = BUILDING_BACKENDS[backend]
+                if "building_construction" in cases:
+                    timings = _timings(lambda shape: building_class(*shape), lambda: (floors, rooms_per_floor), repeat)
+                    record("building_construction", backend, floors, rooms_per_floor, None, timings)
+
+                for density in densities:
+                    simulation = prepare_simulation(floors, rooms_per_floor, backend, density, seed)
+                    path = os.path.join(directory, f"{backend}-{exponent}-{density}.zfs")
+                    simulation.save_snapshot(path)
+                    for case in cases:
+                        if case == "building_construction":
+                            continue
+                        run, mutates = CASES[case]
+                        setup = (lambda: Simulation.load_snapshot(path)) if mutates else (lambda: simulation)
+                        record(case, backend, floors, rooms_per_floor, density, _timings(run, setup, repeat))
+    return results
+
+
+def _key(result):
+    return (result["case"], result["backend"], result["rooms"], result["density"])
+
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compara los resultados con una línea base.
+
+    Args:
+        results (list): Resultados de run_benchmarks
+        baseline (list): Resultados de referencia
+        threshold (float): Aumento relativo del tiempo mínimo a partir del cual
+            una medición se considera una regresión
+
+    Returns:
+        list: Una entrada por medición presente en ambos, con el cociente entre
+            el tiempo mínimo actual y el de referencia y si es una regresión
+    """
+    reference = {_key(result): result for result in baseline}
+    comparison = []
+    for result in results:
+        base = reference.get(_key(result))
+        # Se compara el mínimo, la medida menos afectada por otros procesos
+        if base is None or base["min"] <= 0:
+            continue
+        ratio = result["min"] / base["min"]
+        comparison.append({
+            "case": result["case"],
+            "backend": result["backend"],
+            "rooms": result["rooms"],
+            "density": result["density"],
+            "baseline_min": base["min"],
+            "min": result["min"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return comparison
+
+
+def environment():
+    """
+    Describe el entorno en el que se ejecutan las mediciones.
+
+    Returns:
+        dict: Versión de Python, plataforma, versión de NumPy y fecha
+    """
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__ if np is not None else None,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_results(path, results):
+    """
+    Guarda los resultados en un archivo JSON junto con la descripción del entorno.
+
+    Args:
+        path (str): Ruta del archivo
+        results (list): Resultados de run_benchmarks
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": RESULTS_VERSION, "environment": environment(), "results": results}, f, indent=2)
+
+
+def read_results(path):
+    """
+    Lee un archivo escrito con write_results.
+
+    Args:
+        path (str): Ruta del archivo
+
+    Returns:
+        list: Los resultados
+
+    Raises:
+        ValueError: Si el archivo no tiene el formato esperado
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path} no es un archivo de resultados de rendimiento")
+    return data["results"]
+
+
+def _format_result(result):
+    density = "-" if result["density"] is None else f"{result['density']:g}"
+    return (f"{result['case']:<24} {result['backend']:<8} {result['rooms']:>9} {density:>6} "
+            f"{result['median'] * 1000:>12.3f} ms")
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos del banco de pruebas."""
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de la simulación de zombis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Exponentes de 10 del número de habitaciones (2 a 6)")
+    parser.add_argument("--densities", type=float, nargs="+", default=list(DEFAULT_DENSITIES),
+                        help="Fracciones de habitaciones con zombis")
+    parser.add_argument("--backends", choices=list(BUILDING_BACKENDS), nargs="+",
+                        default=list(BUILDING_BACKENDS), help="Backends del edificio")
+    parser.add_argument("--cases", choices=list(CASES), nargs="+", default=None, help="Casos a medir")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de las simulaciones")
+    parser.add_argument("--output", default="benchmark_results.json", help="Archivo de resultados")
+    parser.add_argument("--baseline", default=None, help="Resultados de referencia con los que comparar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Aumento relativo del tiempo mínimo que se considera regresión")
+    args = parser.parse_args(argv)
+
+    print(f"{'caso':<24} {'backend':<8} {'hab.':>9} {'dens.':>6} {'mediana':>15}")
+    results = run_benchmarks(args.sizes, args.densities, args.backends, args.cases, args.repeat, args.seed,
+                             progress=lambda result: print(_format_result(result), flush=True))
+    write_results(args.output, results)
+    print(f"{len(results)} mediciones guardadas en {args.output}")
+
+    if args.baseline:
+        comparison = compare_results(results, read_results(args.baseline), args.threshold)
+        regressions = [entry for entry in comparison if entry["regression"]]
+        for entry in regressions:
+            print(f"REGRESIÓN {entry['case']} {entry['backend']} {entry['rooms']} hab. "
+                  f"densidad {entry['density']}: x{entry['ratio']:.2f}")
+        print(f"{len(comparison)} mediciones comparadas con {args.baseline}, {len(regressions)} regresiones")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
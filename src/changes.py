@@ -0,0 +1,78 @@
+"""
+Versiones del estado de la simulación.
+
+La simulación tiene un número de versión que aumenta con cada cambio de estado.
+Además se guarda, para cada habitación, la versión en la que cambió por última
+vez, de modo que se puede saber qué habitaciones han cambiado desde cualquier
+versión sin guardar un historial de eventos.
+"""
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+class ChangeTracker:
+    """
+    Versión actual del estado y versión del último cambio de cada habitación.
+    """
+
+    def __init__(self, total_rooms, version=0):
+        """
+        Inicializa el registro de cambios de un edificio.
+
+        Args:
+            total_rooms (int): Número de habitaciones del edificio
+            version (int): Versión inicial; todas las habitaciones se consideran
+                cambiadas en esta versión
+        """
+        self.base_version = version
+        self.version = version
+        self.room_versions = array("q", [version]) * total_rooms
+
+    def bump(self):
+        """
+        Registra un cambio de estado que no afecta a ninguna habitación.
+
+        Returns:
+            int: La nueva versión
+        """
+        self.version += 1
+        return self.version
+
+    def mark(self, indices):
+        """
+        Registra un cambio de estado en un conjunto de habitaciones.
+
+        Args:
+            indices (iterable): Índices planos de las habitaciones que cambiaron
+
+        Returns:
+            int: La nueva versión
+        """
+        version = self.bump()
+        room_versions = self.room_versions
+        for index in indices:
+            room_versions[index] = version
+        return version
+
+    def changed_since(self, version):
+        """
+        Obtiene las habitaciones que han cambiado después de una versión.
+
+        Args:
+            version (int): Versión conocida por el cliente
+
+        Returns:
+            list: Índices planos en orden creciente, o None si la versión es
+                anterior al edificio actual o posterior a la versión actual
+        """
+        if version < self.base_version or version > self.version:
+            return None
+        if np is not None:
+            versions = np.frombuffer(self.room_versions, dtype=np.int64)
+            return np.flatnonzero(versions > version).tolist()
+        return [index for index, changed in enumerate(self.room_versions) if changed > version]
@@ -0,0 +1,157 @@
+"""
+Campo de peligro: distancia de cada habitación al zombi más cercano.
+
+Se calcula una vez por turno con una búsqueda en anchura (BFS) que parte a la
+vez de todas las habitaciones infestadas, así que después cualquier número de
+practicantes consulta la distancia de sus habitaciones candidatas en O(1) en
+lugar de recorrer el vecindario de cada una.
+
+La búsqueda se detiene a DANGER_RADIUS pasos: más allá, todas las habitaciones
+se consideran igual de seguras (distancia DANGER_RADIUS + 1) y el coste del
+turno depende de las habitaciones cercanas a los zombis, no del tamaño del
+edificio. Si se indican las habitaciones que se van a consultar (las de los
+practicantes y sus vecinas), la búsqueda termina en cuanto todas tienen
+distancia. Como el núcleo de movimiento, hay una versión en Python puro, que
+recorre cualquier plano, y otra con NumPy para el edificio compacto con el
+plano clásico que da las mismas distancias.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+# Distancia máxima que explora la búsqueda
+DANGER_RADIUS = 8
+
+# La versión con NumPy recorre todo el edificio y la BFS en Python solo las
+# habitaciones a menos del radio de algún zombi: se usa NumPy cuando la bola de
+# radio de cada zombi cubre al menos 1/NUMPY_MIN_COVERAGE del edificio
+NUMPY_MIN_COVERAGE = 64
+
+
+class DangerField:
+    """
+    Distancias de las habitaciones al zombi más cercano en un turno.
+
+    Cada update() sustituye las distancias del turno anterior.
+    """
+
+    def __init__(self, radius=DANGER_RADIUS):
+        """
+        Inicializa un campo vacío (ninguna habitación cerca de un zombi).
+
+        Args:
+            radius (int): Distancia máxima que explora la búsqueda
+
+        Raises:
+            ValueError: Si el radio no es positivo
+        """
+        if radius < 1:
+            raise ValueError("El radio del campo de peligro debe ser al menos 1")
+        self.radius = radius
+        self.far = radius + 1
+        self.visited = 0
+        # Distancias de la BFS en Python (solo habitaciones alcanzadas) o
+        # arreglo con todas las distancias de la versión con NumPy
+        self._distances = {}
+        self._array = None
+
+    def update(self, building, targets=None, use_numpy=None):
+        """
+        Recalcula el campo a partir de las habitaciones infestadas del edificio.
+
+        Args:
+            building: Building o CompactBuilding
+            targets (list): Índices de las habitaciones que se van a consultar; la
+                búsqueda se detiene cuando todas tienen distancia (por defecto
+                llega hasta el radio). Las distancias de las habitaciones no
+                alcanzadas son entonces solo una cota inferior
+            use_numpy (bool): Forzar (True) o evitar (False) la versión con NumPy,
+                que solo admite el plano clásico; por defecto se usa con el
+                edificio compacto sin plano general y muchos zombis
+        """
+        if use_numpy is None:
+            use_numpy = (np is not None and hasattr(building, "zombies") and building.topology is None
+                         and building.infested_count * (2 * self.radius + 1) * NUMPY_MIN_COVERAGE >= building.size)
+        self._distances.clear()
+        self._array = None
+        if use_numpy:
+            levels = self._update_numpy(building)
+        else:
+            levels = self._update_python(building, targets)
+        # Las habitaciones no alcanzadas están al menos un nivel más allá
+        self.far = levels + 1
+
+    def _update_python(self, building, targets):
+        """BFS por niveles sobre building.neighbour_indices(); devuelve el último nivel explorado."""
+        distances = self._distances
+        frontier = list(building.infested_indices)
+        for index in frontier:
+            distances[index] = 0
+        neighbour_indices = building.neighbour_indices
+        levels = self.radius
+        for distance in range(1, self.radius + 1):
+            if targets is not None and all(target in distances for target in targets):
+                levels = distance - 1
+                break
+            next_frontier = []
+            for index in frontier:
+                for neighbour in neighbour_indices(index):
+                    if neighbour not in distances:
+                        distances[neighbour] = distance
+                        next_frontier.append(neighbour)
+            if not next_frontier:
+                levels = self.radius
+                break
+            frontier = next_frontier
+        self.visited = len(distances)
+        return levels
+
+    def _update_numpy(self, building):
+        """
+        Campo completo del edificio compacto con NumPy. En esta topología la BFS
+        equivale a una transformada de distancia: la distancia dentro del pasillo
+        al zombi más cercano de cada lado y, a través de la escalera, la distancia
+        de la escalera del piso al zombi más cercano de cualquier piso más el
+        número de la habitación. Devuelve el último nivel explorado (el radio).
+        """
+        floors, stride = building.floors_count, building.stride
+        infinity = np.int32(2 ** 30)
+        zombies = np.frombuffer(building.zombies, dtype=np.uint8).reshape(floors, stride).astype(bool)
+        position = np.arange(stride, dtype=np.int32)
+
+        # Pasillo: zombi más cercano a la izquierda y a la derecha de cada habitación
+        left = np.where(zombies, position, -infinity)
+        np.maximum.accumulate(left, axis=1, out=left)
+        right = np.where(zombies, position, infinity)[:, ::-1]
+        right = np.minimum.accumulate(right, axis=1)[:, ::-1]
+        distances = np.minimum(position - left, right - position)
+
+        # Escaleras: min sobre los pisos g de (distancia en el piso g) + |f - g|
+        floor = np.arange(floors, dtype=np.int32)
+        own = np.minimum(distances[:, 0], infinity)
+        below = np.minimum.accumulate(own - floor) + floor
+        above = np.minimum.accumulate((own + floor)[::-1])[::-1] - floor
+        staircase = np.minimum(below, above)
+
+        np.minimum(distances, staircase[:, None] + position, out=distances)
+        np.minimum(distances, self.radius + 1, out=distances)
+        self._array = distances.astype(np.int16).ravel()
+        self.visited = building.size
+        return self.radius
+
+    def distance(self, index):
+        """
+        Obtiene la distancia de una habitación al zombi más cercano.
+
+        Args:
+            index (int): El índice plano de la habitación
+
+        Returns:
+            int: 0 si la habitación tiene zombis, 1 si es adyacente a un zombi...,
+                o far si la búsqueda no la alcanzó (radius + 1 si llegó hasta el radio)
+        """
+        if self._array is not None:
+            return int(self._array[index])
+        return self._distances.get(index, self.far)
@@ -0,0 +1,568 @@
+"""
+Diario binario de turnos para reproducir y revisar ejecuciones.
+
+Un TurnJournal se registra como listener de una Simulation y guarda, en un
+búfer de solo anexado, los cambios de cada turno y de cada acción del usuario
+(limpiar, restablecer un sensor, arma secreta, añadir zombis, practicante,
+generación). Cada registro guarda solo las habitaciones que cambiaron, con su
+índice codificado como diferencia respecto al anterior en un varint, y cada
+cierto número de turnos se escribe un fotograma clave con el estado completo
+comprimido. Así se puede volver a cualquier turno pasado aplicando como mucho
+un intervalo de registros, y el diario puede guardarse en un archivo y
+reproducirse sin la simulación.
+
+Formato (enteros como varint LEB128 sin signo):
+
+    cabecera: MAGIC, pisos, habitaciones por piso, backend, motor,
+              semilla (en zigzag, que puede ser negativa)
+    registro: tipo (1 byte), longitud, contenido
+    plano (opcional, antes del primer fotograma): zlib(JSON de BuildingLayout.to_dict())
+    fotograma clave: turno, ocupación, estado, len, zlib(banderas)
+    cambio: acción (1 byte), turno, ocupación, estado, n,
+            n x ((índice - índice anterior) << 2 | banderas)
+    ocupación: capturados, m, m x índice de la habitación de cada practicante
+               (en el orden en que se añadieron)
+
+Las banderas de una habitación son 1 si tiene zombis y 2 si su sensor está en
+alerta; el estado es 1 si la generación de zombis está activada más el código
+del motivo de fin de juego desplazado un bit.
+"""
+
+import bisect
+import json
+import zlib
+
+from src import logger
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+MAGIC = b"ZFJ3"
+
+# Turnos entre fotogramas clave por defecto
+DEFAULT_KEYFRAME_INTERVAL = 100
+
+RECORD_KEYFRAME = 0
+RECORD_CHANGE = 1
+RECORD_LAYOUT = 2
+
+# Acciones de los registros de cambio (el índice es el código en el diario)
+ACTIONS = (
+    "turn",
+    "add_zombie",
+    "initial_zombies",
+    "clean_room",
+    "reset_sensor",
+    "secret_weapon",
+    "practicante",
+    "generation",
+)
+
+BACKENDS = ("objects", "compact")
+ENGINES = ("auto", "reference", "sharded")
+GAME_OVER_REASONS = (None, "practicante_capturado")
+
+ZOMBIES = 1
+ALERT = 2
+
+
+class JournalError(ValueError):
+    """Error al leer un diario con formato no válido o al buscar un turno no registrado."""
+
+
+def _write_varint(buffer, value):
+    """Añade un entero no negativo al búfer como varint."""
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _zigzag(value):
+    """Convierte un entero con signo en uno no negativo (0, -1, 1, -2... -> 0, 1, 2, 3...)."""
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    """Deshace _zigzag."""
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def _read_varint(data, offset):
+    """
+    Lee un varint del búfer.
+
+    Returns:
+        tuple: (valor, posición siguiente)
+    """
+    value = 0
+    shift = 0
+    while True:
+        try:
+            byte = data[offset]
+        except IndexError:
+            raise JournalError("Diario truncado") from None
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def room_flags(building, index):
+    """
+    Obtiene las banderas (zombis y alerta) de una habitación.
+
+    Args:
+        building: El edificio de la simulación
+        index (int): El índice plano de la habitación
+
+    Returns:
+        int: ZOMBIES | ALERT según el estado de la habitación
+    """
+    room = building.get_room_by_index(index)
+    flags = ZOMBIES if room.has_zombies else 0
+    if room.sensor is not None and room.sensor.is_alert():
+        flags |= ALERT
+    return flags
+
+
+def building_flags(building):
+    """
+    Obtiene las banderas de todas las habitaciones del edificio.
+
+    Args:
+        building: El edificio de la simulación
+
+    Returns:
+        bytes: Un byte de banderas por habitación, en orden de índice plano
+    """
+    zombies = getattr(building, "zombies", None)
+    if zombies is not None:
+        # Edificio compacto: combinar directamente los arreglos de estado
+        if np is not None:
+            flags = np.frombuffer(zombies, dtype=np.uint8) | (np.frombuffer(building.alerts, dtype=np.uint8) << 1)
+            return flags.tobytes()
+        return bytes(z | (a << 1) for z, a in zip(zombies, building.alerts))
+    return bytes(room_flags(building, index) for index in range(building.total_rooms))
+
+
+def _status_byte(generation, game_over_reason):
+    return int(generation) | (GAME_OVER_REASONS.index(game_over_reason) << 1)
+
+
+def _write_occupancy(buffer, occupancy):
+    """Añade al búfer los capturados y el índice de la habitación de cada practicante."""
+    _write_varint(buffer, occupancy.captured)
+    members = occupancy.items()
+    _write_varint(buffer, len(members))
+    for _, index in members:
+        _write_varint(buffer, index)
+
+
+def _read_occupancy(data, offset):
+    """
+    Lee la ocupación escrita con _write_occupancy.
+
+    Returns:
+        tuple: (capturados, lista de índices en orden de llegada, posición siguiente)
+    """
+    captured, offset = _read_varint(data, offset)
+    count, offset = _read_varint(data, offset)
+    indices = []
+    for _ in range(count):
+        index, offset = _read_varint(data, offset)
+        indices.append(index)
+    return captured, indices, offset
+
+
+class JournalReader:
+    """
+    Lectura de un diario de turnos: reproducción de los registros y búsqueda de
+    turnos a partir del fotograma clave más cercano.
+    """
+
+    def __init__(self, data, keyframes=None):
+        """
+        Inicializa el lector.
+
+        Args:
+            data (bytes): El contenido del diario
+            keyframes (list): Índice de fotogramas clave [(turno, posición del
+                registro), ...]; si no se da, se construye recorriendo el diario
+
+        Raises:
+            JournalError: Si los datos no son un diario válido
+        """
+        if bytes(data[:len(MAGIC)]) != MAGIC:
+            raise JournalError("Los datos no son un diario de turnos")
+        self.data = data
+        offset = len(MAGIC)
+        self.floors, offset = _read_varint(data, offset)
+        self.rooms_per_floor, offset = _read_varint(data, offset)
+        backend, offset = _read_varint(data, offset)
+        engine, offset = _read_varint(data, offset)
+        seed, offset = _read_varint(data, offset)
+        self.seed = _unzigzag(seed)
+        self.backend = BACKENDS[backend]
+        self.engine = ENGINES[engine]
+        self.header_size = offset
+        # Plano general del edificio (None con el plano clásico)
+        self.layout = None
+        if offset < len(data) and data[offset] == RECORD_LAYOUT:
+            length, start = _read_varint(data, offset + 1)
+            self.layout = json.loads(zlib.decompress(bytes(data[start:start + length])))
+
+        if keyframes is None:
+            keyframes = []
+            for offset, kind, start in self._records(self.header_size):
+                if kind == RECORD_KEYFRAME:
+                    turn, _ = _read_varint(data, start)
+                    keyframes.append((turn, offset))
+        self.keyframes = keyframes
+
+    def _records(self, offset):
+        """Recorre los registros desde una posición: (posición, tipo, inicio del contenido)."""
+        data = self.data
+        size = len(data)
+        while offset < size:
+            kind = data[offset]
+            length, start = _read_varint(data, offset + 1)
+            end = start + length
+            if end > size:
+                raise JournalError("Diario truncado")
+            yield offset, kind, start
+            offset = end
+
+    def _decode_change(self, start):
+        """Decodifica un registro de cambio."""
+        data = self.data
+        action = ACTIONS[data[start]]
+        turn, offset = _read_varint(data, start + 1)
+        captured, practicantes, offset = _read_occupancy(data, offset)
+        status = data[offset]
+        count, offset = _read_varint(data, offset + 1)
+        rooms = []
+        index = 0
+        for _ in range(count):
+            value, offset = _read_varint(data, offset)
+            index += value >> 2
+            rooms.append((index, value & 3))
+        return {
+            "action": action,
+            "turn": turn,
+            "practicante": practicantes[0] if practicantes else None,
+            "practicantes": practicantes,
+            "practicantes_captured": captured,
+            "zombie_generation_enabled": bool(status & 1),
+            "game_over_reason": GAME_OVER_REASONS[status >> 1],
+            "rooms": rooms,
+        }
+
+    def _decode_keyframe(self, start):
+        """Decodifica un fotograma clave."""
+        data = self.data
+        turn, offset = _read_varint(data, start)
+        captured, practicantes, offset = _read_occupancy(data, offset)
+        status = data[offset]
+        length, offset = _read_varint(data, offset + 1)
+        return {
+            "turn": turn,
+            "practicante": practicantes[0] if practicantes else None,
+            "practicantes": practicantes,
+            "practicantes_captured": captured,
+            "zombie_generation_enabled": bool(status & 1),
+            "game_over_reason": GAME_OVER_REASONS[status >> 1],
+            "flags": zlib.decompress(bytes(data[offset:offset + length])),
+        }
+
+    @property
+    def first_turn(self):
+        """Primer turno registrado (el del primer fotograma clave)."""
+        return self.keyframes[0][0] if self.keyframes else None
+
+    def replay(self, start_turn=None, stop_turn=None):
+        """
+        Recorre los cambios registrados en orden.
+
+        Args:
+            start_turn (int): Primer turno a devolver (por defecto, desde el principio)
+            stop_turn (int): Último turno a devolver (por defecto, hasta el final)
+
+        Yields:
+            dict: Acción, turno, posición del primer practicante ("practicante",
+                índice plano), posiciones de todos ("practicantes", en orden de
+                llegada), practicantes capturados, estado de la generación,
+                motivo de fin de juego y lista "rooms" de (índice plano,
+                banderas) con el estado final de cada habitación
+        """
+        offset = self.header_size
+        if start_turn is not None:
+            # Empezar en el último fotograma clave anterior al turno pedido
+            position = bisect.bisect_left(self.keyframes, (start_turn, -1)) - 1
+            if position >= 0:
+                offset = self.keyframes[position][1]
+        for _, kind, start in self._records(offset):
+            if kind != RECORD_CHANGE:
+                continue
+            entry = self._decode_change(start)
+            if start_turn is not None and entry["turn"] < start_turn:
+                continue
+            if stop_turn is not None and entry["turn"] > stop_turn:
+                return
+            yield entry
+
+    def state_at(self, turn):
+        """
+        Reconstruye el estado al final de un turno, incluidas las acciones del
+        usuario realizadas antes del turno siguiente.
+
+        Args:
+            turn (int): El turno a reconstruir
+
+        Returns:
+            dict: Turno, banderas de las habitaciones (bytearray), posiciones de
+                los practicantes, capturados, estado de la generación y motivo
+                de fin de juego
+
+        Raises:
+            JournalError: Si el turno es anterior al primer fotograma clave
+        """
+        position = bisect.bisect_right(self.keyframes, (turn, float("inf"))) - 1
+        if position < 0:
+            raise JournalError(f"El turno {turn} no está en el diario")
+        records = self._records(self.keyframes[position][1])
+        _, kind, start = next(records)
+        if kind != RECORD_KEYFRAME:
+            raise JournalError("Índice de fotogramas clave no válido")
+        state = self._decode_keyframe(start)
+        flags = bytearray(state.pop("flags"))
+
+        for _, kind, start in records:
+            if kind != RECORD_CHANGE:
+                continue
+            entry = self._decode_change(start)
+            if entry["turn"] > turn:
+                break
+            for index, value in entry["rooms"]:
+                flags[index] = value
+            for key in ("practicante", "practicantes", "practicantes_captured"):
+                state[key] = entry[key]
+            state["zombie_generation_enabled"] = entry["zombie_generation_enabled"]
+            state["game_over_reason"] = entry["game_over_reason"]
+        state["turn"] = turn
+        state["flags"] = flags
+        return state
+
+    def seek(self, turn):
+        """
+        Crea una simulación con el estado registrado al final de un turno.
+        El estado se reconstruye desde el diario; los generadores aleatorios
+        no se restauran, así que avanzar la simulación devuelta no reproduce
+        necesariamente los turnos siguientes del diario.
+
+        Args:
+            turn (int): El turno a reconstruir
+
+        Returns:
+            Simulation: Una simulación nueva con el estado de ese turno
+
+        Raises:
+            JournalError: Si el turno es anterior al primer fotograma clave
+        """
+        from src.simulation import Simulation
+        from src.models.layout import BuildingLayout
+        from src.models.practicante import Practicante
+
+        state = self.state_at(turn)
+        simulation = Simulation(engine=self.engine, seed=self.seed)
+        layout = BuildingLayout.from_dict(self.layout) if self.layout is not None else None
+        simulation.setup_building(self.floors, self.rooms_per_floor, self.backend, layout)
+        building = simulation.building
+        for index, value in enumerate(state["flags"]):
+            if value:
+                room = building.get_room_by_index(index)
+                room.has_zombies = bool(value & ZOMBIES)
+                if value & ALERT and room.sensor is not None:
+                    room.sensor.set_alert()
+        simulation.turn = turn
+        simulation.zombie_generation_enabled = state["zombie_generation_enabled"]
+        simulation.game_over_reason = state["game_over_reason"]
+        for index in state["practicantes"]:
+            simulation.occupancy.add(Practicante(*building.index_to_location(index)))
+        simulation.occupancy.captured = state["practicantes_captured"]
+        simulation.changes.bump()
+        return simulation
+
+
+class TurnJournal:
+    """
+    Diario de solo anexado de una simulación. Se registra como listener al
+    crearse y guarda los cambios hasta que se llama a close().
+    """
+
+    def __init__(self, simulation, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Inicializa el diario y empieza a registrar la simulación.
+
+        Args:
+            simulation (Simulation): La simulación a registrar
+            keyframe_interval (int): Turnos entre fotogramas clave
+
+        Raises:
+            ValueError: Si el intervalo no es positivo
+        """
+        if keyframe_interval < 1:
+            raise ValueError("El intervalo entre fotogramas clave debe ser al menos 1")
+        self.simulation = simulation
+        self.keyframe_interval = keyframe_interval
+        self.buffer = bytearray()
+        self.keyframes = []
+        self._last_keyframe_turn = None
+        if simulation.building:
+            self._start()
+        simulation.add_listener(self._on_event)
+
+    def close(self):
+        """Deja de registrar la simulación (el contenido se conserva)."""
+        self.simulation.remove_listener(self._on_event)
+
+    def _start(self):
+        """Empieza un diario nuevo para el edificio actual de la simulación."""
+        simulation = self.simulation
+        building = simulation.building
+        backend = "compact" if hasattr(building, "zombies") else "objects"
+        self.buffer = bytearray(MAGIC)
+        for value in (len(building.floors), len(building.floors[0].get_rooms()) - 1,
+                      BACKENDS.index(backend), ENGINES.index(simulation.engine), _zigzag(simulation.seed)):
+            _write_varint(self.buffer, value)
+        if building.layout is not None:
+            self._append(RECORD_LAYOUT, zlib.compress(json.dumps(building.layout.to_dict()).encode("utf-8")))
+        self.keyframes = []
+        self.write_keyframe()
+
+    def _append(self, kind, payload):
+        """Añade un registro al diario y devuelve su posición."""
+        buffer = self.buffer
+        offset = len(buffer)
+        buffer.append(kind)
+        _write_varint(buffer, len(payload))
+        buffer += payload
+        return offset
+
+    def _scalar_state(self, payload):
+        """Añade al contenido el turno, la ocupación y el byte de estado."""
+        simulation = self.simulation
+        _write_varint(payload, simulation.turn)
+        _write_occupancy(payload, simulation.occupancy)
+        payload.append(_status_byte(simulation.zombie_generation_enabled, simulation.game_over_reason))
+
+    def write_keyframe(self):
+        """Escribe un fotograma clave con el estado completo de la simulación."""
+        payload = bytearray()
+        self._scalar_state(payload)
+        compressed = zlib.compress(building_flags(self.simulation.building))
+        _write_varint(payload, len(compressed))
+        payload += compressed
+        offset = self._append(RECORD_KEYFRAME, payload)
+        self.keyframes.append((self.simulation.turn, offset))
+        self._last_keyframe_turn = self.simulation.turn
+
+    def _write_change(self, action, indices):
+        """Escribe un registro de cambio con el estado final de las habitaciones indicadas."""
+        building = self.simulation.building
+        zombies = getattr(building, "zombies", None)
+        if zombies is not None:
+            # Edificio compacto: leer los arreglos sin crear vistas de habitación
+            alerts = building.alerts
+            flags_of = lambda index: zombies[index] | (alerts[index] << 1)
+        else:
+            flags_of = lambda index: room_flags(building, index)
+        payload = bytearray((ACTIONS.index(action),))
+        self._scalar_state(payload)
+        indices = sorted(set(indices))
+        _write_varint(payload, len(indices))
+        previous = 0
+        for index in indices:
+            _write_varint(payload, ((index - previous) << 2) | flags_of(index))
+            previous = index
+        self._append(RECORD_CHANGE, payload)
+
+    def _on_event(self, event, data):
+        """Listener de la simulación: añade el registro correspondiente al evento."""
+        if event == "setup":
+            self._start()
+            return
+        if not self.buffer:
+            return
+        location_to_index = self.simulation.building.location_to_index
+        if event == "turn":
+            locations = list(data["vacated_rooms"])
+            locations += data["newly_infested"]
+            if data["new_zombie_location"]:
+                locations.append(data["new_zombie_location"])
+            self._write_change("turn", (location_to_index(*location) for location in locations))
+            if self.simulation.turn - self._last_keyframe_turn >= self.keyframe_interval:
+                self.write_keyframe()
+        elif event == "rooms":
+            indices = (location_to_index(*location) for location in data["rooms"])
+            self._write_change(data.get("action", "add_zombie"), indices)
+        elif event in ("practicante", "generation"):
+            self._write_change(event, ())
+
+    def getvalue(self):
+        """
+        Obtiene el contenido del diario.
+
+        Returns:
+            bytes: El diario en formato binario
+        """
+        return bytes(self.buffer)
+
+    def save(self, path):
+        """
+        Guarda el diario en un archivo.
+
+        Args:
+            path (str): Ruta del archivo
+        """
+        with open(path, "wb") as f:
+            f.write(self.buffer)
+        logger.info("Diario de turnos guardado en %s (%s bytes)", path, len(self.buffer))
+
+    def reader(self):
+        """
+        Crea un lector sobre una copia del contenido actual del diario.
+
+        Returns:
+            JournalReader: El lector
+        """
+        return JournalReader(bytes(self.buffer), list(self.keyframes))
+
+    def seek(self, turn):
+        """
+        Crea una simulación con el estado registrado al final de un turno (ver JournalReader.seek).
+
+        Args:
+            turn (int): El turno a reconstruir
+
+        Returns:
+            Simulation: Una simulación nueva con el estado de ese turno
+        """
+        return self.reader().seek(turn)
+
+
+def load_journal(path):
+    """
+    Carga un diario guardado con TurnJournal.save.
+
+    Args:
+        path (str): Ruta del archivo
+
+    Returns:
+        JournalReader: El lector del diario
+    """
+    with open(path, "rb") as f:
+        return JournalReader(f.read())
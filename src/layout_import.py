@@ -0,0 +1,276 @@
+"""
+Importación de planos de edificio desde archivos JSON Lines o CSV.
+
+Las exportaciones de una instalación real tienen cientos de miles de
+habitaciones, así que el archivo se recorre una sola vez, línea a línea, desde
+una proyección en memoria, y cada registro se guarda en arreglos compactos
+(array) en lugar de en diccionarios. Al terminar se calculan las dimensiones,
+se valida el plano entero y se crea el BuildingLayout, que
+Simulation.setup_building(layout=...) convierte en el edificio de la simulación.
+
+Cada línea es un registro de uno de estos dos tipos:
+
+    room: una posición del plano con su tipo ("room", "staircase" o
+        "elevator"; por defecto "room") y, opcionalmente, su sensor
+        {"type": "room", "floor": 0, "room": 0, "kind": "staircase"}
+        {"type": "room", "floor": 0, "room": 1, "sensor": "P0H1"}
+    edge: una conexión entre dos habitaciones. Las que unen pisos distintos
+        son tramos de escalera o de ascensor y deben unir dos escaleras o dos ascensores
+        {"type": "edge", "floor": 0, "room": 0, "to_floor": 1, "to_room": 0}
+
+En CSV la primera fila es la cabecera con los nombres de las columnas (type,
+floor, room, to_floor, to_room, kind y sensor; las que no se usan pueden
+faltar), cada fila siguiente es un registro y las celdas vacías son campos
+ausentes. Las posiciones sin registro room son habitaciones normales. Los IDs
+de los sensores se derivan de la ubicación (P<piso>H<habitación>), así que de
+los del archivo solo se comprueba que coincidan.
+"""
+
+import csv
+import json
+import mmap
+import os
+from array import array
+
+from src.models.layout import BuildingLayout, LayoutError, KINDS, ROOM
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+FORMATS = ("jsonl", "csv")
+CSV_COLUMNS = ("type", "floor", "room", "to_floor", "to_room", "kind", "sensor")
+_EXTENSIONS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+# Un solo decodificador para todas las líneas (json.loads crea la configuración en cada llamada)
+_JSON_DECODER = json.JSONDecoder()
+
+# Cada cuántos registros se informa del progreso de la lectura
+PROGRESS_INTERVAL = 100000
+
+# Número máximo de posiciones (pisos x (habitaciones por piso + 1)) de un plano
+# importado; el plano reserva memoria para todas ellas antes de leer las aristas
+MAX_LAYOUT_ROOMS = 10 ** 8
+
+
+def layout_format(name):
+    """
+    Deduce el formato de un plano a partir del nombre del archivo.
+
+    Args:
+        name (str): Nombre o ruta del archivo
+
+    Returns:
+        str: "jsonl", "csv" o None si la extensión no es conocida
+    """
+    return _EXTENSIONS.get(os.path.splitext(name or "")[1].lower())
+
+
+def _integer(value, name, line_number):
+    """Convierte un campo en un entero no negativo (los de CSV llegan como texto)."""
+    if type(value) is int and value >= 0:
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    raise LayoutError(f"Línea {line_number}: '{name}' debe ser un entero no negativo")
+
+
+class _Records:
+    """Registros leídos del archivo, guardados en arreglos compactos."""
+
+    def __init__(self):
+        self.count = 0
+        self.max_floor = -1
+        self.max_room = -1
+        # Posiciones declaradas con un registro room y su tipo
+        self.room_floors = array("q")
+        self.room_numbers = array("q")
+        self.room_kinds = bytearray()
+        # Extremos de las aristas y posiciones de las que unen pisos distintos
+        self.edge_floors = array("q")
+        self.edge_rooms = array("q")
+        self.edge_to_floors = array("q")
+        self.edge_to_rooms = array("q")
+        self.vertical = array("q")
+
+    def _position(self, floor, room, line_number, prefix=""):
+        floor = _integer(floor, prefix + "floor", line_number)
+        room = _integer(room, prefix + "room", line_number)
+        if floor >= MAX_LAYOUT_ROOMS or room >= MAX_LAYOUT_ROOMS:
+            raise LayoutError(f"Línea {line_number}: la habitación {floor}-{room} está fuera del tamaño máximo "
+                              f"de un plano ({MAX_LAYOUT_ROOMS} posiciones)")
+        self.max_floor = max(self.max_floor, floor)
+        self.max_room = max(self.max_room, room)
+        return floor, room
+
+    def add(self, line_number, record_type, floor, room, to_floor=None, to_room=None, kind=None, sensor=None):
+        """
+        Valida y guarda un registro.
+
+        Raises:
+            LayoutError: Si el registro no es válido
+        """
+        floor, room = self._position(floor, room, line_number)
+        if record_type == "room":
+            if (kind or "room") not in KINDS:
+                raise LayoutError(f"Línea {line_number}: tipo de habitación desconocido: {kind}")
+            code = KINDS.index(kind or "room")
+            if sensor:
+                if code != ROOM:
+                    raise LayoutError(f"Línea {line_number}: las escaleras y los ascensores no tienen sensor")
+                if sensor != f"P{floor}H{room}":
+                    raise LayoutError(f"Línea {line_number}: el sensor {sensor} no corresponde a la "
+                                      f"habitación {floor}-{room} (su ID es P{floor}H{room})")
+            self.room_floors.append(floor)
+            self.room_numbers.append(room)
+            self.room_kinds.append(code)
+        elif record_type == "edge":
+            to_floor, to_room = self._position(to_floor, to_room, line_number, "to_")
+            if (floor, room) == (to_floor, to_room):
+                raise LayoutError(f"Línea {line_number}: la habitación {floor}-{room} no puede conectarse consigo misma")
+            if floor != to_floor:
+                self.vertical.append(len(self.edge_floors))
+            self.edge_floors.append(floor)
+            self.edge_rooms.append(room)
+            self.edge_to_floors.append(to_floor)
+            self.edge_to_rooms.append(to_room)
+        else:
+            raise LayoutError(f"Línea {line_number}: tipo de registro desconocido: {record_type}")
+        self.count += 1
+
+    def layout(self, floors_count=None, rooms_per_floor=None):
+        """
+        Crea el plano con los registros leídos.
+
+        Args:
+            floors_count (int): Número de pisos (por defecto, el piso más alto + 1)
+            rooms_per_floor (int): Habitaciones por piso (por defecto, el número de habitación más alto)
+
+        Returns:
+            BuildingLayout: El plano
+
+        Raises:
+            LayoutError: Si el plano no es válido o supera MAX_LAYOUT_ROOMS posiciones
+        """
+        if self.max_floor < 0 and floors_count is None:
+            raise LayoutError("El archivo no describe ninguna habitación")
+        floors_count = self.max_floor + 1 if floors_count is None else floors_count
+        rooms_per_floor = max(self.max_room, 0) if rooms_per_floor is None else rooms_per_floor
+        # Comprobar el tamaño antes de reservar la memoria del plano
+        if floors_count * (rooms_per_floor + 1) > MAX_LAYOUT_ROOMS:
+            raise LayoutError(f"Un edificio de {floors_count} pisos con {rooms_per_floor} habitaciones por piso "
+                              f"supera el tamaño máximo de un plano ({MAX_LAYOUT_ROOMS} posiciones)")
+        if self.max_floor >= floors_count or self.max_room > rooms_per_floor:
+            raise LayoutError(f"El archivo tiene habitaciones fuera de un edificio de {floors_count} pisos "
+                              f"con {rooms_per_floor} habitaciones por piso")
+        layout = BuildingLayout(floors_count, rooms_per_floor)
+
+        declared = bytearray(layout.size)
+        for floor, room, kind in zip(self.room_floors, self.room_numbers, self.room_kinds):
+            index = floor * layout.stride + room
+            if declared[index]:
+                raise LayoutError(f"La habitación {floor}-{room} aparece dos veces")
+            declared[index] = 1
+            layout.kinds[index] = kind
+
+        sources = _flat_indices(self.edge_floors, self.edge_rooms, layout.stride)
+        targets = _flat_indices(self.edge_to_floors, self.edge_to_rooms, layout.stride)
+        for position in self.vertical:
+            kind = layout.kinds[sources[position]]
+            if kind == ROOM or layout.kinds[targets[position]] != kind:
+                raise LayoutError(f"La conexión entre {self.edge_floors[position]}-{self.edge_rooms[position]} y "
+                                  f"{self.edge_to_floors[position]}-{self.edge_to_rooms[position]} une dos pisos "
+                                  f"pero no es un tramo de escalera o de ascensor")
+        layout.add_edges(sources, targets)
+        return layout
+
+
+def _flat_indices(floors, rooms, stride):
+    """Convierte arreglos de pisos y habitaciones en un arreglo "q" de índices planos."""
+    if np is not None:
+        indices = np.frombuffer(floors, dtype=np.int64) * stride + np.frombuffer(rooms, dtype=np.int64)
+        return array("q", indices.tobytes())
+    return array("q", [floor * stride + room for floor, room in zip(floors, rooms)])
+
+
+def _read_jsonl(lines, records, report):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = _JSON_DECODER.decode(line.decode("utf-8"))
+        except ValueError as error:
+            raise LayoutError(f"Línea {line_number}: JSON no válido ({error})") from error
+        if not isinstance(record, dict):
+            raise LayoutError(f"Línea {line_number}: cada línea debe ser un objeto JSON")
+        records.add(line_number, record.get("type"), record.get("floor"), record.get("room"),
+                    record.get("to_floor"), record.get("to_room"), record.get("kind"), record.get("sensor"))
+        report()
+
+
+def _read_csv(lines, records, report):
+    reader = csv.reader(line.decode("utf-8-sig") for line in lines)
+    header = [name.strip() for name in next(reader, [])]
+    unknown = set(header) - set(CSV_COLUMNS)
+    if unknown:
+        raise LayoutError(f"Columnas desconocidas en la cabecera CSV: {', '.join(sorted(unknown))}")
+    if not {"type", "floor", "room"} <= set(header):
+        raise LayoutError("La cabecera CSV debe tener al menos las columnas type, floor y room")
+    columns = [header.index(name) if name in header else None for name in CSV_COLUMNS]
+    for row in reader:
+        if not row:
+            continue
+        values = [row[column] if column is not None and column < len(row) and row[column] != "" else None
+                  for column in columns]
+        records.add(reader.line_num, *values)
+        report()
+
+
+def read_layout(source, format=None, floors_count=None, rooms_per_floor=None, progress=None):
+    """
+    Lee un plano de un archivo JSON Lines o CSV en una sola pasada.
+
+    Args:
+        source: Ruta del archivo o archivo binario abierto con fileno() (como
+            los archivos subidos a la API)
+        format (str): "jsonl" o "csv" (por defecto se deduce de la extensión o,
+            si no es conocida, del primer carácter del archivo)
+        floors_count (int): Número de pisos (por defecto, el piso más alto del archivo + 1)
+        rooms_per_floor (int): Habitaciones por piso sin contar la posición 0
+            (por defecto, el número de habitación más alto del archivo)
+        progress (callable): Función que recibe un diccionario con los registros
+            ("records") y los bytes leídos ("bytes", "total_bytes") cada
+            PROGRESS_INTERVAL registros y al terminar
+
+    Returns:
+        BuildingLayout: El plano del edificio
+
+    Raises:
+        LayoutError: Si el archivo no describe un plano válido
+        OSError: Si no se puede leer el archivo
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            return read_layout(file, format or layout_format(os.fspath(source)),
+                               floors_count, rooms_per_floor, progress)
+    if format is not None and format not in FORMATS:
+        raise LayoutError(f"Formato de plano desconocido: {format}")
+
+    total_bytes = os.fstat(source.fileno()).st_size
+    if not total_bytes:
+        raise LayoutError("El archivo del plano está vacío")
+    records = _Records()
+    with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        def report(final=False):
+            if progress and (final or records.count % PROGRESS_INTERVAL == 0):
+                progress({"records": records.count, "bytes": mapped.tell(), "total_bytes": total_bytes})
+
+        format = format or ("jsonl" if mapped[:64].lstrip()[:1] == b"{" else "csv")
+        lines = iter(mapped.readline, b"")
+        try:
+            (_read_jsonl if format == "jsonl" else _read_csv)(lines, records, report)
+        except (UnicodeDecodeError, csv.Error) as error:
+            raise LayoutError(f"El archivo del plano no se puede leer como {format}: {error}") from error
+        report(final=True)
+    return records.layout(floors_count, rooms_per_floor)
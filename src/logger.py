@@ -2,30 +2,96 @@
 """
 Módulo de registro (logger) para la Simulación de Sensores IoT con Zombis.
 Proporciona funcionalidades de registro y depuración.
+
+Los mensajes se formatean de forma perezosa: las funciones aceptan argumentos
+al estilo de logging (debug("Zombi en %s", room)) y no hacen ningún trabajo si
+el nivel está desactivado. Las escrituras al archivo se hacen en un hilo en
+segundo plano a través de una cola, y el archivo se rota por tamaño y por
+antigüedad, comprimiendo con gzip los archivos rotados.
 """
 
-import os
+import atexit
+import gzip
 import logging
-import datetime
+import logging.handlers
+import os
+import queue
+import shutil
+import time
 from pathlib import Path
 
-# Crear directorio de logs si no existe
+# Archivo de log (siempre el mismo; los anteriores se conservan rotados y comprimidos)
 logs_dir = Path("logs")
-logs_dir.mkdir(exist_ok=True)
+log_file = logs_dir / "zombies_simulation.log"
+
+# Rotación: tamaño máximo, antigüedad máxima y número de archivos rotados a conservar
+MAX_LOG_BYTES = 10 * 1024 * 1024
+MAX_LOG_AGE_SECONDS = 24 * 60 * 60
+LOG_BACKUP_COUNT = 5
+
+# Número máximo de mensajes de depuración por turno (ver turn_budget)
+TURN_LOG_LIMIT = 200
+
+
+def _compress_rotated(source, dest):
+    """Rotador del manejador de archivo: comprime el archivo rotado con gzip."""
+    with open(source, "rb") as original, gzip.open(dest, "wb") as compressed:
+        shutil.copyfileobj(original, compressed)
+    os.remove(source)
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Manejador de archivo que rota por tamaño y por antigüedad y comprime los
+    archivos rotados. El archivo y su directorio se crean con el primer mensaje.
+    """
+
+    def __init__(self, filename, max_bytes=MAX_LOG_BYTES, max_age=MAX_LOG_AGE_SECONDS,
+                 backup_count=LOG_BACKUP_COUNT):
+        """
+        Inicializa el manejador.
+
+        Args:
+            filename (str): Ruta del archivo de log
+            max_bytes (int): Tamaño a partir del cual se rota (0 para no rotar por tamaño)
+            max_age (float): Segundos a partir de los cuales se rota (0 para no rotar por antigüedad)
+            backup_count (int): Número de archivos rotados a conservar
+        """
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding="utf-8", delay=True)
+        self.max_age = max_age
+        self.opened_at = None
+        self.namer = lambda name: name + ".gz"
+        self.rotator = _compress_rotated
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        # La antigüedad de un archivo existente se cuenta desde su última modificación
+        if os.path.exists(self.baseFilename):
+            self.opened_at = os.path.getmtime(self.baseFilename)
+        else:
+            self.opened_at = time.time()
+        return super()._open()
+
+    def shouldRollover(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        if self.max_age > 0 and time.time() - self.opened_at >= self.max_age and self.stream.tell() > 0:
+            return True
+        return super().shouldRollover(record)
 
-# Generar nombre de archivo basado en la fecha y hora actual
-current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-log_file = logs_dir / f"zombies_simulation_{current_time}.log"
 
 # Configurar el logger
 logger = logging.getLogger("zombie_simulation")
 logger.setLevel(logging.INFO)  # Nivel por defecto
 
-# Manejador de archivo para todos los mensajes
-file_handler = logging.FileHandler(log_file, encoding='utf-8')
+# Manejador de archivo para todos los mensajes; se ejecuta en el hilo del QueueListener
+# (o directamente en los procesos hijos, ver _write_directly_after_fork)
+file_handler = CompressingRotatingFileHandler(log_file)
 file_handler.setLevel(logging.DEBUG)  # El archivo captura todo
 
-# Manejador de consola solo para errores en producción
+# Manejador de consola solo para errores en producción (síncrono, para no
+# desordenar la salida de la interfaz de línea de comandos)
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.ERROR)  # Por defecto solo muestra errores
 
@@ -34,8 +100,31 @@ formatter = logging.Formatter('[%(asctime)s] %(levelname)s - %(message)s')
 file_handler.setFormatter(formatter)
 console_handler.setFormatter(formatter)
 
+# Los mensajes hacia el archivo pasan por una cola y se escriben en segundo plano
+log_queue = queue.SimpleQueue()
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+queue_listener.start()
+atexit.register(queue_listener.stop)
+
+
+def _write_directly_after_fork():
+    """
+    En un proceso hijo creado con fork (por ejemplo, los procesos de
+    src.batch) no existe el hilo del QueueListener y sus mensajes se quedarían
+    en la copia de la cola: el hijo escribe directamente en el archivo.
+    """
+    global queue_listener
+    queue_listener = None
+    logger.removeHandler(queue_handler)
+    logger.addHandler(file_handler)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_write_directly_after_fork)
+
 # Añadir los manejadores al logger
-logger.addHandler(file_handler)
+logger.addHandler(queue_handler)
 logger.addHandler(console_handler)
 
 # Variable global para control del modo debug
@@ -44,13 +133,13 @@ DEBUG_MODE = False
 def set_debug_mode(enabled=True):
     """
     Activa o desactiva el modo DEBUG.
-    
+
     Args:
         enabled (bool): True para activar, False para desactivar
     """
     global DEBUG_MODE
     DEBUG_MODE = enabled
-    
+
     # Configurar el nivel de log apropiado
     if DEBUG_MODE:
         logger.setLevel(logging.DEBUG)
@@ -61,59 +150,156 @@ def set_debug_mode(enabled=True):
         console_handler.setLevel(logging.ERROR)
         logger.info("Modo DEBUG desactivado")
 
-def debug(message):
+def configure_rotation(max_bytes=None, max_age=None, backup_count=None):
+    """
+    Cambia la configuración de rotación del archivo de log.
+
+    Args:
+        max_bytes (int): Tamaño a partir del cual se rota (0 para no rotar por tamaño)
+        max_age (float): Segundos a partir de los cuales se rota (0 para no rotar por antigüedad)
+        backup_count (int): Número de archivos rotados a conservar
+    """
+    if max_bytes is not None:
+        file_handler.maxBytes = max_bytes
+    if max_age is not None:
+        file_handler.max_age = max_age
+    if backup_count is not None:
+        file_handler.backupCount = backup_count
+
+def flush():
+    """Espera a que se escriban en el archivo todos los mensajes pendientes."""
+    if queue_listener is None:
+        file_handler.flush()
+        return
+    queue_listener.stop()
+    file_handler.flush()
+    queue_listener.start()
+
+def debug(message, *args):
     """
     Registra un mensaje de nivel DEBUG.
-    
+
     Args:
-        message (str): El mensaje a registrar
+        message (str): El mensaje a registrar, con marcadores %s para args
+        *args: Valores que se insertan en el mensaje solo si se registra
     """
-    logger.debug(message)
+    logger.debug(message, *args)
 
-def info(message):
+def info(message, *args):
     """
     Registra un mensaje de nivel INFO.
-    
+
     Args:
-        message (str): El mensaje a registrar
+        message (str): El mensaje a registrar, con marcadores %s para args
+        *args: Valores que se insertan en el mensaje solo si se registra
     """
-    logger.info(message)
+    logger.info(message, *args)
 
-def warning(message):
+def warning(message, *args):
     """
     Registra un mensaje de nivel WARNING.
-    
+
     Args:
-        message (str): El mensaje a registrar
+        message (str): El mensaje a registrar, con marcadores %s para args
+        *args: Valores que se insertan en el mensaje solo si se registra
     """
-    logger.warning(message)
+    logger.warning(message, *args)
 
-def error(message):
+def error(message, *args):
     """
     Registra un mensaje de nivel ERROR.
-    
+
     Args:
-        message (str): El mensaje a registrar
+        message (str): El mensaje a registrar, con marcadores %s para args
+        *args: Valores que se insertan en el mensaje solo si se registra
     """
-    logger.error(message)
+    logger.error(message, *args)
 
-def critical(message):
+def critical(message, *args):
     """
     Registra un mensaje de nivel CRITICAL.
-    
+
     Args:
-        message (str): El mensaje a registrar
+        message (str): El mensaje a registrar, con marcadores %s para args
+        *args: Valores que se insertan en el mensaje solo si se registra
     """
-    logger.critical(message)
+    logger.critical(message, *args)
 
 def is_debug_enabled():
     """
     Verifica si el modo DEBUG está activado.
-    
+
     Returns:
         bool: True si el modo DEBUG está activado, False en caso contrario
     """
     return DEBUG_MODE
 
+
+class TurnLogBudget:
+    """
+    Límite de mensajes de depuración de un turno. Los mensajes que superan el
+    límite se descartan y al terminar el turno se registra cuántos se omitieron.
+    """
+
+    def __init__(self, limit):
+        """
+        Inicializa el presupuesto.
+
+        Args:
+            limit (int): Número máximo de mensajes a registrar
+        """
+        self.remaining = limit
+        self.suppressed = 0
+
+    def debug(self, message, *args):
+        """
+        Registra un mensaje de nivel DEBUG si queda presupuesto.
+
+        Args:
+            message (str): El mensaje a registrar, con marcadores %s para args
+            *args: Valores que se insertan en el mensaje solo si se registra
+        """
+        if self.remaining > 0:
+            self.remaining -= 1
+            logger.debug(message, *args)
+        else:
+            self.suppressed += 1
+
+    def finish(self, turn):
+        """
+        Registra cuántos mensajes se omitieron en el turno, si hubo alguno.
+
+        Args:
+            turn (int): Número del turno
+        """
+        if self.suppressed:
+            logger.debug("%d mensajes de depuración omitidos en el turno %d", self.suppressed, turn)
+
+
+def set_turn_log_limit(limit):
+    """
+    Cambia el número máximo de mensajes de depuración por turno.
+
+    Args:
+        limit (int): Número máximo de mensajes por turno
+    """
+    global TURN_LOG_LIMIT
+    TURN_LOG_LIMIT = limit
+
+def turn_budget(limit=None):
+    """
+    Crea el presupuesto de mensajes de depuración de un turno.
+
+    Args:
+        limit (int): Número máximo de mensajes (por defecto, TURN_LOG_LIMIT)
+
+    Returns:
+        TurnLogBudget: El presupuesto, o None si el nivel DEBUG está desactivado,
+            de modo que los bucles pueden saltarse todo el registro con un solo if
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return None
+    return TurnLogBudget(TURN_LOG_LIMIT if limit is None else limit)
+
 # Registro inicial de la aplicación
-info("Aplicación de Simulación de Sensores IoT con Zombis iniciada") 
\ No newline at end of file
+info("Aplicación de Simulación de Sensores IoT con Zombis iniciada")
@@ -42,14 +42,14 @@ class ZombieSimulationCLI:
         print(f"Estado del Edificio: {state['infested_rooms']}/{state['total_rooms']} habitaciones infestadas")
         print("  Por piso:")
         for floor_idx, floor in enumerate(self.simulation.building.floors):
-            zombie_rooms = floor.get_rooms_with_zombies()
-            total_rooms = len(floor.get_rooms())
-            percentage = (len(zombie_rooms) / total_rooms) * 100 if total_rooms > 0 else 0
-            print(f"    - Piso {floor_idx}: {len(zombie_rooms)}/{total_rooms} habitaciones infestadas ({percentage:.1f}%)")
+            infested_count = self.simulation.building.floor_infested_counts[floor_idx]
+            total_rooms = len(floor.rooms)
+            percentage = (infested_count / total_rooms) * 100 if total_rooms > 0 else 0
+            print(f"    - Piso {floor_idx}: {infested_count}/{total_rooms} habitaciones infestadas ({percentage:.1f}%)")
             
             # Si estamos en modo DEBUG, mostrar las habitaciones específicas infestadas
-            if logger.is_debug_enabled() and zombie_rooms:
-                room_numbers = [room.room_number for room in zombie_rooms]
+            if logger.is_debug_enabled() and infested_count:
+                room_numbers = [room.room_number for room in floor.get_rooms_with_zombies()]
                 room_numbers.sort()
                 print(f"      Habitaciones infestadas: {', '.join(map(str, room_numbers))}")
         
@@ -91,9 +91,9 @@ class ZombieSimulationCLI:
                     else:
                         sensor = "🚨" if room.sensor.is_alert() else "🟢"
                     
-                    # Verificar si el practicante está en esta habitación
+                    # Verificar si hay practicantes en esta habitación
                     practicante = "  "
-                    if self.simulation.practicante and self.simulation.practicante.floor_number == floor_idx and self.simulation.practicante.room_number == room.room_number:
+                    if self.simulation.occupancy.count(self.simulation.building.location_to_index(floor_idx, room.room_number)):
                         practicante = "🚶"
                     
                     # Imprimir todo en un único formato compacto
@@ -200,7 +200,7 @@ class ZombieSimulationCLI:
             
             if "error" in result:
                 print(f"Error: {result['error']}")
-                logger.error(f"Error al avanzar turno: {result['error']}")
+                logger.error("Error al avanzar turno: %s", result['error'])
             else:
                 print(f"\nTurno {result['turn']} completado.")
                 if result['newly_infested']:
@@ -271,16 +271,14 @@ class ZombieSimulationCLI:
                 input("\nPresione Enter para continuar...")
             elif choice == "7":
                 # Agregar Practicante
-                if self.simulation.practicante:
-                    print("\nYa hay un practicante en el edificio. Solo puede haber uno a la vez.")
+                result = self.simulation.add_practicante()
+                if "error" in result:
+                    print(f"\nError: {result['error']}")
                 else:
-                    result = self.simulation.add_practicante()
-                    if "error" in result:
-                        print(f"\nError: {result['error']}")
-                    else:
-                        floor, room = result["floor"], result["room"]
-                        print(f"\n¡Se ha añadido un practicante 🚶 en la habitación {floor}-{room}!")
-                        print("El practicante se moverá aleatoriamente por el edificio. Si un zombie lo alcanza, ¡perderás el juego!")
+                    floor, room = result["floor"], result["room"]
+                    print(f"\n¡Se ha añadido un practicante 🚶 en la habitación {floor}-{room}!")
+                    print(f"Hay {len(self.simulation.occupancy)} practicantes en el edificio.")
+                    print("Los practicantes huyen de los zombies. Si los zombies los capturan a todos, ¡perderás el juego!")
                 input("\nPresione Enter para continuar...")
             else:
                 # Opción 1 o Enter (continuar)
@@ -496,8 +494,8 @@ class ZombieSimulationCLI:
         print("     las escaleras (habitación 0 de cada piso, marcada con 🪜  ).")
         print("   - Las escaleras NO tienen sensores (faltó presupuesto), pero permiten a los zombies moverse arriba/abajo.")
         print("   - Puede limpiar habitaciones de zombies y restablecer sensores.")
-        print("   - Puede añadir un practicante (🚶) que se moverá automáticamente para evitar a los zombies.")
-        print("   - El juego termina cuando todas las habitaciones están infestadas o un zombie captura al practicante.")
+        print("   - Puede añadir practicantes (🚶) que se moverán automáticamente para evitar a los zombies.")
+        print("   - El juego termina cuando todas las habitaciones están infestadas o los zombies capturan a todos los practicantes.")
         print("\n4. CARACTERÍSTICAS ESPECIALES:")
         print("   - Arma secreta para eliminar zombies aleatoriamente (50% de probabilidad).")
         print("   - Practicante que debe ser protegido de los zombies para evitar perder el juego.")
@@ -538,7 +536,7 @@ class ZombieSimulationCLI:
             logger.info("Aplicación interrumpida por el usuario (KeyboardInterrupt)")
         except Exception as e:
             print(f"\n\nError inesperado: {str(e)}")
-            logger.critical(f"Error inesperado: {str(e)}\nTraceback:\n{sys.exc_info()[2]}")
+            logger.critical("Error inesperado: %s\nTraceback:\n%s", e, sys.exc_info()[2])
         finally:
             print("\n¡Gracias por usar la Simulación de Sensores IoT con Zombies!")
 
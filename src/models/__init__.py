@@ -3,4 +3,8 @@ from src.models.room import Room
 from src.models.floor import Floor
 from src.models.building import Building
 from src.models.sensor import Sensor
-from src.models.staircase import Staircase 
\ No newline at end of file
+from src.models.staircase import Staircase
+from src.models.compact_building import CompactBuilding
+from src.models.room_set import RoomIndexSet
+from src.models.elevator import Elevator
+from src.models.layout import BuildingLayout, LayoutError
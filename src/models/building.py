@@ -1,51 +1,124 @@
+from itertools import chain
+
 from src.models.floor import Floor
-from src.models.staircase import Staircase
+from src.models.layout import BuildingLayout
+from src.models.room_set import RoomIndexSet
+from src.models.topology import building_topology
 
 class Building:
     """
     Representa un edificio con múltiples pisos y habitaciones.
     El edificio es el contenedor principal para la simulación de zombis.
-    Cada piso tiene una escalera (habitación 0) que conecta con los pisos adyacentes.
+    Por defecto cada piso tiene una escalera (habitación 0) que conecta con los
+    pisos adyacentes; con un plano general (BuildingLayout) las habitaciones,
+    escaleras y ascensores se conectan como indique el plano.
     """
     
-    def __init__(self, floors_count, rooms_per_floor):
+    def __init__(self, floors_count, rooms_per_floor, layout=None):
         """
         Inicializa un nuevo edificio con un número específico de pisos y habitaciones por piso.
         
         Args:
             floors_count (int): El número de pisos en el edificio
             rooms_per_floor (int): El número de habitaciones en cada piso
+            layout (BuildingLayout): Plano general del edificio, con las mismas
+                dimensiones (por defecto, el plano clásico de pasillos)
+            
+        Raises:
+            ValueError: Si el plano no tiene las dimensiones indicadas
         """
-        self.floors = []
+        stride = rooms_per_floor + 1
+        self.layout = layout
+        if layout is None:
+            # Adyacencias compartidas por todos los edificios de esta forma: las
+            # habitaciones no guardan listas de vecinos, así que solo se crea su estado
+            self.topology = building_topology(floors_count, rooms_per_floor)
+            # Tipo de cada posición: 0 habitación, 1 escalera, 2 ascensor
+            self.staircases = bytearray(floors_count * stride)
+            self.staircases[0::stride] = b"\x01" * floors_count
+            self.floors = [Floor(floor_number, rooms_per_floor, connect_rooms=False)
+                           for floor_number in range(floors_count)]
+        else:
+            if (layout.floors_count, layout.rooms_per_floor) != (floors_count, rooms_per_floor):
+                raise ValueError("El plano no tiene las dimensiones del edificio")
+            self.topology = layout.topology()
+            self.staircases = bytearray(layout.kinds)
+            self.floors = [Floor(floor_number, rooms_per_floor, connect_rooms=False,
+                                 kinds=layout.kinds[floor_number * stride:(floor_number + 1) * stride])
+                           for floor_number in range(floors_count)]
         
-        # Crear pisos para este edificio
-        for floor_number in range(floors_count):
-            self.floors.append(Floor(floor_number, rooms_per_floor))
+        # Construir el índice de coordenadas de las habitaciones
+        self._build_coordinate_index()
         
         # Conectar escaleras entre pisos
         self._connect_floors()
     
+    def _build_coordinate_index(self):
+        """
+        Construye el índice posición plana -> habitación. Cada habitación guarda
+        su propio índice plano y sus coordenadas, así que localizarla es O(1)
+        sin un diccionario adicional por habitación.
+        """
+        self.rooms = list(chain.from_iterable(floor.get_rooms() for floor in self.floors))
+        
+        # Contadores de infestación mantenidos de forma incremental
+        self.total_rooms = len(self.rooms)
+        self.infested_count = 0
+        self.floor_infested_counts = [0] * len(self.floors)
+        self.alert_count = 0
+        
+        # Frontera activa: índices de habitaciones infestadas y libres
+        self.infested_indices = RoomIndexSet(self.total_rooms)
+        self.free_indices = RoomIndexSet(self.total_rooms, full=True)
+        # Las habitaciones recién creadas están vacías y con el sensor normal
+        for index, room in enumerate(self.rooms):
+            room.index = index
+            room._building = self
+    
+    def _on_zombies_changed(self, room, has_zombies):
+        """
+        Actualiza los contadores cuando una habitación gana o pierde zombis.
+        
+        Args:
+            room (Room): La habitación que cambió
+            has_zombies (bool): El nuevo estado de la habitación
+        """
+        delta = 1 if has_zombies else -1
+        self.infested_count += delta
+        self.floor_infested_counts[room.floor_number] += delta
+        if has_zombies:
+            self.infested_indices.add(room.index)
+            self.free_indices.discard(room.index)
+        else:
+            self.infested_indices.discard(room.index)
+            self.free_indices.add(room.index)
+    
+    def _on_alert_changed(self, alert):
+        """
+        Actualiza el recuento de sensores en alerta.
+        
+        Args:
+            alert (bool): True si un sensor pasó a alerta, False si volvió a normal
+        """
+        self.alert_count += 1 if alert else -1
+    
     def _connect_floors(self):
         """
-        Conecta las escaleras entre pisos adyacentes para permitir
-        el movimiento vertical de zombis.
+        Registra en cada escalera y ascensor los pisos que conecta. La adyacencia
+        entre escaleras para el movimiento vertical de zombis está en la topología.
         """
-        for i in range(len(self.floors) - 1):
-            current_floor = self.floors[i]
-            next_floor = self.floors[i + 1]
-            
-            # Obtenemos las escaleras de ambos pisos
-            current_staircase = current_floor.get_room(0)
-            next_staircase = next_floor.get_room(0)
-            
-            if isinstance(current_staircase, Staircase) and isinstance(next_staircase, Staircase):
-                # Conectamos las escaleras para permitir movimiento vertical
-                current_staircase.add_adjacent_room(next_staircase)
-                next_staircase.add_adjacent_room(current_staircase)
-                
-                # Guardamos referencia a los pisos conectados
-                current_staircase.add_connected_floor(next_floor)
-                next_staircase.add_connected_floor(current_floor)
+        if self.layout is None:
+            for current_floor, next_floor in zip(self.floors, self.floors[1:]):
+                current_floor.get_room(0).connected_floors.append(next_floor)
+                next_floor.get_room(0).connected_floors.append(current_floor)
+            return
+        for index, kind in enumerate(self.staircases):
+            if kind:
+                room = self.rooms[index]
+                for neighbour in self.topology.neighbours(index):
+                    floor = self.floors[self.rooms[neighbour].floor_number]
+                    if floor.floor_number != room.floor_number:
+                        room.add_connected_floor(floor)
     
     def get_floor(self, floor_number):
         """
@@ -77,6 +150,104 @@ class Building:
             return floor.get_room(room_number)
         return None
     
+    def locate_room(self, room):
+        """
+        Obtiene las coordenadas de una habitación del edificio en O(1).
+        
+        Args:
+            room (Room): La habitación a localizar
+            
+        Returns:
+            tuple: (floor_idx, room_idx), o None si la habitación no pertenece al edificio
+        """
+        index = getattr(room, "index", None)
+        if index is not None and index < len(self.rooms) and self.rooms[index] is room:
+            return (room.floor_number, room.room_number)
+        return None
+    
+    def connect_rooms(self, room, other):
+        """
+        Conecta dos habitaciones del edificio (en ambos sentidos). La conexión se
+        añade a una copia del plano (el plano clásico si el edificio no tiene
+        uno), cuya topología sustituye a la actual; las demás habitaciones
+        conservan sus vecinos.
+        
+        Args:
+            room (Room): Una habitación del edificio
+            other (Room): La habitación con la que se conecta
+            
+        Raises:
+            ValueError: Si alguna habitación no pertenece al edificio o son la misma
+        """
+        if self.locate_room(room) is None or self.locate_room(other) is None:
+            raise ValueError("Solo se pueden conectar habitaciones del mismo edificio")
+        if other.index in self.topology.neighbours(room.index):
+            return
+        floors_count, stride = len(self.floors), self.total_rooms // len(self.floors)
+        layout = self.layout.copy() if self.layout is not None else BuildingLayout.corridors(floors_count, stride - 1)
+        layout.add_edge(room.index, other.index)
+        self.layout = layout
+        self.topology = layout.topology()
+        # Solo cambian los vecinos de las dos habitaciones
+        for current, neighbour in ((room, other), (other, room)):
+            current._adjacent_rooms = None
+            if self.staircases[current.index] and neighbour.floor_number != current.floor_number:
+                current.add_connected_floor(self.floors[neighbour.floor_number])
+    
+    def location_to_index(self, floor_number, room_number):
+        """
+        Convierte coordenadas (piso, habitación) en el índice plano de la habitación.
+        
+        Args:
+            floor_number (int): El número de piso
+            room_number (int): El número de habitación
+            
+        Returns:
+            int: El índice plano, o None si las coordenadas no existen
+        """
+        room = self.get_room(floor_number, room_number)
+        return room.index if room else None
+    
+    def neighbour_indices(self, index):
+        """
+        Obtiene los índices de las habitaciones adyacentes a una habitación.
+        
+        Args:
+            index (int): El índice plano de la habitación
+            
+        Returns:
+            array: Los índices planos de las habitaciones adyacentes, en el mismo
+                orden que get_adjacent_rooms()
+        """
+        return self.topology.neighbours(index)
+    
+    def index_to_location(self, index):
+        """
+        Convierte un índice plano en coordenadas (piso, habitación).
+        
+        Args:
+            index (int): El índice plano de la habitación
+            
+        Returns:
+            tuple: (floor_idx, room_idx)
+        """
+        room = self.rooms[index]
+        return (room.floor_number, room.room_number)
+    
+    def get_room_by_index(self, index):
+        """
+        Obtiene una habitación a partir de su índice plano en el edificio.
+        
+        Args:
+            index (int): El índice plano de la habitación
+            
+        Returns:
+            Room: La habitación solicitada, o None si no se encuentra
+        """
+        if 0 <= index < len(self.rooms):
+            return self.rooms[index]
+        return None
+    
     def get_all_rooms(self):
         """
         Obtiene todas las habitaciones en el edificio.
@@ -84,10 +255,7 @@ class Building:
         Returns:
             list: Una lista plana de todos los objetos Room en el edificio
         """
-        all_rooms = []
-        for floor in self.floors:
-            all_rooms.extend(floor.get_rooms())
-        return all_rooms
+        return list(self.rooms)
     
     def get_all_rooms_with_zombies(self):
         """
@@ -96,7 +264,7 @@ class Building:
         Returns:
             list: Una lista de todos los objetos Room que tienen zombis
         """
-        return [room for room in self.get_all_rooms() if room.has_zombies]
+        return [self.rooms[index] for index in self.infested_indices.sorted()]
     
     def add_initial_zombie(self, floor_number, room_number):
         """
@@ -115,6 +283,44 @@ class Building:
             return True
         return False
     
+    def get_state_arrays(self):
+        """
+        Obtiene el estado de todas las habitaciones como arreglos de bytes.
+
+        Returns:
+            tuple: (zombies, alerts), un byte 0/1 por habitación en orden de índice plano
+        """
+        zombies = bytearray(self.total_rooms)
+        alerts = bytearray(self.total_rooms)
+        for room in self.rooms:
+            zombies[room.index] = room.has_zombies
+            alerts[room.index] = room._alert
+        return zombies, alerts
+    
+    def load_state(self, zombies, alerts, free_order=None):
+        """
+        Sustituye el estado de todas las habitaciones; los contadores se
+        actualizan a través de las propias habitaciones y sensores.
+        
+        Args:
+            zombies: Un byte 0/1 por habitación con la presencia de zombis
+            alerts: Un byte 0/1 por habitación con el estado del sensor
+                (se ignora en las escaleras)
+            free_order (iterable): Habitaciones libres en el orden interno del
+                conjunto, para que el muestreo de habitaciones libres continúe igual
+            
+        Raises:
+            ValueError: Si los arreglos no corresponden al tamaño del edificio
+        """
+        if len(zombies) != self.total_rooms or len(alerts) != self.total_rooms:
+            raise ValueError("El estado no corresponde al tamaño del edificio")
+        for room in self.rooms:
+            room.has_zombies = zombies[room.index]
+            if room.sensor is not None:
+                room._set_alert(alerts[room.index])
+        if free_order is not None:
+            self.free_indices = RoomIndexSet.from_indices(self.total_rooms, free_order)
+    
     def __str__(self):
         """
         Representación en cadena de texto del edificio.
@@ -122,6 +328,4 @@ class Building:
         Returns:
             str: Una cadena que muestra un resumen del estado del edificio
         """
-        total_rooms = len(self.get_all_rooms())
-        infested_rooms = len(self.get_all_rooms_with_zombies())
-        return f"Edificio: {infested_rooms}/{total_rooms} habitaciones infestadas con zombis" 
\ No newline at end of file
+        return f"Edificio: {self.infested_count}/{self.total_rooms} habitaciones infestadas con zombis" 
\ No newline at end of file
@@ -0,0 +1,752 @@
+"""
+Backend compacto del edificio para simulaciones de gran escala.
+
+En lugar de crear un objeto Room (con su Sensor y su lista de adyacencias) por
+cada habitación, el estado se guarda en arreglos planos de bytes indexados por
+la posición plana de la habitación (``piso * habitaciones_por_piso + habitación``).
+Las habitaciones, escaleras, sensores y pisos que ve la simulación son vistas
+ligeras que se crean bajo demanda y exponen la misma API que Building/Floor/Room.
+"""
+
+from array import array
+
+from src.models.layout import BuildingLayout, ELEVATOR
+from src.models.room_set import RoomIndexSet
+from src.models.topology import neighbour_indices
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+class CompactSensor:
+    """
+    Vista del sensor de una habitación del edificio compacto.
+    El estado se almacena como un bit en el arreglo de alertas del edificio.
+    """
+
+    __slots__ = ("_building", "_index")
+
+    def __init__(self, building, index):
+        """
+        Inicializa la vista del sensor.
+
+        Args:
+            building (CompactBuilding): El edificio que almacena el estado
+            index (int): El índice plano de la habitación del sensor
+        """
+        self._building = building
+        self._index = index
+
+    @property
+    def id(self):
+        """Identificador del sensor, derivado de la ubicación de la habitación."""
+        floor_number, room_number = self._building.index_to_location(self._index)
+        return f"P{floor_number}H{room_number}"
+
+    @property
+    def state(self):
+        """Estado del sensor: 'alert' o 'normal'."""
+        return "alert" if self._building.alerts[self._index] else "normal"
+
+    def set_alert(self):
+        """Establece el estado del sensor a 'alerta' cuando se detectan zombis."""
+        self._building.set_alert(self._index, True)
+
+    def reset(self):
+        """Restablece el estado del sensor a 'normal'."""
+        self._building.set_alert(self._index, False)
+
+    def is_alert(self):
+        """
+        Comprueba si el sensor está en estado de alerta.
+
+        Returns:
+            bool: True si el sensor está en estado de alerta, False en caso contrario
+        """
+        return bool(self._building.alerts[self._index])
+
+    def __str__(self):
+        """
+        Representación en cadena de texto del sensor.
+
+        Returns:
+            str: Una cadena que muestra el ID del sensor y su estado
+        """
+        return f"Sensor {self.id}: {self.state.upper()}"
+
+
+class CompactRoom:
+    """
+    Vista de una habitación del edificio compacto.
+    Expone la misma API que Room, pero lee y escribe el estado en los arreglos del edificio.
+    """
+
+    __slots__ = ("_building", "index")
+
+    def __init__(self, building, index):
+        """
+        Inicializa la vista de la habitación.
+
+        Args:
+            building (CompactBuilding): El edificio que almacena el estado
+            index (int): El índice plano de la habitación
+        """
+        self._building = building
+        self.index = index
+
+    @property
+    def floor_number(self):
+        """Número de piso de la habitación."""
+        return self.index // self._building.stride
+
+    @property
+    def room_number(self):
+        """Número de la habitación dentro de su piso."""
+        return self.index % self._building.stride
+
+    @property
+    def has_zombies(self):
+        """Indica si la habitación contiene zombis."""
+        return bool(self._building.zombies[self.index])
+
+    @has_zombies.setter
+    def has_zombies(self, value):
+        self._building.set_zombies(self.index, value)
+
+    @property
+    def sensor(self):
+        """Sensor de la habitación."""
+        return CompactSensor(self._building, self.index)
+
+    @property
+    def adjacent_rooms(self):
+        """Habitaciones adyacentes, derivadas de la topología del edificio."""
+        return self.get_adjacent_rooms()
+
+    def add_adjacent_room(self, room):
+        """
+        Conecta esta habitación con otra del mismo edificio, en ambos sentidos
+        (ver CompactBuilding.connect_rooms).
+
+        Args:
+            room (CompactRoom): Una habitación del mismo edificio
+
+        Raises:
+            ValueError: Si la habitación no pertenece al mismo edificio o es esta misma
+        """
+        self._building.connect_rooms(self, room)
+
+    def add_zombies(self):
+        """Añade zombis a la habitación y activa el sensor."""
+        self._building.set_zombies(self.index, True)
+        self._building.set_alert(self.index, True)
+
+    def remove_zombies(self):
+        """Elimina los zombis de la habitación (el sensor permanece en su estado actual)."""
+        self._building.set_zombies(self.index, False)
+
+    def reset_sensor(self):
+        """Restablece el sensor de la habitación al estado normal."""
+        self._building.set_alert(self.index, False)
+
+    def get_location(self):
+        """
+        Obtiene las coordenadas de la habitación dentro del edificio.
+
+        Returns:
+            tuple: (floor_number, room_number)
+        """
+        return self._building.index_to_location(self.index)
+
+    def get_adjacent_rooms(self):
+        """
+        Obtiene todas las habitaciones adyacentes.
+
+        Returns:
+            list: Una lista de vistas de las habitaciones adyacentes
+        """
+        building = self._building
+        return [building.get_room_by_index(i) for i in building.neighbour_indices(self.index)]
+
+    def __eq__(self, other):
+        return (isinstance(other, CompactRoom)
+                and other._building is self._building and other.index == self.index)
+
+    def __hash__(self):
+        return hash((id(self._building), self.index))
+
+    def __str__(self):
+        """
+        Representación en cadena de texto de la habitación.
+
+        Returns:
+            str: Una cadena que muestra la ubicación de la habitación y el estado de los zombis
+        """
+        status = "🧟 INFESTADA" if self.has_zombies else "✅ DESPEJADA"
+        sensor_status = "🚨 ALERTA" if self.sensor.is_alert() else "🟢 NORMAL"
+        return f"Habitación {self.floor_number}-{self.room_number}: {status} | Sensor: {sensor_status}"
+
+
+class CompactStaircase(CompactRoom):
+    """
+    Vista de una escalera del edificio compacto. Al igual que Staircase, no tiene sensor.
+    """
+
+    __slots__ = ()
+
+    @property
+    def sensor(self):
+        """Las escaleras no tienen sensor."""
+        return None
+
+    @property
+    def connected_floors(self):
+        """Pisos conectados a esta escalera."""
+        return self.get_connected_floors()
+
+    def get_connected_floors(self):
+        """
+        Obtiene todos los pisos conectados a esta escalera.
+
+        Returns:
+            list: Una lista de vistas de los pisos conectados
+        """
+        building = self._building
+        floor_numbers = []
+        for neighbour in building.neighbour_indices(self.index):
+            floor_number = neighbour // building.stride
+            if floor_number != self.floor_number and floor_number not in floor_numbers:
+                floor_numbers.append(floor_number)
+        return [building.floors[floor_number] for floor_number in floor_numbers]
+
+    def add_zombies(self):
+        """Añade zombis a la escalera sin tocar ningún sensor."""
+        self._building.set_zombies(self.index, True)
+
+    def reset_sensor(self):
+        """Las escaleras no tienen sensor, así que no hace nada."""
+        pass
+
+    def __str__(self):
+        """
+        Representación en cadena de texto de la escalera.
+
+        Returns:
+            str: Una cadena que muestra la ubicación de la escalera y el estado de los zombis
+        """
+        status = "🧟 INFESTADA" if self.has_zombies else "✅ DESPEJADA"
+        return f"Escalera {self.floor_number}-{self.room_number}: {status} | 🪜 ESCALERA"
+
+
+class CompactElevator(CompactStaircase):
+    """
+    Vista de un ascensor del edificio compacto. Como Elevator, conecta
+    directamente todas sus paradas y no tiene sensor.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        """
+        Representación en cadena de texto del ascensor.
+
+        Returns:
+            str: Una cadena que muestra la ubicación del ascensor y el estado de los zombis
+        """
+        status = "🧟 INFESTADA" if self.has_zombies else "✅ DESPEJADA"
+        return f"Ascensor {self.floor_number}-{self.room_number}: {status} | 🛗 ASCENSOR"
+
+
+class CompactRoomSequence:
+    """
+    Secuencia de solo lectura sobre un rango de habitaciones del edificio compacto.
+    Crea las vistas de habitación a medida que se accede a ellas.
+    """
+
+    __slots__ = ("_building", "_start", "_stop")
+
+    def __init__(self, building, start, stop):
+        self._building = building
+        self._start = start
+        self._stop = stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("Índice de habitación fuera de rango")
+        return self._building.get_room_by_index(self._start + position)
+
+    def __iter__(self):
+        get_room = self._building.get_room_by_index
+        for index in range(self._start, self._stop):
+            yield get_room(index)
+
+
+class CompactFloor:
+    """
+    Vista de un piso del edificio compacto. Expone la misma API que Floor.
+    """
+
+    __slots__ = ("_building", "floor_number")
+
+    def __init__(self, building, floor_number):
+        """
+        Inicializa la vista del piso.
+
+        Args:
+            building (CompactBuilding): El edificio que almacena el estado
+            floor_number (int): El número de piso
+        """
+        self._building = building
+        self.floor_number = floor_number
+
+    @property
+    def rooms(self):
+        """Secuencia de habitaciones del piso (la escalera en la posición 0)."""
+        start = self.floor_number * self._building.stride
+        return CompactRoomSequence(self._building, start, start + self._building.stride)
+
+    def get_room(self, room_number):
+        """
+        Obtiene una habitación específica en este piso.
+
+        Args:
+            room_number (int): El número de habitación a recuperar
+
+        Returns:
+            CompactRoom: La habitación solicitada, o None si no se encuentra
+        """
+        if 0 <= room_number < self._building.stride:
+            return self._building.get_room_by_index(self.floor_number * self._building.stride + room_number)
+        return None
+
+    def get_room_position(self, room):
+        """
+        Obtiene la posición de una habitación dentro de este piso.
+
+        Args:
+            room (CompactRoom): La habitación a localizar
+
+        Returns:
+            int: El índice de la habitación en el piso, o None si no pertenece a él
+        """
+        location = self._building.locate_room(room)
+        if location and location[0] == self.floor_number:
+            return location[1]
+        return None
+
+    def get_rooms(self):
+        """
+        Obtiene todas las habitaciones en este piso.
+
+        Returns:
+            list: Una lista de vistas de todas las habitaciones en este piso
+        """
+        return list(self.rooms)
+
+    def get_rooms_with_zombies(self):
+        """
+        Obtiene todas las habitaciones en este piso que contienen zombis.
+
+        Returns:
+            list: Una lista de vistas de las habitaciones que tienen zombis
+        """
+        start = self.floor_number * self._building.stride
+        return [self._building.get_room_by_index(i)
+                for i in self._building.iter_infested_indices(start, start + self._building.stride)]
+
+    def __str__(self):
+        """
+        Representación en cadena de texto del piso.
+
+        Returns:
+            str: Una cadena que muestra el número de piso y un resumen de las habitaciones
+        """
+        zombie_count = len(self.get_rooms_with_zombies())
+        return f"Piso {self.floor_number}: {zombie_count}/{self._building.stride} habitaciones infestadas"
+
+
+class CompactBuilding:
+    """
+    Edificio con el estado almacenado en arreglos planos de bytes.
+    Misma topología que Building: cada piso tiene una escalera (habitación 0)
+    seguida de un pasillo de habitaciones regulares, y las escaleras conectan
+    pisos consecutivos. Un edificio de un millón de habitaciones ocupa unos pocos
+    megabytes en lugar de millones de objetos.
+
+    Con un plano general (BuildingLayout) las adyacencias se leen de su
+    topología CSR; sin plano se calculan aritméticamente y no ocupan memoria.
+    """
+
+    def __init__(self, floors_count, rooms_per_floor, layout=None):
+        """
+        Inicializa un nuevo edificio compacto.
+
+        Args:
+            floors_count (int): El número de pisos en el edificio
+            rooms_per_floor (int): El número de habitaciones regulares en cada piso
+            layout (BuildingLayout): Plano general del edificio, con las mismas
+                dimensiones (por defecto, el plano clásico de pasillos)
+
+        Raises:
+            ValueError: Si el plano no tiene las dimensiones indicadas
+        """
+        self.floors_count = floors_count
+        self.rooms_per_floor = rooms_per_floor
+        # Cada piso tiene una escalera más sus habitaciones regulares
+        self.stride = rooms_per_floor + 1
+        self.size = floors_count * self.stride
+
+        # Estado mutable: un byte por habitación
+        self.zombies = bytearray(self.size)
+        self.alerts = bytearray(self.size)
+        # Tipo de cada posición: 0 habitación, 1 escalera, 2 ascensor
+        self.layout = layout
+        if layout is None:
+            self.topology = None
+            self.staircases = bytearray(self.size)
+            self.staircases[0::self.stride] = b"\x01" * floors_count
+        else:
+            if (layout.floors_count, layout.rooms_per_floor) != (floors_count, rooms_per_floor):
+                raise ValueError("El plano no tiene las dimensiones del edificio")
+            self.topology = layout.topology()
+            self.staircases = bytearray(layout.kinds)
+
+        # Contadores de infestación mantenidos de forma incremental
+        self.total_rooms = self.size
+        self.infested_count = 0
+        self.floor_infested_counts = array("q", [0]) * floors_count
+        self.alert_count = 0
+
+        # Frontera activa: índices de habitaciones infestadas y libres
+        self.infested_indices = RoomIndexSet(self.size)
+        self.free_indices = RoomIndexSet(self.size, full=True)
+
+        self.floors = [CompactFloor(self, floor_number) for floor_number in range(floors_count)]
+        self.rooms = CompactRoomSequence(self, 0, self.size)
+
+    def index_to_location(self, index):
+        """
+        Convierte un índice plano en coordenadas (piso, habitación).
+
+        Args:
+            index (int): El índice plano de la habitación
+
+        Returns:
+            tuple: (floor_idx, room_idx)
+        """
+        return divmod(index, self.stride)
+
+    def location_to_index(self, floor_number, room_number):
+        """
+        Convierte coordenadas (piso, habitación) en un índice plano.
+
+        Args:
+            floor_number (int): El número de piso
+            room_number (int): El número de habitación
+
+        Returns:
+            int: El índice plano, o None si las coordenadas no existen
+        """
+        if 0 <= floor_number < self.floors_count and 0 <= room_number < self.stride:
+            return floor_number * self.stride + room_number
+        return None
+
+    def neighbour_indices(self, index):
+        """
+        Calcula los índices de las habitaciones adyacentes a una habitación,
+        en el mismo orden que Building: primero el pasillo y luego las escaleras.
+
+        Args:
+            index (int): El índice plano de la habitación
+
+        Returns:
+            list: Los índices planos de las habitaciones adyacentes (un tramo
+                del arreglo CSR del plano, si lo hay)
+        """
+        if self.topology is not None:
+            return self.topology.neighbours(index)
+        return neighbour_indices(index, self.stride, self.size)
+
+    def connect_rooms(self, room, other):
+        """
+        Conecta dos habitaciones del edificio (en ambos sentidos). La conexión se
+        añade a una copia del plano (el plano clásico si el edificio no tiene
+        uno), cuya topología sustituye a la actual.
+
+        Args:
+            room (CompactRoom): Una habitación del edificio
+            other (CompactRoom): La habitación con la que se conecta
+
+        Raises:
+            ValueError: Si alguna habitación no pertenece al edificio o son la misma
+        """
+        if self.locate_room(room) is None or self.locate_room(other) is None:
+            raise ValueError("Solo se pueden conectar habitaciones del mismo edificio")
+        if other.index in self.neighbour_indices(room.index):
+            return
+        layout = (self.layout.copy() if self.layout is not None
+                  else BuildingLayout.corridors(self.floors_count, self.rooms_per_floor))
+        layout.add_edge(room.index, other.index)
+        self.layout = layout
+        self.topology = layout.topology()
+
+    def set_zombies(self, index, value):
+        """
+        Actualiza la presencia de zombis de una habitación.
+
+        Args:
+            index (int): El índice plano de la habitación
+            value (bool): True si la habitación tiene zombis
+        """
+        value = 1 if value else 0
+        if self.zombies[index] != value:
+            self.zombies[index] = value
+            delta = 1 if value else -1
+            self.infested_count += delta
+            self.floor_infested_counts[index // self.stride] += delta
+            if value:
+                self.infested_indices.add(index)
+                self.free_indices.discard(index)
+            else:
+                self.infested_indices.discard(index)
+                self.free_indices.add(index)
+
+    def set_alert(self, index, value):
+        """
+        Actualiza el estado del sensor de una habitación. Las escaleras no tienen sensor.
+
+        Args:
+            index (int): El índice plano de la habitación
+            value (bool): True para poner el sensor en alerta
+        """
+        value = 1 if value else 0
+        if not self.staircases[index] and self.alerts[index] != value:
+            self.alerts[index] = value
+            self.alert_count += 1 if value else -1
+
+    def iter_infested_indices(self, start=0, stop=None):
+        """
+        Recorre los índices de las habitaciones con zombis en un rango.
+
+        Args:
+            start (int): Índice inicial (incluido)
+            stop (int): Índice final (excluido); por defecto el final del edificio
+
+        Yields:
+            int: Índices planos de habitaciones infestadas
+        """
+        stop = self.size if stop is None else stop
+        flags, offset = self.zombies, 0
+        if not isinstance(flags, bytearray):
+            # Estado en memoria externa (ver attach_state): buscar en una copia del tramo
+            flags, offset = bytes(flags[start:stop]), start
+            start, stop = 0, stop - start
+        find = flags.find
+        index = find(1, start, stop)
+        while index != -1:
+            yield offset + index
+            index = find(1, index + 1, stop)
+
+    def get_floor(self, floor_number):
+        """
+        Obtiene un piso específico en el edificio.
+
+        Args:
+            floor_number (int): El número de piso a recuperar
+
+        Returns:
+            CompactFloor: El piso solicitado, o None si no se encuentra
+        """
+        if 0 <= floor_number < self.floors_count:
+            return self.floors[floor_number]
+        return None
+
+    def get_room(self, floor_number, room_number):
+        """
+        Obtiene una habitación específica en el edificio.
+
+        Args:
+            floor_number (int): El número de piso
+            room_number (int): El número de habitación
+
+        Returns:
+            CompactRoom: La habitación solicitada, o None si no se encuentra
+        """
+        index = self.location_to_index(floor_number, room_number)
+        if index is None:
+            return None
+        return self.get_room_by_index(index)
+
+    def get_room_by_index(self, index):
+        """
+        Obtiene una habitación a partir de su índice plano en el edificio.
+
+        Args:
+            index (int): El índice plano de la habitación
+
+        Returns:
+            CompactRoom: La vista de la habitación, o None si no se encuentra
+        """
+        if not 0 <= index < self.size:
+            return None
+        kind = self.staircases[index]
+        if kind == ELEVATOR:
+            return CompactElevator(self, index)
+        if kind:
+            return CompactStaircase(self, index)
+        return CompactRoom(self, index)
+
+    def locate_room(self, room):
+        """
+        Obtiene las coordenadas de una habitación del edificio en O(1).
+
+        Args:
+            room (CompactRoom): La habitación a localizar
+
+        Returns:
+            tuple: (floor_idx, room_idx), o None si la habitación no pertenece al edificio
+        """
+        if isinstance(room, CompactRoom) and room._building is self:
+            return self.index_to_location(room.index)
+        return None
+
+    def get_all_rooms(self):
+        """
+        Obtiene todas las habitaciones en el edificio.
+        Crea una vista por habitación, así que en edificios grandes es preferible
+        recorrer los arreglos de estado directamente.
+
+        Returns:
+            list: Una lista plana de vistas de todas las habitaciones
+        """
+        return list(self.rooms)
+
+    def get_all_rooms_with_zombies(self):
+        """
+        Obtiene todas las habitaciones en el edificio que contienen zombis.
+
+        Returns:
+            list: Una lista de vistas de las habitaciones que tienen zombis
+        """
+        return [self.get_room_by_index(i) for i in self.infested_indices.sorted()]
+
+    def add_initial_zombie(self, floor_number, room_number):
+        """
+        Añade un zombi inicial a una habitación específica.
+
+        Args:
+            floor_number (int): El número de piso
+            room_number (int): El número de habitación
+
+        Returns:
+            bool: True si el zombi se añadió correctamente, False en caso contrario
+        """
+        room = self.get_room(floor_number, room_number)
+        if room:
+            room.add_zombies()
+            return True
+        return False
+
+    def get_state_arrays(self):
+        """
+        Obtiene el estado de todas las habitaciones como arreglos de bytes.
+
+        Returns:
+            tuple: (zombies, alerts), un byte 0/1 por habitación en orden de índice plano
+        """
+        return self.zombies, self.alerts
+
+    def attach_state(self, zombies, alerts, floor_counts):
+        """
+        Traslada el estado mutable a memoria externa (la memoria compartida del
+        motor repartido): copia en ella los arreglos actuales y los sustituye
+        por las vistas dadas, de modo que el edificio y los procesos que
+        comparten esa memoria ven el mismo estado sin copiarlo en cada turno.
+
+        Args:
+            zombies (memoryview): Un byte por habitación (formato "B")
+            alerts (memoryview): Un byte por habitación (formato "B")
+            floor_counts (memoryview): Un entero por piso (formato "q")
+
+        Raises:
+            ValueError: Si las vistas no tienen el tamaño del edificio
+        """
+        if len(zombies) != self.size or len(alerts) != self.size or len(floor_counts) != self.floors_count:
+            raise ValueError("La memoria externa no corresponde al tamaño del edificio")
+        zombies[:] = self.zombies
+        alerts[:] = self.alerts
+        floor_counts[:] = array("q", self.floor_infested_counts)
+        self.zombies, self.alerts, self.floor_infested_counts = zombies, alerts, floor_counts
+
+    def detach_state(self):
+        """
+        Vuelve a guardar el estado mutable en arreglos propios, con una copia del
+        de la memoria externa (ver attach_state). No hace nada si ya es propio.
+        """
+        if isinstance(self.zombies, bytearray):
+            return
+        self.zombies = bytearray(self.zombies)
+        self.alerts = bytearray(self.alerts)
+        self.floor_infested_counts = array("q", self.floor_infested_counts)
+
+    def load_state(self, zombies, alerts, free_order=None):
+        """
+        Sustituye el estado de todas las habitaciones y recalcula los contadores
+        y los conjuntos de habitaciones infestadas y libres.
+
+        Args:
+            zombies: Un byte 0/1 por habitación con la presencia de zombis
+            alerts: Un byte 0/1 por habitación con el estado del sensor
+                (se ignora en las escaleras)
+            free_order (iterable): Habitaciones libres en el orden interno del
+                conjunto, para que el muestreo de habitaciones libres continúe
+                igual (por defecto, en orden creciente)
+
+        Raises:
+            ValueError: Si los arreglos no corresponden al tamaño del edificio
+        """
+        if len(zombies) != self.size or len(alerts) != self.size:
+            raise ValueError("El estado no corresponde al tamaño del edificio")
+        self.zombies[:] = zombies
+        self.alerts[:] = alerts
+        if np is not None:
+            zombie_flags = np.frombuffer(self.zombies, dtype=np.uint8)
+            alert_flags = np.frombuffer(self.alerts, dtype=np.uint8)
+            alert_flags[np.frombuffer(self.staircases, dtype=np.uint8) != 0] = 0
+            counts = zombie_flags.reshape(self.floors_count, self.stride).sum(axis=1, dtype=np.int64)
+            self.floor_infested_counts[:] = array("q", counts.tobytes())
+            self.alert_count = int(np.count_nonzero(alert_flags))
+            infested = np.flatnonzero(zombie_flags)
+            free = np.flatnonzero(zombie_flags == 0) if free_order is None else free_order
+        else:
+            for index, kind in enumerate(self.staircases):
+                if kind:
+                    self.alerts[index] = 0
+            stride = self.stride
+            zombies = bytes(self.zombies)
+            self.floor_infested_counts[:] = array("q", (zombies[start:start + stride].count(1)
+                                                        for start in range(0, self.size, stride)))
+            self.alert_count = bytes(self.alerts).count(1)
+            infested = [index for index, value in enumerate(zombies) if value]
+            free = [index for index, value in enumerate(zombies) if not value] if free_order is None else free_order
+        self.infested_count = len(infested)
+        self.infested_indices = RoomIndexSet.from_indices(self.size, infested)
+        self.free_indices = RoomIndexSet.from_indices(self.size, free)
+
+    def __str__(self):
+        """
+        Representación en cadena de texto del edificio.
+
+        Returns:
+            str: Una cadena que muestra un resumen del estado del edificio
+        """
+        return f"Edificio: {self.infested_count}/{self.total_rooms} habitaciones infestadas con zombis"
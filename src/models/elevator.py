@@ -0,0 +1,20 @@
+from src.models.staircase import Staircase
+
+class Elevator(Staircase):
+    """
+    Representa un ascensor del edificio. Como la escalera, no tiene sensor y
+    permite a los zombis cambiar de piso, pero conecta directamente todas sus
+    paradas, aunque no sean pisos consecutivos.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        """
+        Representación en cadena de texto del ascensor.
+        
+        Returns:
+            str: Una cadena que muestra la ubicación del ascensor y el estado de los zombis
+        """
+        status = "🧟 INFESTADA" if self.has_zombies else "✅ DESPEJADA"
+        return f"Ascensor {self.floor_number}-{self.room_number}: {status} | 🛗 ASCENSOR"
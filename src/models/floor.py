@@ -1,34 +1,45 @@
 from src.models.room import Room
 from src.models.staircase import Staircase
+from src.models.elevator import Elevator
+
+# Clase de habitación de cada tipo de posición de un plano (ver layout.py)
+ROOM_CLASSES = (Room, Staircase, Elevator)
 
 class Floor:
     """
     Representa un piso en un edificio que contiene múltiples habitaciones.
-    La primera habitación (índice 0) es siempre una escalera, y luego se añaden
-    las habitaciones regulares especificadas por el usuario.
+    Por defecto la primera habitación (índice 0) es una escalera, y luego se
+    añaden las habitaciones regulares especificadas por el usuario; con un plano
+    general cada posición puede ser una habitación, una escalera o un ascensor.
     """
+
+    __slots__ = ("floor_number", "rooms")
     
-    def __init__(self, floor_number, rooms_count):
+    def __init__(self, floor_number, rooms_count, connect_rooms=True, kinds=None):
         """
         Inicializa un nuevo piso con un número específico de habitaciones regulares más una escalera.
         
         Args:
             floor_number (int): El número de piso
             rooms_count (int): El número de habitaciones regulares en este piso (sin contar la escalera)
+            connect_rooms (bool): Conectar las habitaciones adyacentes; Building no
+                lo necesita porque usa la topología compartida del edificio
+            kinds (bytes): Tipo de cada una de las rooms_count + 1 posiciones según
+                el plano (ROOM, STAIRCASE o ELEVATOR); por defecto la escalera en la 0
         """
         self.floor_number = floor_number
-        self.rooms = []
-        
-        # Crear la escalera como la primera habitación (índice 0)
-        self.rooms.append(Staircase(floor_number, 0))
         
-        # Crear habitaciones normales para este piso (a partir del índice 1)
-        # Se crean exactamente rooms_count habitaciones regulares
-        for room_number in range(1, rooms_count + 1):
-            self.rooms.append(Room(floor_number, room_number))
+        if kinds is not None:
+            self.rooms = [ROOM_CLASSES[kind](floor_number, room_number) for room_number, kind in enumerate(kinds)]
+        else:
+            # Crear la escalera como la primera habitación (índice 0) y después
+            # exactamente rooms_count habitaciones normales (a partir del índice 1)
+            self.rooms = [Staircase(floor_number, 0)]
+            self.rooms.extend([Room(floor_number, room_number) for room_number in range(1, rooms_count + 1)])
         
         # Conectar habitaciones adyacentes en el mismo piso
-        self._connect_adjacent_rooms()
+        if connect_rooms:
+            self._connect_adjacent_rooms()
     
     def _connect_adjacent_rooms(self):
         """Conecta las habitaciones adyacentes en el mismo piso."""
@@ -52,6 +63,22 @@ class Floor:
             return self.rooms[room_number]
         return None
     
+    def get_room_position(self, room):
+        """
+        Obtiene la posición de una habitación dentro de este piso.
+        
+        Args:
+            room (Room): La habitación a localizar
+            
+        Returns:
+            int: El índice de la habitación en el piso, o None si no pertenece a él
+        """
+        # La habitación de la posición i tiene el número i, así que basta con comprobarla
+        position = getattr(room, "room_number", None)
+        if position is not None and 0 <= position < len(self.rooms) and self.rooms[position] is room:
+            return position
+        return None
+    
     def get_rooms(self):
         """
         Obtiene todas las habitaciones en este piso.
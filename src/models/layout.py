@@ -0,0 +1,317 @@
+"""
+Planos generales de edificio.
+
+Por defecto los edificios tienen el plano clásico: cada piso es un pasillo que
+empieza en la escalera (habitación 0) y las escaleras conectan pisos
+consecutivos. Un BuildingLayout describe cualquier grafo sobre la misma
+cuadrícula de posiciones (habitaciones 0..rooms_per_floor de cada piso, así que
+las coordenadas y los índices planos no cambian): adyacencias arbitrarias entre
+habitaciones, varias escaleras por piso y ascensores que conectan pisos no
+consecutivos. Building y CompactBuilding lo reciben con el argumento layout y
+guardan sus adyacencias como una topología CSR (ver topology.py).
+
+Las escaleras y los ascensores no tienen sensor. Una escalera une sus pisos en
+orden (cada uno con el siguiente) y un ascensor une todas sus paradas entre sí.
+"""
+
+import operator
+from array import array
+
+from src.models.topology import BuildingTopology
+
+# Tipos de posición del plano (el valor es el código en BuildingLayout.kinds)
+ROOM = 0
+STAIRCASE = 1
+ELEVATOR = 2
+KINDS = ("room", "staircase", "elevator")
+
+
+class LayoutError(ValueError):
+    """El plano del edificio no es válido."""
+
+
+class BuildingLayout:
+    """
+    Grafo de habitaciones de un edificio: tipo de cada posición y aristas no dirigidas.
+    Una vez construida su topología el plano ya no se puede modificar.
+    """
+
+    def __init__(self, floors_count, rooms_per_floor):
+        """
+        Inicializa un plano sin conexiones en el que todas las posiciones son habitaciones.
+
+        Args:
+            floors_count (int): El número de pisos
+            rooms_per_floor (int): Habitaciones de cada piso sin contar la posición 0
+
+        Raises:
+            LayoutError: Si las dimensiones no son válidas
+        """
+        if floors_count < 1 or rooms_per_floor < 0:
+            raise LayoutError("El plano debe tener al menos un piso y un número de habitaciones no negativo")
+        self.floors_count = floors_count
+        self.rooms_per_floor = rooms_per_floor
+        self.stride = rooms_per_floor + 1
+        self.size = floors_count * self.stride
+        self.kinds = bytearray(self.size)
+        # Extremos de cada arista, en el orden en que se añadieron
+        self._sources = array("q")
+        self._targets = array("q")
+        self._topology = None
+
+    @classmethod
+    def corridors(cls, floors_count, rooms_per_floor):
+        """
+        Crea el plano clásico: un pasillo por piso que empieza en la escalera
+        (habitación 0) y escaleras entre pisos consecutivos. Da la misma
+        topología, con los vecinos en el mismo orden, que un edificio sin plano.
+
+        Args:
+            floors_count (int): El número de pisos
+            rooms_per_floor (int): El número de habitaciones regulares en cada piso
+
+        Returns:
+            BuildingLayout: El plano
+        """
+        layout = cls(floors_count, rooms_per_floor)
+        for floor_number in range(floors_count):
+            layout.add_corridor(floor_number)
+        layout.add_staircase(0)
+        return layout
+
+    def copy(self):
+        """
+        Crea una copia modificable del plano (aunque el original ya esté en uso).
+
+        Returns:
+            BuildingLayout: Un plano con los mismos tipos y aristas
+        """
+        layout = BuildingLayout(self.floors_count, self.rooms_per_floor)
+        layout.kinds[:] = self.kinds
+        layout._sources.extend(self._sources)
+        layout._targets.extend(self._targets)
+        return layout
+
+    def index(self, floor_number, room_number):
+        """
+        Convierte coordenadas (piso, habitación) en un índice plano.
+
+        Args:
+            floor_number (int): El número de piso
+            room_number (int): El número de habitación
+
+        Returns:
+            int: El índice plano
+
+        Raises:
+            LayoutError: Si las coordenadas no existen
+        """
+        if not (0 <= floor_number < self.floors_count and 0 <= room_number < self.stride):
+            raise LayoutError(f"La habitación {floor_number}-{room_number} no existe en el plano")
+        return floor_number * self.stride + room_number
+
+    def _check_mutable(self):
+        if self._topology is not None:
+            raise LayoutError("El plano ya está en uso y no se puede modificar")
+
+    def add_edge(self, a, b):
+        """
+        Conecta dos habitaciones por su índice plano (en ambos sentidos).
+
+        Args:
+            a (int): Índice plano de una habitación
+            b (int): Índice plano de la otra habitación
+
+        Raises:
+            LayoutError: Si algún índice no existe, son la misma habitación o el plano ya está en uso
+        """
+        self._check_mutable()
+        if not (0 <= a < self.size and 0 <= b < self.size):
+            raise LayoutError(f"La arista {a}-{b} tiene habitaciones fuera del plano")
+        if a == b:
+            raise LayoutError(f"Una habitación no puede conectarse consigo misma ({a})")
+        self._sources.append(a)
+        self._targets.append(b)
+
+    def add_edges(self, sources, targets):
+        """
+        Conecta muchas parejas de habitaciones de una vez (en ambos sentidos),
+        sin recorrerlas con add_edge una a una.
+
+        Args:
+            sources (array): Índices planos de un extremo de cada arista (array "q")
+            targets (array): Índices planos del otro extremo, en el mismo orden
+
+        Raises:
+            LayoutError: Si las listas no tienen la misma longitud, algún índice no
+                existe, alguna arista une una habitación consigo misma o el plano ya está en uso
+        """
+        self._check_mutable()
+        if len(sources) != len(targets):
+            raise LayoutError("Cada arista necesita dos extremos")
+        if not sources:
+            return
+        if min(min(sources), min(targets)) < 0 or max(max(sources), max(targets)) >= self.size:
+            raise LayoutError("Hay aristas con habitaciones fuera del plano")
+        if any(map(operator.eq, sources, targets)):
+            raise LayoutError("Una habitación no puede conectarse consigo misma")
+        self._sources.extend(sources)
+        self._targets.extend(targets)
+
+    def connect(self, floor_a, room_a, floor_b, room_b):
+        """
+        Conecta dos habitaciones por sus coordenadas.
+
+        Args:
+            floor_a (int): Piso de la primera habitación
+            room_a (int): Número de la primera habitación
+            floor_b (int): Piso de la segunda habitación
+            room_b (int): Número de la segunda habitación
+        """
+        self.add_edge(self.index(floor_a, room_a), self.index(floor_b, room_b))
+
+    def add_corridor(self, floor_number, rooms=None):
+        """
+        Conecta en fila una secuencia de habitaciones de un piso.
+
+        Args:
+            floor_number (int): El número de piso
+            rooms (list): Números de habitación en el orden del pasillo (por defecto todas)
+        """
+        rooms = range(self.stride) if rooms is None else list(rooms)
+        for current, following in zip(rooms, rooms[1:]):
+            self.connect(floor_number, current, floor_number, following)
+
+    def _mark(self, index, kind):
+        """Asigna el tipo de una posición; una escalera no puede ser también ascensor."""
+        self._check_mutable()
+        if self.kinds[index] not in (ROOM, kind):
+            raise LayoutError(f"La habitación {index} ya es un {KINDS[self.kinds[index]]}")
+        self.kinds[index] = kind
+
+    def add_staircase(self, room_number, floors=None):
+        """
+        Añade una escalera en la misma posición de varios pisos, que une cada
+        piso con el siguiente de la lista.
+
+        Args:
+            room_number (int): Número de habitación de la escalera en cada piso
+            floors (list): Pisos por los que pasa, en orden (por defecto todos)
+        """
+        floors = range(self.floors_count) if floors is None else sorted(floors)
+        indices = [self.index(floor_number, room_number) for floor_number in floors]
+        for index in indices:
+            self._mark(index, STAIRCASE)
+        for current, following in zip(indices, indices[1:]):
+            self.add_edge(current, following)
+
+    def add_elevator(self, room_number, floors):
+        """
+        Añade un ascensor en la misma posición de varios pisos. Desde cada
+        parada se llega directamente a cualquier otra, saltándose los pisos intermedios.
+
+        Args:
+            room_number (int): Número de habitación del ascensor en cada piso
+            floors (list): Pisos en los que para (al menos dos)
+
+        Raises:
+            LayoutError: Si tiene menos de dos paradas
+        """
+        floors = sorted(set(floors))
+        if len(floors) < 2:
+            raise LayoutError("Un ascensor necesita al menos dos paradas")
+        indices = [self.index(floor_number, room_number) for floor_number in floors]
+        for index in indices:
+            self._mark(index, ELEVATOR)
+        for position, current in enumerate(indices):
+            for other in indices[position + 1:]:
+                self.add_edge(current, other)
+
+    @property
+    def edges_count(self):
+        """int: Número de aristas añadidas (las repetidas cuentan una vez por cada vez que se añadieron)."""
+        return len(self._sources)
+
+    def count(self, kind):
+        """
+        Cuenta las posiciones de un tipo.
+
+        Args:
+            kind (int): ROOM, STAIRCASE o ELEVATOR
+
+        Returns:
+            int: Número de posiciones de ese tipo
+        """
+        return self.kinds.count(kind)
+
+    def topology(self):
+        """
+        Obtiene la topología CSR del plano, construyéndola la primera vez.
+        A partir de entonces el plano no se puede modificar.
+
+        Returns:
+            BuildingTopology: La topología del plano
+        """
+        if self._topology is None:
+            self._topology = BuildingTopology.from_edges(self.floors_count, self.rooms_per_floor,
+                                                         self._sources, self._targets)
+        return self._topology
+
+    def to_dict(self):
+        """
+        Serializa el plano en un diccionario apto para JSON.
+
+        Returns:
+            dict: Dimensiones, índices de escaleras y ascensores y lista plana de
+                extremos de las aristas [a0, b0, a1, b1, ...]
+        """
+        edges = array("q", bytes(16 * len(self._sources)))
+        edges[0::2] = self._sources
+        edges[1::2] = self._targets
+        return {
+            "floors": self.floors_count,
+            "rooms_per_floor": self.rooms_per_floor,
+            "staircases": [index for index, kind in enumerate(self.kinds) if kind == STAIRCASE],
+            "elevators": [index for index, kind in enumerate(self.kinds) if kind == ELEVATOR],
+            "edges": edges.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crea un plano a partir de un diccionario de to_dict().
+
+        Args:
+            data (dict): El plano serializado
+
+        Returns:
+            BuildingLayout: El plano
+
+        Raises:
+            LayoutError: Si el diccionario no describe un plano válido
+        """
+        try:
+            layout = cls(data["floors"], data["rooms_per_floor"])
+            for kind, key in ((STAIRCASE, "staircases"), (ELEVATOR, "elevators")):
+                for index in data.get(key, ()):
+                    if not 0 <= index < layout.size:
+                        raise LayoutError(f"La habitación {index} no existe en el plano")
+                    layout._mark(index, kind)
+            edges = data.get("edges", ())
+            if len(edges) % 2:
+                raise LayoutError("La lista de aristas tiene un extremo suelto")
+            layout.add_edges(array("q", edges[0::2]), array("q", edges[1::2]))
+        except (KeyError, TypeError, OverflowError) as error:
+            raise LayoutError(f"Plano mal formado: {error}") from error
+        return layout
+
+    def __str__(self):
+        """
+        Representación en texto del plano.
+
+        Returns:
+            str: Dimensiones, escaleras, ascensores y aristas
+        """
+        return (f"Plano de {self.floors_count} pisos x {self.stride} posiciones: "
+                f"{self.count(STAIRCASE)} escaleras, {self.count(ELEVATOR)} ascensores, "
+                f"{self.edges_count} aristas")
@@ -9,6 +9,11 @@ class Practicante:
     habitación que el practicante, el juego termina.
     A diferencia de los zombis, el practicante no activa los sensores al entrar en una habitación.
     """
+
+    __slots__ = ("floor_number", "room_number")
+
+    # Ícono con el que se dibuja el practicante
+    icon = "🚶"
     
     def __init__(self, floor_number, room_number):
         """
@@ -20,7 +25,6 @@ class Practicante:
         """
         self.floor_number = floor_number
         self.room_number = room_number
-        self.icon = "🚶"
     
     def move_to(self, floor_number, room_number):
         """
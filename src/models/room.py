@@ -3,8 +3,12 @@ from src.models.sensor import Sensor
 class Room:
     """
     Representa una habitación en un edificio que puede contener zombis.
-    Cada habitación tiene un sensor que detecta la presencia de zombis.
+    Cada habitación tiene un sensor que detecta la presencia de zombis; su estado
+    se guarda en la habitación y room.sensor devuelve una vista del mismo.
     """
+
+    __slots__ = ("floor_number", "room_number", "_building", "_has_zombies", "_alert",
+                 "_adjacent_rooms", "index")
     
     def __init__(self, floor_number, room_number):
         """
@@ -16,24 +20,80 @@ class Room:
         """
         self.floor_number = floor_number
         self.room_number = room_number
-        self.has_zombies = False
-        self.sensor = Sensor(f"P{floor_number}H{room_number}")
-        self.adjacent_rooms = []
+        # Edificio que lleva los contadores de infestación (lo asigna Building)
+        self._building = None
+        self._has_zombies = False
+        # Estado del sensor: True si está en alerta
+        self._alert = False
+        # Habitaciones adyacentes; dentro de un edificio la lista se crea al
+        # pedirla por primera vez a partir de la topología compartida
+        self._adjacent_rooms = None
+        # Índice plano dentro del edificio (lo asigna Building al construirse)
+        self.index = None
+    
+    @property
+    def has_zombies(self):
+        """Indica si la habitación contiene zombis."""
+        return self._has_zombies
+    
+    @has_zombies.setter
+    def has_zombies(self, value):
+        value = bool(value)
+        if value != self._has_zombies:
+            self._has_zombies = value
+            # Mantener actualizados los contadores del edificio
+            if self._building is not None:
+                self._building._on_zombies_changed(self, value)
+    
+    @property
+    def sensor(self):
+        """Sensor de la habitación (una vista de su estado de alerta)."""
+        return Sensor(self)
+    
+    def _set_alert(self, value):
+        """
+        Cambia el estado del sensor de la habitación.
+        
+        Args:
+            value (bool): True para ponerlo en alerta, False para restablecerlo
+        """
+        value = bool(value)
+        if value != self._alert:
+            self._alert = value
+            # Mantener actualizado el recuento de sensores en alerta del edificio
+            if self._building is not None:
+                self._building._on_alert_changed(value)
+    
+    @property
+    def adjacent_rooms(self):
+        """Habitaciones adyacentes (ver get_adjacent_rooms)."""
+        return self.get_adjacent_rooms()
     
     def add_adjacent_room(self, room):
         """
         Añade una habitación adyacente a la que los zombis pueden moverse.
+        Dentro de un edificio la conexión se hace en ambos sentidos a través de
+        su plano (ver Building.connect_rooms).
         
         Args:
             room (Room): Una habitación adyacente
+            
+        Raises:
+            ValueError: Si la habitación pertenece a un edificio y la otra no
+                pertenece al mismo o es esta misma
         """
-        if room not in self.adjacent_rooms:
-            self.adjacent_rooms.append(room)
+        if self._building is not None:
+            self._building.connect_rooms(self, room)
+            return
+        if self._adjacent_rooms is None:
+            self._adjacent_rooms = []
+        if room not in self._adjacent_rooms:
+            self._adjacent_rooms.append(room)
     
     def add_zombies(self):
         """Añade zombis a la habitación y activa el sensor."""
         self.has_zombies = True
-        self.sensor.set_alert()
+        self._set_alert(True)
     
     def remove_zombies(self):
         """Elimina los zombis de la habitación."""
@@ -43,7 +103,16 @@ class Room:
     
     def reset_sensor(self):
         """Restablece el sensor de la habitación al estado normal."""
-        self.sensor.reset()
+        self._set_alert(False)
+    
+    def get_location(self):
+        """
+        Obtiene las coordenadas de la habitación dentro del edificio.
+        
+        Returns:
+            tuple: (floor_number, room_number)
+        """
+        return (self.floor_number, self.room_number)
     
     def get_adjacent_rooms(self):
         """
@@ -52,7 +121,14 @@ class Room:
         Returns:
             list: Una lista de objetos Room adyacentes
         """
-        return self.adjacent_rooms
+        adjacent_rooms = self._adjacent_rooms
+        if adjacent_rooms is None:
+            building = self._building
+            if building is None:
+                return []
+            rooms = building.rooms
+            adjacent_rooms = self._adjacent_rooms = [rooms[i] for i in building.topology.neighbours(self.index)]
+        return adjacent_rooms
     
     def __str__(self):
         """
@@ -62,5 +138,5 @@ class Room:
             str: Una cadena que muestra la ubicación de la habitación y el estado de los zombis
         """
         status = "🧟 INFESTADA" if self.has_zombies else "✅ DESPEJADA"
-        sensor_status = "🚨 ALERTA" if self.sensor.is_alert() else "🟢 NORMAL"
+        sensor_status = "🚨 ALERTA" if self._alert else "🟢 NORMAL"
         return f"Habitación {self.floor_number}-{self.room_number}: {status} | Sensor: {sensor_status}" 
\ No newline at end of file
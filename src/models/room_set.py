@@ -0,0 +1,180 @@
+"""
+Conjunto de índices de habitaciones con muestreo aleatorio en O(1).
+"""
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+def _index_array(indices):
+    """Crea un arreglo de índices de 64 bits (sin pasar por objetos de Python si hay NumPy)."""
+    result = array("q")
+    if np is not None:
+        result.frombytes(memoryview(np.ascontiguousarray(indices, dtype=np.int64)).cast("B"))
+    else:
+        result.extend(indices)
+    return result
+
+
+class RoomIndexSet:
+    """
+    Conjunto de índices planos de habitaciones de un edificio.
+    Guarda los miembros en un arreglo denso y la posición de cada índice en otro,
+    de modo que añadir, eliminar, comprobar pertenencia y elegir un miembro al
+    azar cuestan O(1) y la memoria es de unos pocos bytes por habitación.
+    """
+
+    __slots__ = ("_items", "_positions")
+
+    def __init__(self, capacity, full=False):
+        """
+        Inicializa el conjunto.
+
+        Args:
+            capacity (int): Número de habitaciones del edificio (índices 0..capacity-1)
+            full (bool): True para empezar con todas las habitaciones en el conjunto
+        """
+        if full:
+            self._items = _index_array(np.arange(capacity) if np is not None else range(capacity))
+            self._positions = self._items[:]
+        else:
+            self._items = array("q")
+            self._positions = array("q", [-1]) * capacity
+
+    @classmethod
+    def from_indices(cls, capacity, indices):
+        """
+        Crea un conjunto con los índices dados.
+
+        Args:
+            capacity (int): Número de habitaciones del edificio
+            indices (iterable): Índices distintos de las habitaciones del conjunto
+
+        Returns:
+            RoomIndexSet: El conjunto
+        """
+        room_set = cls.__new__(cls)
+        room_set._items = _index_array(indices)
+        if np is not None:
+            positions = np.full(capacity, -1, dtype=np.int64)
+            positions[np.frombuffer(room_set._items, dtype=np.int64)] = np.arange(len(room_set._items))
+            room_set._positions = _index_array(positions)
+        else:
+            room_set._positions = array("q", [-1]) * capacity
+            for position, index in enumerate(room_set._items):
+                room_set._positions[index] = position
+        return room_set
+
+    def add(self, index):
+        """
+        Añade un índice al conjunto (no hace nada si ya estaba).
+
+        Args:
+            index (int): Índice plano de la habitación
+        """
+        if self._positions[index] < 0:
+            self._positions[index] = len(self._items)
+            self._items.append(index)
+
+    def discard(self, index):
+        """
+        Elimina un índice del conjunto (no hace nada si no estaba).
+
+        Args:
+            index (int): Índice plano de la habitación
+        """
+        position = self._positions[index]
+        if position >= 0:
+            # Mover el último elemento al hueco para no desplazar el arreglo
+            last = self._items.pop()
+            if last != index:
+                self._items[position] = last
+                self._positions[last] = position
+            self._positions[index] = -1
+
+    def extend(self, indices):
+        """
+        Añade varios índices distintos que no están en el conjunto, en orden.
+        Equivale a llamar a add() con cada uno, pero con NumPy no los recorre en Python.
+
+        Args:
+            indices: Índices planos (lista, array o arreglo de NumPy de enteros)
+        """
+        start = len(self._items)
+        if np is not None:
+            indices = np.ascontiguousarray(indices, dtype=np.int64)
+            self._items.frombytes(memoryview(indices).cast("B"))
+            positions = np.frombuffer(self._positions, dtype=np.int64)
+            positions[indices] = np.arange(start, start + indices.size)
+            return
+        items = self._items
+        positions = self._positions
+        for index in indices:
+            positions[index] = len(items)
+            items.append(index)
+
+    def discard_many(self, indices):
+        """
+        Elimina varios índices, en orden; el resultado es el mismo que llamar a
+        discard() con cada uno (incluido el orden interno de los miembros).
+
+        Args:
+            indices: Índices planos (iterable de enteros)
+        """
+        items = self._items
+        positions = self._positions
+        pop = items.pop
+        for index in indices:
+            position = positions[index]
+            if position >= 0:
+                last = pop()
+                if last != index:
+                    items[position] = last
+                    positions[last] = position
+                positions[index] = -1
+
+    def sample(self, rng):
+        """
+        Elige un índice del conjunto de manera uniforme.
+
+        Args:
+            rng: Generador con un método randrange (por ejemplo el módulo random)
+
+        Returns:
+            int: Un índice del conjunto, o None si está vacío
+        """
+        if not self._items:
+            return None
+        return self._items[rng.randrange(len(self._items))]
+
+    def __contains__(self, index):
+        return 0 <= index < len(self._positions) and self._positions[index] >= 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def members(self):
+        """
+        Obtiene el arreglo interno con los miembros del conjunto, sin copiarlo.
+        No debe modificarse ni conservarse mientras el conjunto cambia.
+
+        Returns:
+            array: Los índices del conjunto, en orden arbitrario
+        """
+        return self._items
+
+    def sorted(self):
+        """
+        Obtiene los miembros del conjunto en orden creciente.
+
+        Returns:
+            list: Los índices del conjunto ordenados
+        """
+        return sorted(self._items)
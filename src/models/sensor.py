@@ -2,25 +2,45 @@ class Sensor:
     """
     Representa un sensor IoT que puede detectar zombis en una habitación.
     El sensor puede estar en diferentes estados: 'normal' o 'alerta'.
+
+    El sensor es una vista ligera de su habitación: el estado se guarda como un
+    booleano en la propia Room y el ID se deriva de su ubicación, así que cada
+    acceso a room.sensor crea una vista nueva en lugar de mantener un objeto
+    por habitación.
     """
+
+    __slots__ = ("_room",)
     
-    def __init__(self, id):
+    def __init__(self, room):
         """
-        Inicializa un nuevo sensor con un ID único.
+        Inicializa la vista del sensor de una habitación.
         
         Args:
-            id: Un identificador único para el sensor
+            room (Room): La habitación que almacena el estado del sensor
         """
-        self.id = id
-        self.state = "normal"  # Estado inicial es normal
+        self._room = room
+
+    @property
+    def id(self):
+        """Identificador del sensor, derivado de la ubicación de la habitación."""
+        return f"P{self._room.floor_number}H{self._room.room_number}"
+    
+    @property
+    def state(self):
+        """Estado actual del sensor: 'normal' o 'alert'."""
+        return "alert" if self._room._alert else "normal"
+    
+    @state.setter
+    def state(self, value):
+        self._room._set_alert(value == "alert")
     
     def set_alert(self):
         """Establece el estado del sensor a 'alerta' cuando se detectan zombis."""
-        self.state = "alert"
+        self._room._set_alert(True)
     
     def reset(self):
         """Restablece el estado del sensor a 'normal'."""
-        self.state = "normal"
+        self._room._set_alert(False)
     
     def is_alert(self):
         """
@@ -29,7 +49,7 @@ class Sensor:
         Returns:
             bool: True si el sensor está en estado de alerta, False en caso contrario
         """
-        return self.state == "alert"
+        return self._room._alert
     
     def __str__(self):
         """
@@ -5,6 +5,8 @@ class Staircase(Room):
     Representa una escalera en el edificio que permite a los zombis moverse entre pisos.
     Hereda de Room pero no tiene sensor y posee un ícono diferente.
     """
+
+    __slots__ = ("connected_floors",)
     
     def __init__(self, floor_number, room_number=0):
         """
@@ -15,11 +17,14 @@ class Staircase(Room):
             room_number (int): El número de habitación de la escalera (por defecto 0)
         """
         super().__init__(floor_number, room_number)
-        # Las escaleras no tienen sensores, así que lo eliminamos
-        self.sensor = None
         # Lista de pisos conectados a esta escalera
         self.connected_floors = []
         
+    @property
+    def sensor(self):
+        """Las escaleras no tienen sensor."""
+        return None
+        
     def add_connected_floor(self, floor):
         """
         Conecta esta escalera con un piso adyacente.
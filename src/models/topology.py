@@ -0,0 +1,210 @@
+"""
+Topología inmutable de los edificios.
+
+La forma de un edificio (pisos y habitaciones por piso) determina por completo
+qué habitaciones son adyacentes: cada piso es un pasillo que empieza en la
+escalera (habitación 0) y las escaleras conectan pisos consecutivos. La
+topología se guarda como una lista de adyacencia comprimida (CSR): los vecinos
+de la habitación i son targets[offsets[i]:offsets[i + 1]], en el mismo orden en
+que Building los conectaba (primero el pasillo y luego las escaleras).
+
+building_topology() guarda en caché las topologías de las últimas formas
+construidas, así que varios edificios de la misma forma comparten los mismos
+arreglos y crear uno nuevo solo reserva su estado mutable. Los planos
+generales (ver layout.py) construyen su topología con from_edges().
+"""
+
+import functools
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+# Número de formas de edificio cuya topología se mantiene en caché
+TOPOLOGY_CACHE_SIZE = 8
+
+
+def neighbour_indices(index, stride, size):
+    """
+    Calcula los índices de las habitaciones adyacentes a una habitación,
+    en el mismo orden que Building: primero el pasillo y luego las escaleras.
+
+    Args:
+        index (int): El índice plano de la habitación
+        stride (int): Habitaciones por piso, contando la escalera
+        size (int): Número total de habitaciones
+
+    Returns:
+        list: Los índices planos de las habitaciones adyacentes
+    """
+    room_number = index % stride
+    if room_number == 0:
+        neighbours = [index + 1] if stride > 1 else []
+        if index >= stride:
+            neighbours.append(index - stride)
+        if index + stride < size:
+            neighbours.append(index + stride)
+        return neighbours
+    neighbours = [index - 1]
+    if room_number < stride - 1:
+        neighbours.append(index + 1)
+    return neighbours
+
+
+class BuildingTopology:
+    """
+    Adyacencias de un edificio de una forma dada, en formato CSR.
+    No debe modificarse: la comparten todos los edificios de la misma forma.
+    """
+
+    __slots__ = ("floors_count", "rooms_per_floor", "stride", "size", "offsets", "targets")
+
+    def __init__(self, floors_count, rooms_per_floor):
+        """
+        Construye la topología de una vez, sin conectar las habitaciones una a una.
+
+        Args:
+            floors_count (int): El número de pisos
+            rooms_per_floor (int): El número de habitaciones regulares en cada piso
+        """
+        self.floors_count = floors_count
+        self.rooms_per_floor = rooms_per_floor
+        self.stride = rooms_per_floor + 1
+        self.size = floors_count * self.stride
+        if np is not None:
+            self.offsets, self.targets = self._build_numpy()
+        else:
+            self.offsets, self.targets = self._build_python()
+
+    @classmethod
+    def from_edges(cls, floors_count, rooms_per_floor, sources, targets):
+        """
+        Construye la topología de un plano general a partir de sus aristas no
+        dirigidas. Los vecinos de cada habitación quedan en el orden en que se
+        añadieron sus aristas, y las aristas repetidas se ignoran.
+
+        Args:
+            floors_count (int): El número de pisos
+            rooms_per_floor (int): El número de habitaciones regulares en cada piso
+            sources (array): Índice plano de un extremo de cada arista
+            targets (array): Índice plano del otro extremo de cada arista
+
+        Returns:
+            BuildingTopology: La topología del plano
+        """
+        topology = cls.__new__(cls)
+        topology.floors_count = floors_count
+        topology.rooms_per_floor = rooms_per_floor
+        topology.stride = rooms_per_floor + 1
+        topology.size = floors_count * topology.stride
+        if np is not None:
+            topology.offsets, topology.targets = topology._edges_numpy(sources, targets)
+        else:
+            topology.offsets, topology.targets = topology._edges_python(sources, targets)
+        return topology
+
+    def _edges_python(self, sources, targets):
+        """Construye los arreglos CSR de un plano general con listas por habitación."""
+        neighbours = [[] for _ in range(self.size)]
+        seen = set()
+        for a, b in zip(sources, targets):
+            for source, target in ((a, b), (b, a)):
+                if (source, target) not in seen:
+                    seen.add((source, target))
+                    neighbours[source].append(target)
+        offsets = array("q", [0])
+        flat = array("q")
+        for row in neighbours:
+            flat.extend(row)
+            offsets.append(len(flat))
+        return offsets, flat
+
+    def _edges_numpy(self, sources, targets):
+        """Construye los arreglos CSR de un plano general con NumPy (ordenación estable por origen)."""
+        a = np.frombuffer(sources, dtype=np.int64)
+        b = np.frombuffer(targets, dtype=np.int64)
+        # Cada arista en los dos sentidos, en el orden en que se añadió
+        directed_sources = np.empty(2 * a.size, dtype=np.int64)
+        directed_targets = np.empty(2 * a.size, dtype=np.int64)
+        directed_sources[0::2], directed_sources[1::2] = a, b
+        directed_targets[0::2], directed_targets[1::2] = b, a
+        # Quitar las repetidas conservando la primera aparición
+        _, first = np.unique(directed_sources * self.size + directed_targets, return_index=True)
+        first.sort()
+        directed_sources, directed_targets = directed_sources[first], directed_targets[first]
+
+        order = np.argsort(directed_sources, kind="stable")
+        offsets = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(directed_sources, minlength=self.size), out=offsets[1:])
+        return _to_array(offsets), _to_array(directed_targets[order])
+
+    def _build_python(self):
+        """Construye los arreglos CSR habitación a habitación."""
+        offsets = array("q", [0])
+        targets = array("q")
+        for index in range(self.size):
+            targets.extend(neighbour_indices(index, self.stride, self.size))
+            offsets.append(len(targets))
+        return offsets, targets
+
+    def _build_numpy(self):
+        """Construye los arreglos CSR con NumPy: hasta tres candidatos por habitación, -1 si no existe."""
+        stride, size = self.stride, self.size
+        index = np.arange(size, dtype=np.int64)
+        room_number = index % stride
+        staircase = room_number == 0
+        candidates = np.full((size, 3), -1, dtype=np.int64)
+        # Escaleras: pasillo, piso inferior y piso superior
+        if stride > 1:
+            candidates[staircase, 0] = index[staircase] + 1
+        below = staircase & (index >= stride)
+        candidates[below, 1] = index[below] - stride
+        above = staircase & (index + stride < size)
+        candidates[above, 2] = index[above] + stride
+        # Habitaciones regulares: anterior y siguiente del pasillo
+        regular = ~staircase
+        candidates[regular, 0] = index[regular] - 1
+        following = regular & (room_number < stride - 1)
+        candidates[following, 1] = index[following] + 1
+
+        present = candidates >= 0
+        offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(present.sum(axis=1), out=offsets[1:])
+        return _to_array(offsets), _to_array(candidates[present])
+
+    def neighbours(self, index):
+        """
+        Obtiene los índices de las habitaciones adyacentes a una habitación.
+
+        Args:
+            index (int): El índice plano de la habitación
+
+        Returns:
+            array: Los índices planos de las habitaciones adyacentes
+        """
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+
+def _to_array(values):
+    """Convierte un arreglo de NumPy de enteros de 64 bits en un array "q"."""
+    result = array("q")
+    result.frombytes(memoryview(np.ascontiguousarray(values, dtype=np.int64)).cast("B"))
+    return result
+
+
+@functools.lru_cache(maxsize=TOPOLOGY_CACHE_SIZE)
+def building_topology(floors_count, rooms_per_floor):
+    """
+    Obtiene la topología de un edificio, construyéndola solo la primera vez
+    que se pide cada forma.
+
+    Args:
+        floors_count (int): El número de pisos
+        rooms_per_floor (int): El número de habitaciones regulares en cada piso
+
+    Returns:
+        BuildingTopology: La topología compartida
+    """
+    return BuildingTopology(floors_count, rooms_per_floor)
@@ -0,0 +1,141 @@
+"""
+Índice de ocupación: qué practicantes hay en cada habitación del edificio.
+
+Con miles de practicantes no se puede comparar cada movimiento de un zombi con
+la posición de cada uno. El índice agrupa a los practicantes por el índice
+plano de su habitación, así que cuando un zombi entra en una habitación basta
+una consulta O(1) para capturar a todos sus ocupantes, y el estado se resume
+por habitación (cuántos hay en cada una) en lugar de uno por persona.
+"""
+
+
+class Occupancy:
+    """
+    Practicantes del edificio agrupados por habitación.
+
+    Los practicantes se recorren siempre en el orden en que se añadieron, de
+    modo que los movimientos (y los números aleatorios que consumen) son
+    reproducibles con la misma semilla.
+    """
+
+    def __init__(self, building):
+        """
+        Inicializa un índice vacío.
+
+        Args:
+            building: Building o CompactBuilding en el que están los practicantes
+        """
+        self.building = building
+        # Practicante -> índice de su habitación (en orden de llegada)
+        self._members = {}
+        # Índice de habitación -> {practicante: None} con sus ocupantes
+        self._rooms = {}
+        self.captured = 0
+
+    def add(self, practicante):
+        """
+        Añade un practicante en la habitación en la que se encuentra.
+
+        Args:
+            practicante (Practicante): El practicante
+        """
+        index = self.building.location_to_index(*practicante.get_location())
+        self._members[practicante] = index
+        self._rooms.setdefault(index, {})[practicante] = None
+
+    def move(self, practicante, index):
+        """
+        Mueve un practicante a otra habitación.
+
+        Args:
+            practicante (Practicante): Un practicante del índice
+            index (int): El índice plano de la habitación de destino
+        """
+        previous = self._members[practicante]
+        occupants = self._rooms[previous]
+        del occupants[practicante]
+        if not occupants:
+            del self._rooms[previous]
+        self._members[practicante] = index
+        self._rooms.setdefault(index, {})[practicante] = None
+        practicante.move_to(*self.building.index_to_location(index))
+
+    def capture(self, index):
+        """
+        Captura a todos los ocupantes de una habitación (un zombi acaba de entrar).
+
+        Args:
+            index (int): El índice plano de la habitación
+
+        Returns:
+            int: Número de practicantes capturados
+        """
+        occupants = self._rooms.pop(index, None)
+        if not occupants:
+            return 0
+        for practicante in occupants:
+            del self._members[practicante]
+        self.captured += len(occupants)
+        return len(occupants)
+
+    def clear(self):
+        """Elimina a todos los practicantes y reinicia el contador de capturas."""
+        self._members.clear()
+        self._rooms.clear()
+        self.captured = 0
+
+    def count(self, index):
+        """
+        Obtiene el número de practicantes en una habitación.
+
+        Args:
+            index (int): El índice plano de la habitación
+
+        Returns:
+            int: Número de ocupantes
+        """
+        return len(self._rooms.get(index, ()))
+
+    @property
+    def first(self):
+        """Practicante: El primer practicante añadido que sigue en el edificio, o None."""
+        return next(iter(self._members), None)
+
+    def items(self):
+        """
+        Obtiene los practicantes con el índice de su habitación, en orden de llegada.
+
+        Returns:
+            list: Pares (practicante, índice plano)
+        """
+        return list(self._members.items())
+
+    def occupied_indices(self):
+        """
+        Obtiene las habitaciones con algún practicante.
+
+        Returns:
+            list: Los índices planos de las habitaciones ocupadas
+        """
+        return list(self._rooms)
+
+    def summary(self):
+        """
+        Resume la ocupación por habitación.
+
+        Returns:
+            dict: Número de practicantes ("count"), capturados ("captured") y
+                lista "rooms" de [piso, habitación, ocupantes] ordenada
+        """
+        index_to_location = self.building.index_to_location
+        return {
+            "count": len(self._members),
+            "captured": self.captured,
+            "rooms": [[*index_to_location(index), len(self._rooms[index])] for index in sorted(self._rooms)],
+        }
+
+    def __len__(self):
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(list(self._members))
@@ -0,0 +1,223 @@
+"""
+Perfilado bajo demanda de los turnos de una simulación.
+
+Un TurnProfiler se arma sobre una simulación para los próximos N turnos o los
+próximos T segundos: cada advance_turn de ese intervalo se ejecuta bajo
+cProfile y el resto del tiempo no se mide nada. Los resultados se obtienen
+ordenados por tiempo acumulado, como archivo pstats (para pstats, snakeviz...)
+o como pilas colapsadas («a;b;c microsegundos») para flamegraph.pl o speedscope.
+
+cProfile solo registra las relaciones llamador-llamado, no las pilas completas;
+collapsed() reconstruye las pilas repartiendo el tiempo de cada función entre
+sus llamadores en proporción al tiempo acumulado de cada llamada, así que las
+pilas son una aproximación (exacta cuando cada función tiene un solo llamador).
+"""
+
+import cProfile
+import marshal
+import os
+import threading
+import time
+
+# Criterios de ordenación de stats()
+SORT_KEYS = ("cumulative", "tottime", "calls")
+
+# Formatos de descarga del perfil
+FORMATS = ("json", "pstats", "collapsed")
+
+# Profundidad máxima y tiempo mínimo (segundos) de las pilas colapsadas
+MAX_STACK_DEPTH = 64
+MIN_STACK_SECONDS = 1e-6
+
+# Nombre con el que cProfile registra su propia desactivación al final de cada turno
+PROFILER_DISABLE = "<method 'disable' of '_lsprof.Profiler' objects>"
+
+# cProfile no admite varios perfiles activos a la vez en el mismo proceso:
+# los turnos perfilados de distintas simulaciones se ejecutan de uno en uno
+_profile_lock = threading.Lock()
+
+
+def function_label(function):
+    """
+    Nombre legible de una función de las estadísticas de cProfile.
+
+    Args:
+        function (tuple): (archivo, línea, nombre) según cProfile
+
+    Returns:
+        str: «nombre (archivo:línea)», o el nombre de las funciones integradas
+    """
+    filename, line, name = function
+    if filename == "~" and line == 0:
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class TurnProfiler:
+    """
+    Perfil de cProfile de los próximos turnos de una simulación.
+    """
+
+    def __init__(self, turns=None, seconds=None):
+        """
+        Arma el perfilador para un número de turnos o una duración.
+
+        Args:
+            turns (int): Número de turnos a perfilar
+            seconds (float): Segundos durante los que se perfilan los turnos
+
+        Raises:
+            ValueError: Si no se indica exactamente uno de los dos límites o no es positivo
+        """
+        if (turns is None) == (seconds is None):
+            raise ValueError("Indica un número de turnos o una duración, no ambos")
+        if turns is not None and turns < 1:
+            raise ValueError("El número de turnos debe ser al menos 1")
+        if seconds is not None and seconds <= 0:
+            raise ValueError("La duración debe ser positiva")
+        self.turns = turns
+        self.seconds = seconds
+        self.armed_at = time.monotonic()
+        self.deadline = self.armed_at + seconds if seconds is not None else None
+        self.turns_profiled = 0
+        self.profiled_seconds = 0.0
+        self._profile = cProfile.Profile()
+
+    @property
+    def done(self):
+        """bool: True si ya se alcanzó el número de turnos o terminó la duración."""
+        if self.turns is not None:
+            return self.turns_profiled >= self.turns
+        return time.monotonic() >= self.deadline
+
+    def run(self, advance):
+        """
+        Ejecuta un turno, perfilándolo si el perfilador sigue armado.
+
+        Args:
+            advance (callable): Función que avanza el turno
+
+        Returns:
+            El resultado de advance()
+        """
+        if self.done:
+            return advance()
+        with _profile_lock:
+            start = time.perf_counter()
+            self._profile.enable()
+            try:
+                return advance()
+            finally:
+                self._profile.disable()
+                self.profiled_seconds += time.perf_counter() - start
+                self.turns_profiled += 1
+
+    def status(self):
+        """
+        Estado del perfilador.
+
+        Returns:
+            dict: Límites pedidos, turnos y segundos perfilados hasta ahora y si ha terminado
+        """
+        remaining = None
+        if self.deadline is not None:
+            remaining = max(0.0, self.deadline - time.monotonic())
+        return {
+            "turns": self.turns,
+            "seconds": self.seconds,
+            "seconds_remaining": remaining,
+            "turns_profiled": self.turns_profiled,
+            "profiled_seconds": self.profiled_seconds,
+            "done": self.done,
+        }
+
+    def raw_stats(self):
+        """
+        Estadísticas en el formato de pstats.
+
+        Returns:
+            dict: función -> (llamadas primitivas, llamadas, tiempo propio,
+                tiempo acumulado, {llamador: estadísticas de la llamada})
+        """
+        self._profile.create_stats()
+        return self._profile.stats
+
+    def stats(self, limit=30, sort="cumulative"):
+        """
+        Funciones más costosas de los turnos perfilados.
+
+        Args:
+            limit (int): Número máximo de funciones
+            sort (str): Criterio de ordenación, uno de SORT_KEYS
+
+        Returns:
+            list: Diccionarios con la función, llamadas y tiempos en segundos
+
+        Raises:
+            ValueError: Si el criterio de ordenación no existe
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Criterio de ordenación desconocido: {sort}")
+        column = {"cumulative": 3, "tottime": 2, "calls": 1}[sort]
+        rows = sorted(self.raw_stats().items(), key=lambda item: item[1][column], reverse=True)
+        return [
+            {
+                "function": function_label(function),
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "tottime": tottime,
+                "cumtime": cumtime,
+            }
+            for function, (primitive_calls, calls, tottime, cumtime, _) in rows[:limit]
+        ]
+
+    def pstats_bytes(self):
+        """
+        Perfil en el formato de archivo de pstats (el de Stats.dump_stats).
+
+        Returns:
+            bytes: El perfil, legible con pstats.Stats(ruta)
+        """
+        return marshal.dumps(self.raw_stats())
+
+    def collapsed(self):
+        """
+        Perfil como pilas colapsadas, una por línea: «raíz;...;función microsegundos»
+        con el tiempo propio de la función en esa pila.
+
+        Returns:
+            str: Las pilas, aptas para flamegraph.pl o speedscope
+        """
+        stats = self.raw_stats()
+        callees = {}
+        for function, (_, _, _, _, callers) in stats.items():
+            for caller, call in callers.items():
+                callees.setdefault(caller, []).append((function, call[3]))
+        # Raíces: funciones sin llamadores perfilados (normalmente advance_turn),
+        # salvo la llamada con la que el propio perfilador se desactiva
+        roots = [function for function, entry in stats.items()
+                 if not any(c in stats for c in entry[4]) and function[2] != PROFILER_DISABLE]
+
+        weights = {}
+
+        def walk(function, path, fraction):
+            _, _, tottime, cumtime, _ = stats[function]
+            path = path + (function,)
+            own = tottime * fraction
+            if own >= MIN_STACK_SECONDS:
+                key = ";".join(function_label(f).replace(";", ",") for f in path)
+                weights[key] = weights.get(key, 0.0) + own
+            if len(path) >= MAX_STACK_DEPTH:
+                return
+            for callee, call_cumtime in callees.get(function, ()):
+                callee_cumtime = stats[callee][3]
+                if callee in path or callee_cumtime <= 0:
+                    continue
+                share = fraction * call_cumtime / callee_cumtime
+                if share * callee_cumtime >= MIN_STACK_SECONDS:
+                    walk(callee, path, share)
+
+        for root in roots:
+            walk(root, (), 1.0)
+        lines = [f"{stack} {round(seconds * 1e6)}" for stack, seconds in sorted(weights.items())]
+        return "\n".join(line for line in lines if not line.endswith(" 0")) + "\n"
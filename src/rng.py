@@ -0,0 +1,62 @@
+"""
+Generadores de números aleatorios deterministas para la simulación.
+
+Cada Simulation tiene su propio generador con semilla, del que se derivan
+flujos hijos por subsistema (movimiento, generación de zombis, arma secreta...).
+La semilla de un flujo hijo depende solo de la semilla del padre y del nombre
+del flujo, no de cuántos números se hayan extraído, así que las ejecuciones
+paralelas o por lotes son reproducibles bit a bit.
+"""
+
+import hashlib
+import random
+
+
+def derive_seed(seed, name):
+    """
+    Deriva una semilla de 64 bits para un flujo hijo.
+
+    Args:
+        seed (int): Semilla del flujo padre
+        name (str): Nombre del flujo hijo
+
+    Returns:
+        int: Semilla de 64 bits del flujo hijo
+    """
+    digest = hashlib.blake2b(f"{seed}/{name}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SimulationRandom(random.Random):
+    """
+    Generador aleatorio con semilla que puede derivar flujos hijos independientes.
+    Ofrece la misma API que el módulo random (choice, random, sample, randrange...).
+    """
+
+    def __init__(self, seed=None):
+        """
+        Inicializa el generador.
+
+        Args:
+            seed (int): Semilla del generador; si es None se elige una al azar
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed_value = seed
+        super().__init__(seed)
+
+    def fork(self, name):
+        """
+        Crea un flujo hijo con nombre.
+
+        Args:
+            name (str): Nombre del subsistema que usará el flujo
+
+        Returns:
+            SimulationRandom: Un generador nuevo cuya semilla se deriva de esta y del nombre
+        """
+        return SimulationRandom(derive_seed(self.seed_value, name))
+
+    def __reduce__(self):
+        # Conservar la semilla original al serializar el generador
+        return (self.__class__, (self.seed_value,), self.getstate())
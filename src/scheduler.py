@@ -0,0 +1,191 @@
+"""
+Ejecución automática de la simulación como tarea de asyncio.
+
+El AutoRunner avanza la simulación a un ritmo fijo de turnos por segundo o, en
+modo de avance rápido, tan deprisa como puede hasta un número de turnos o el
+final del juego. Es una tarea del bucle de eventos que ejecuta cada tanda de
+turnos en un hilo del ejecutor, de modo que esperar el cerrojo de la simulación
+no bloquea el bucle, y se cancela limpiamente al detenerlo, al reiniciar la
+simulación o al cerrar el servidor.
+"""
+
+import asyncio
+import contextlib
+
+from src import logger
+
+# Duración máxima (segundos) de cada tanda de turnos en modo de avance rápido
+# antes de ceder el bucle de eventos a otras peticiones
+FAST_FORWARD_SLICE = 0.02
+
+# Motivos por los que termina una ejecución automática
+STOP_REASONS = ("stopped", "game_over", "no_building", "turn_limit", "error")
+
+
+class AutoRunner:
+    """
+    Avanza una simulación automáticamente en una tarea de asyncio.
+    """
+
+    def __init__(self, get_simulation, lock=None, slice_seconds=FAST_FORWARD_SLICE):
+        """
+        Inicializa el ejecutor.
+
+        Args:
+            get_simulation (callable): Devuelve la simulación actual; se llama en
+                cada tanda, así que sigue funcionando si la simulación se sustituye
+            lock: Cerrojo de la simulación, tomado mientras se avanzan turnos
+            slice_seconds (float): Duración máxima de cada tanda en avance rápido
+        """
+        self._get_simulation = get_simulation
+        self._lock = lock or contextlib.nullcontext()
+        self.slice_seconds = slice_seconds
+        self._task = None
+        self._batch = None
+        self.ticks_per_second = None
+        self.fast_forward = False
+        self.turn_limit = None
+        self.turns_run = 0
+        self.stop_reason = None
+
+    @property
+    def running(self):
+        """True mientras la ejecución automática está en marcha."""
+        return self._task is not None and not self._task.done()
+
+    def status(self):
+        """
+        Obtiene el estado de la ejecución automática.
+
+        Returns:
+            dict: Si está en marcha, el modo, los turnos ejecutados y el motivo de parada
+        """
+        return {
+            "auto_running": self.running,
+            "ticks_per_second": self.ticks_per_second,
+            "fast_forward": self.fast_forward,
+            "turn_limit": self.turn_limit,
+            "turns_run": self.turns_run,
+            "stop_reason": self.stop_reason,
+        }
+
+    async def start(self, ticks_per_second=1.0, turns=None, fast_forward=False):
+        """
+        Inicia (o reinicia con otra configuración) la ejecución automática.
+
+        Args:
+            ticks_per_second (float): Turnos por segundo en el modo normal
+            turns (int): Número máximo de turnos a ejecutar (por defecto, sin límite)
+            fast_forward (bool): Avanzar tan rápido como sea posible
+
+        Raises:
+            ValueError: Si el ritmo o el número de turnos no son positivos
+        """
+        if not fast_forward and not ticks_per_second > 0:
+            raise ValueError("El número de turnos por segundo debe ser positivo")
+        if turns is not None and turns < 1:
+            raise ValueError("El número de turnos debe ser al menos 1")
+
+        await self.stop()
+        self.ticks_per_second = None if fast_forward else ticks_per_second
+        self.fast_forward = fast_forward
+        self.turn_limit = turns
+        self.turns_run = 0
+        self.stop_reason = None
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        mode = "avance rápido" if fast_forward else f"{ticks_per_second} turnos/s"
+        logger.info("Ejecución automática iniciada (%s, límite %s)", mode, turns)
+
+    async def stop(self):
+        """Detiene la ejecución automática y espera a que la tarea y su tanda en curso terminen."""
+        task = self._task
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        batch = self._batch
+        if batch is not None:
+            with contextlib.suppress(Exception):
+                await batch
+
+    def cancel(self):
+        """
+        Cancela la ejecución automática sin esperar a que termine.
+        Puede llamarse desde cualquier hilo.
+        """
+        task = self._task
+        if task is not None and not task.done():
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def _run_turns(self, max_turns, deadline=None, clock=None):
+        """
+        Avanza hasta max_turns turnos con una sola toma del cerrojo.
+
+        Args:
+            max_turns (int): Número máximo de turnos de la tanda
+            deadline (float): Instante a partir del cual se termina la tanda
+            clock (callable): Reloj con el que se compara deadline
+
+        Returns:
+            bool: True si la ejecución debe continuar
+        """
+        with self._lock:
+            simulation = self._get_simulation()
+            for _ in range(max_turns):
+                if self.turn_limit is not None and self.turns_run >= self.turn_limit:
+                    self.stop_reason = "turn_limit"
+                    return False
+                if not simulation.building:
+                    self.stop_reason = "no_building"
+                    return False
+                if simulation.is_game_over():
+                    self.stop_reason = "game_over"
+                    return False
+                simulation.advance_turn()
+                self.turns_run += 1
+                if deadline is not None and clock() >= deadline:
+                    break
+        return True
+
+    async def _run_batch(self, *args):
+        """
+        Ejecuta una tanda de _run_turns en un hilo del ejecutor.
+
+        Returns:
+            bool: True si la ejecución debe continuar
+        """
+        self._batch = asyncio.get_running_loop().run_in_executor(None, self._run_turns, *args)
+        # Si se cancela la tarea, la tanda termina igualmente en su hilo; stop() la espera
+        return await asyncio.shield(self._batch)
+
+    async def _run(self):
+        """Tarea de asyncio de la ejecución automática."""
+        loop = asyncio.get_running_loop()
+        try:
+            if self.fast_forward:
+                while await self._run_batch(self.turn_limit or 2 ** 62, loop.time() + self.slice_seconds, loop.time):
+                    # Ceder el bucle entre tandas para atender otras peticiones
+                    await asyncio.sleep(0)
+            else:
+                period = 1.0 / self.ticks_per_second
+                next_tick = loop.time()
+                while await self._run_batch(1):
+                    # Los instantes de cada turno se calculan desde el inicio, así
+                    # que el ritmo no deriva con el tiempo que tarda cada turno
+                    next_tick += period
+                    delay = next_tick - loop.time()
+                    if delay < -period:
+                        # Demasiado retraso: reanudar el ritmo sin ráfagas de turnos
+                        next_tick = loop.time()
+                        delay = 0
+                    await asyncio.sleep(max(delay, 0))
+        except asyncio.CancelledError:
+            self.stop_reason = "stopped"
+            raise
+        except Exception as e:
+            self.stop_reason = "error"
+            logger.error("Error en la ejecución automática: %s", e)
+        finally:
+            logger.info("Ejecución automática detenida tras %s turnos (%s)", self.turns_run, self.stop_reason)
@@ -0,0 +1,201 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, File, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any, Literal
+from src.sessions import SimulationRegistry, RegistryFullError, DEFAULT_CAPACITY, DEFAULT_IDLE_TIMEOUT
+from src.api_state import (state_response, advance_params, advance_in_threadpool, run_locked, STREAM_HEADERS,
+                           require_admin, profile_params, profile_response, add_practicantes,
+                           layout_params, read_uploaded_layout, setup_from_layout)
+from src.simulation import MAX_ADVANCE_TURNS, MAX_ADDED_PRACTICANTES
+from src.sharded import MAX_SHARD_WORKERS
+import os
+
+# Registry of independent simulations, one per session.
+# Capacity and idle timeout can be tuned with ZOMBIE_MAX_SESSIONS and ZOMBIE_SESSION_IDLE_SECONDS.
+registry = SimulationRegistry(
+    capacity=int(os.environ.get("ZOMBIE_MAX_SESSIONS", DEFAULT_CAPACITY)),
+    idle_timeout=float(os.environ.get("ZOMBIE_SESSION_IDLE_SECONDS", DEFAULT_IDLE_TIMEOUT)),
+)
+
+router = APIRouter(prefix="/api/sessions", tags=["Sessions"])
+
+class SessionConfig(BaseModel):
+    engine: Literal["auto", "reference", "sharded"] = Field("auto", description="Turn engine of the simulation ('sharded' splits the floors of a compact building across worker processes)")
+    seed: Optional[int] = Field(None, ge=0, description="Random seed for a reproducible simulation")
+    workers: Optional[int] = Field(None, ge=1, le=MAX_SHARD_WORKERS, description="Worker processes of the sharded engine (default: one per core)")
+
+class SessionBuildingConfig(BaseModel):
+    floors: int = Field(3, ge=1, description="Number of floors in the building")
+    roomsPerFloor: int = Field(5, ge=1, description="Number of rooms per floor")
+    initialZombies: int = Field(1, ge=0, description="Initial number of zombies")
+    backend: Literal["objects", "compact"] = Field("objects", description="Building storage backend: 'objects' or 'compact' for very large buildings")
+    seed: Optional[int] = Field(None, ge=0, description="Random seed for a reproducible simulation")
+
+class SessionAutoRunConfig(BaseModel):
+    run: bool = Field(False, description="Whether to enable auto-running")
+    ticksPerSecond: float = Field(1.0, gt=0, le=1000, description="Turns per second when not fast-forwarding")
+    fastForward: bool = Field(False, description="Advance as fast as possible instead of at a fixed rate")
+    turns: Optional[int] = Field(None, ge=1, description="Stop after this many turns (default: until game over or stopped)")
+
+class SessionRoomAction(BaseModel):
+    floor: int = Field(..., ge=0, description="Floor index")
+    room: int = Field(..., ge=0, description="Room index")
+
+class SessionProfileConfig(BaseModel):
+    turns: Optional[int] = Field(None, ge=1, le=MAX_ADVANCE_TURNS, description="Profile the next N turns")
+    seconds: Optional[float] = Field(None, gt=0, le=3600, description="Profile the turns of the next T seconds")
+
+def get_session(session_id: str):
+    """Dependency that resolves a session ID to its session"""
+    session = registry.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    return session
+
+def require_building(session):
+    """Raise a 404 if the session has no building configured"""
+    if not session.simulation.building:
+        raise HTTPException(status_code=404, detail="No building configured")
+
+@router.post("", response_model=Dict[str, Any])
+def create_session(config: Optional[SessionConfig] = None):
+    """Create a new independent simulation and return its session ID"""
+    config = config or SessionConfig()
+    try:
+        session = registry.create(engine=config.engine, seed=config.seed, workers=config.workers)
+    except RegistryFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"session_id": session.id, "seed": session.simulation.seed}
+
+@router.get("", response_model=List[Dict[str, Any]])
+async def list_sessions():
+    """List the active sessions"""
+    return registry.list_sessions()
+
+@router.delete("/{session_id}", response_model=Dict[str, bool])
+def delete_session(session_id: str):
+    """Delete a session and its simulation"""
+    if not registry.remove(session_id):
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    return {"success": True}
+
+@router.get("/{session_id}/state", response_model=Dict[str, Any])
+def get_session_state(session=Depends(get_session),
+                      since: Optional[str] = Query(None, description="Only return rooms changed after this state version (<state_id>-<version>, the ETag value)"),
+                      if_none_match: Optional[str] = Header(None)):
+    """Get the current state of the session's simulation (supports ETag/If-None-Match and since=<state_id>-<version>)"""
+    with session.lock:
+        require_building(session)
+        return state_response(session.simulation, if_none_match, since)
+
+@router.get("/{session_id}/stream")
+async def stream_session_state(session=Depends(get_session)):
+    """Stream the session's state as Server-Sent Events: a snapshot followed by per-change diffs"""
+    return StreamingResponse(session.broadcaster.stream(session.lock), media_type="text/event-stream",
+                             headers=STREAM_HEADERS)
+
+@router.post("/{session_id}/setup", response_model=Dict[str, Any])
+def setup_session(config: SessionBuildingConfig, session=Depends(get_session)):
+    """Setup a new building for the session's simulation"""
+    with session.lock:
+        simulation = session.simulation
+        if config.seed is not None:
+            simulation.set_seed(config.seed)
+        result = simulation.setup_building(config.floors, config.roomsPerFloor, config.backend)
+        zombies_added = simulation.add_initial_zombies(config.initialZombies)
+
+        return {
+            "success": True,
+            "building": result,
+            "zombies_added": zombies_added
+        }
+
+@router.post("/{session_id}/setup-layout", response_model=Dict[str, Any])
+async def setup_session_from_layout(file: UploadFile = File(..., description="Building layout as JSON Lines or CSV"),
+                                    params: Dict[str, Any] = Depends(layout_params),
+                                    session=Depends(get_session)):
+    """Setup a new building for the session's simulation from an uploaded layout file"""
+    layout = await read_uploaded_layout(file, params)
+    return await run_locked(session.lock, lambda: setup_from_layout(session.simulation, layout, params))
+
+@router.post("/{session_id}/advance", response_model=Dict[str, Any])
+async def advance_session(params: Dict[str, Any] = Depends(advance_params), session=Depends(get_session)):
+    """Advance the session's simulation by one turn, or by several turns returning an aggregated summary"""
+    return await advance_in_threadpool(lambda: session.simulation, session.lock, params)
+
+@router.post("/{session_id}/add-zombie", response_model=Dict[str, Any])
+def add_session_zombie(session=Depends(get_session)):
+    """Add a zombie to a random room"""
+    with session.lock:
+        require_building(session)
+        return session.simulation.add_random_zombie()
+
+@router.post("/{session_id}/add-practicante", response_model=Dict[str, Any])
+def add_session_practicante(count: int = Query(1, ge=1, le=MAX_ADDED_PRACTICANTES, description="Number of practicantes to add"),
+                            session=Depends(get_session)):
+    """Add practicantes to random rooms without zombies"""
+    with session.lock:
+        require_building(session)
+        return add_practicantes(session.simulation, count)
+
+@router.post("/{session_id}/clean-room", response_model=Dict[str, Any])
+def clean_session_room(room_data: SessionRoomAction, session=Depends(get_session)):
+    """Clean a room (remove zombies)"""
+    with session.lock:
+        require_building(session)
+        return session.simulation.clean_room(room_data.floor, room_data.room)
+
+@router.post("/{session_id}/reset-sensor", response_model=Dict[str, Any])
+def reset_session_sensor(room_data: SessionRoomAction, session=Depends(get_session)):
+    """Reset a sensor in a room"""
+    with session.lock:
+        require_building(session)
+        return session.simulation.reset_sensor(room_data.floor, room_data.room)
+
+@router.post("/{session_id}/toggle-zombie-generation", response_model=Dict[str, Any])
+def toggle_session_zombie_generation(session=Depends(get_session)):
+    """Toggle automatic zombie generation"""
+    with session.lock:
+        return {"zombie_generation_enabled": session.simulation.toggle_zombie_generation()}
+
+@router.post("/{session_id}/use-secret-weapon", response_model=Dict[str, Any])
+def use_session_secret_weapon(session=Depends(get_session)):
+    """Use the secret weapon to clean multiple rooms"""
+    with session.lock:
+        require_building(session)
+        return {"cleaned_count": session.simulation.use_secret_weapon()}
+
+@router.post("/{session_id}/auto-run", response_model=Dict[str, Any])
+async def toggle_session_auto_run(config: SessionAutoRunConfig, session=Depends(get_session)):
+    """Start (or reconfigure) or stop automatic running of the session's simulation"""
+    if config.run:
+        await session.runner.start(config.ticksPerSecond, config.turns, config.fastForward)
+    else:
+        await session.runner.stop()
+    return session.runner.status()
+
+@router.get("/{session_id}/auto-run", response_model=Dict[str, Any])
+async def get_session_auto_run_status(session=Depends(get_session)):
+    """Get the status of automatic running of the session's simulation"""
+    return session.runner.status()
+
+@router.post("/{session_id}/profile", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+def start_session_profiling(config: SessionProfileConfig, session=Depends(get_session)):
+    """Arm a cProfile profiler for the next N turns or the turns of the next T seconds of the session's simulation"""
+    with session.lock:
+        try:
+            return session.simulation.start_profiling(config.turns, config.seconds)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{session_id}/profile", dependencies=[Depends(require_admin)])
+def get_session_profile(params: Dict[str, Any] = Depends(profile_params), session=Depends(get_session)):
+    """Get the profiler status and stats sorted by cumulative time, or download them as pstats or collapsed stacks"""
+    with session.lock:
+        return profile_response(session.simulation, params)
+
+@router.delete("/{session_id}/profile", response_model=Dict[str, bool], dependencies=[Depends(require_admin)])
+def stop_session_profiling(session=Depends(get_session)):
+    """Disarm the profiler of the session's simulation and discard its stats"""
+    with session.lock:
+        return {"success": session.simulation.stop_profiling() is not None}
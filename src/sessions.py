@@ -0,0 +1,250 @@
+"""
+Registro de simulaciones por sesión.
+
+Cada sesión tiene su propia Simulation y su propio cerrojo, de modo que varios
+operadores pueden manejar edificios independientes en el mismo proceso sin
+competir por un cerrojo global. Las sesiones que llevan demasiado tiempo sin
+usarse se eliminan y el número de sesiones simultáneas está limitado.
+"""
+
+import threading
+import time
+import uuid
+
+from src.simulation import Simulation
+from src.stream import StateBroadcaster
+from src.scheduler import AutoRunner
+from src import logger
+from src import metrics
+
+# Número máximo de sesiones simultáneas por defecto
+DEFAULT_CAPACITY = 64
+
+# Segundos sin actividad tras los que una sesión puede eliminarse
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+
+class RegistryFullError(Exception):
+    """Se lanza al crear una sesión cuando el registro ha alcanzado su capacidad."""
+
+
+class SimulationSession:
+    """
+    Una simulación registrada junto con su cerrojo y sus marcas de tiempo.
+    """
+
+    def __init__(self, session_id, simulation, now):
+        """
+        Inicializa la sesión.
+
+        Args:
+            session_id (str): Identificador de la sesión
+            simulation (Simulation): La simulación de la sesión
+            now (float): Instante de creación según el reloj del registro
+        """
+        self.id = session_id
+        self.simulation = simulation
+        self.lock = metrics.TimedLock("session")
+        self.broadcaster = StateBroadcaster(simulation)
+        self.runner = AutoRunner(lambda: self.simulation, self.lock)
+        self.created_at = now
+        self.last_access = now
+
+    def touch(self, now):
+        """
+        Marca la sesión como usada.
+
+        Args:
+            now (float): Instante actual según el reloj del registro
+        """
+        self.last_access = now
+
+    def is_idle(self, now, idle_timeout):
+        """
+        Comprueba si la sesión puede eliminarse por inactividad.
+        Una sesión cuyo cerrojo está tomado, con la ejecución automática en marcha
+        o con clientes suscritos a su flujo de estado está en uso y nunca se
+        considera inactiva.
+
+        Args:
+            now (float): Instante actual según el reloj del registro
+            idle_timeout (float): Segundos de inactividad permitidos
+
+        Returns:
+            bool: True si la sesión lleva más de idle_timeout segundos sin usarse
+        """
+        return (now - self.last_access > idle_timeout and not self.lock.locked()
+                and not self.runner.running and not self.broadcaster.subscriber_count)
+
+    def close(self):
+        """
+        Detiene la ejecución automática, termina los flujos de estado abiertos de
+        la sesión y detiene los procesos de su motor repartido.
+        """
+        self.runner.cancel()
+        self.broadcaster.close()
+        self.simulation.close()
+
+    def describe(self, now):
+        """
+        Obtiene un resumen de la sesión.
+
+        Args:
+            now (float): Instante actual según el reloj del registro
+
+        Returns:
+            dict: Identificador, turno, tamaño del edificio y segundos de inactividad
+        """
+        building = self.simulation.building
+        return {
+            "session_id": self.id,
+            "turn": self.simulation.turn,
+            "total_rooms": building.total_rooms if building else 0,
+            "idle_seconds": now - self.last_access,
+        }
+
+
+class SimulationRegistry:
+    """
+    Registro de simulaciones indexado por identificador de sesión.
+    El cerrojo del registro solo protege el diccionario de sesiones; las
+    operaciones sobre una simulación usan el cerrojo de su sesión.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, idle_timeout=DEFAULT_IDLE_TIMEOUT, clock=time.monotonic):
+        """
+        Inicializa el registro.
+
+        Args:
+            capacity (int): Número máximo de sesiones simultáneas
+            idle_timeout (float): Segundos sin actividad tras los que se elimina una sesión
+            clock (callable): Reloj que devuelve el instante actual en segundos
+
+        Raises:
+            ValueError: Si la capacidad o el tiempo de inactividad no son positivos
+        """
+        if capacity < 1:
+            raise ValueError("La capacidad del registro debe ser al menos 1")
+        if idle_timeout <= 0:
+            raise ValueError("El tiempo de inactividad debe ser positivo")
+        self.capacity = capacity
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, engine="auto", seed=None, workers=None):
+        """
+        Crea una sesión con una simulación nueva.
+        Antes de comprobar la capacidad se eliminan las sesiones inactivas.
+
+        Args:
+            engine (str): Motor de turno de la simulación
+            seed (int): Semilla de la simulación (por defecto, una al azar)
+            workers (int): Procesos del motor "sharded" (por defecto, uno por núcleo)
+
+        Returns:
+            SimulationSession: La sesión creada
+
+        Raises:
+            RegistryFullError: Si el registro sigue lleno tras eliminar las sesiones inactivas
+        """
+        simulation = Simulation(engine=engine, seed=seed, workers=workers)
+        with self._lock:
+            now = self._clock()
+            self._evict_idle_locked(now)
+            if len(self._sessions) >= self.capacity:
+                raise RegistryFullError(f"Se ha alcanzado el máximo de {self.capacity} sesiones")
+            session = SimulationSession(uuid.uuid4().hex, simulation, now)
+            self._sessions[session.id] = session
+        logger.info("Sesión %s creada (%s/%s)", session.id, len(self._sessions), self.capacity)
+        return session
+
+    def get(self, session_id):
+        """
+        Obtiene una sesión y la marca como usada.
+
+        Args:
+            session_id (str): Identificador de la sesión
+
+        Returns:
+            SimulationSession: La sesión, o None si no existe o ha caducado
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            now = self._clock()
+            if session.is_idle(now, self.idle_timeout):
+                del self._sessions[session_id]
+                session.close()
+                logger.info("Sesión %s eliminada por inactividad", session_id)
+                return None
+            session.touch(now)
+            return session
+
+    def remove(self, session_id):
+        """
+        Elimina una sesión.
+
+        Args:
+            session_id (str): Identificador de la sesión
+
+        Returns:
+            bool: True si la sesión existía
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        logger.info("Sesión %s eliminada", session_id)
+        return True
+
+    def evict_idle(self):
+        """
+        Elimina todas las sesiones inactivas.
+
+        Returns:
+            list: Identificadores de las sesiones eliminadas
+        """
+        with self._lock:
+            return self._evict_idle_locked(self._clock())
+
+    def _evict_idle_locked(self, now):
+        """Elimina las sesiones inactivas; el cerrojo del registro debe estar tomado."""
+        expired = [session_id for session_id, session in self._sessions.items()
+                   if session.is_idle(now, self.idle_timeout)]
+        for session_id in expired:
+            self._sessions.pop(session_id).close()
+            logger.info("Sesión %s eliminada por inactividad", session_id)
+        return expired
+
+    def close_all(self):
+        """
+        Elimina todas las sesiones, deteniendo sus ejecuciones automáticas y
+        sus flujos de estado (por ejemplo, al cerrar el servidor).
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def list_sessions(self):
+        """
+        Obtiene un resumen de las sesiones activas (eliminando antes las inactivas).
+
+        Returns:
+            list: Un diccionario por sesión (ver SimulationSession.describe)
+        """
+        with self._lock:
+            now = self._clock()
+            self._evict_idle_locked(now)
+            return [session.describe(now) for session in self._sessions.values()]
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
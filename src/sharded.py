@@ -0,0 +1,385 @@
+"""
+Motor de turnos repartido entre procesos por rangos de pisos.
+
+El edificio compacto se divide en rangos contiguos de pisos, uno por proceso.
+Los mapas de bits de zombis y alertas, los contadores por piso y la topología
+están en memoria compartida; mientras exista el motor el propio edificio
+trabaja sobre esos bloques (ver CompactBuilding.attach_state), así que el
+estado no se copia en cada turno. Cada turno se resuelve en dos fases
+separadas por una barrera:
+
+    1. Decidir: cada proceso busca los zombis de sus pisos y decide sus
+       movimientos con turn_kernel.decide_moves. Las decisiones leen el estado
+       inicial del turno, incluidas las habitaciones vecinas de otros fragmentos
+       (el halo: las escaleras de los pisos contiguos o las paradas de un
+       ascensor), que nadie modifica hasta la fase 2. Los movimientos cuyo
+       destino está en los pisos de otro proceso (los que cruzan una escalera o
+       un ascensor en el límite del fragmento) se agrupan por proceso de destino.
+    2. Aplicar: el proceso principal entrega a cada proceso los cruces que
+       llegan a sus pisos, y cada uno vacía sus orígenes, ocupa sus destinos y
+       actualiza alertas y contadores solo en sus pisos.
+
+Como el número aleatorio de cada zombi depende solo de (semilla, turno,
+habitación), el resultado no depende de cómo se repartan los pisos: es
+idéntico al del núcleo en un solo proceso con la misma semilla. El proceso
+principal mantiene los conjuntos de habitaciones infestadas y libres en el
+mismo orden que turn_kernel (el orden de las libres decide dónde aparecen los
+zombis generados), así que esa parte del turno no se reparte.
+"""
+
+import contextlib
+import multiprocessing
+import os
+import traceback
+import weakref
+from array import array
+from bisect import bisect_right
+from multiprocessing import shared_memory
+
+from src import turn_kernel
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+# Por debajo de este número de zombis el turno se calcula en el proceso
+# principal: repartirlo costaría más que calcularlo
+SHARD_MIN_ZOMBIES = 4096
+
+# Máximo de procesos que se aceptan desde la API
+MAX_SHARD_WORKERS = 256
+
+# Segundos que se espera a que un proceso termine al cerrar el motor
+SHUTDOWN_TIMEOUT = 5
+
+
+class ShardError(RuntimeError):
+    """Un proceso del motor repartido ha fallado o ha terminado inesperadamente."""
+
+
+def shard_ranges(floors_count, shards):
+    """
+    Reparte los pisos en rangos contiguos de tamaño lo más parecido posible.
+
+    Args:
+        floors_count (int): Número de pisos del edificio
+        shards (int): Número de fragmentos deseado (como mucho uno por piso)
+
+    Returns:
+        list: Pares (primer piso, piso siguiente al último) en orden
+    """
+    shards = max(1, min(shards, floors_count))
+    base, extra = divmod(floors_count, shards)
+    ranges = []
+    first = 0
+    for shard in range(shards):
+        stop = first + base + (shard < extra)
+        ranges.append((first, stop))
+        first = stop
+    return ranges
+
+
+def _block(nbytes):
+    """Crea un bloque de memoria compartida de al menos nbytes bytes."""
+    return shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+
+
+def _share(data):
+    """Crea un bloque de memoria compartida con una copia de los bytes dados."""
+    data = memoryview(data).cast("B")
+    block = _block(data.nbytes)
+    block.buf[:data.nbytes] = data
+    return block
+
+
+class _SharedTopology:
+    """Topología CSR leída de la memoria compartida (offsets y targets como vistas int64)."""
+
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+
+class _Shard:
+    """
+    Rango de pisos de un proceso sobre la memoria compartida. Tiene los
+    atributos del edificio que usa turn_kernel.decide_moves.
+    """
+
+    def __init__(self, blocks, floors_count, stride, edges_count, first_floor, stop_floor, bounds):
+        self.floors_count = floors_count
+        self.stride = stride
+        self.size = floors_count * stride
+        self.start = first_floor * stride
+        self.stop = stop_floor * stride
+        self.bounds = bounds
+        self.zombies = blocks["zombies"].buf[:self.size]
+        self.alerts = blocks["alerts"].buf[:self.size]
+        self.staircases = blocks["staircases"].buf[:self.size]
+        self.floor_counts = blocks["floor_counts"].buf[:8 * floors_count].cast("q")
+        self.topology = None
+        if "offsets" in blocks:
+            self.topology = _SharedTopology(blocks["offsets"].buf[:8 * (self.size + 1)].cast("q"),
+                                            blocks["targets"].buf[:8 * edges_count].cast("q"))
+        self._sources = None
+        self._targets = None
+
+    def _infested(self, use_numpy):
+        """Índices de las habitaciones infestadas del fragmento, en orden creciente."""
+        if use_numpy:
+            flags = np.frombuffer(self.zombies, dtype=np.uint8)[self.start:self.stop]
+            return np.flatnonzero(flags) + self.start
+        flags = self.zombies[self.start:self.stop].tobytes()
+        indices = []
+        position = flags.find(1)
+        while position >= 0:
+            indices.append(self.start + position)
+            position = flags.find(1, position + 1)
+        return indices
+
+    def decide(self, key, use_numpy):
+        """
+        Fase 1: decide los movimientos de los zombis del fragmento.
+
+        Returns:
+            tuple: (orígenes, destinos, cruces) con los índices en bytes int64;
+                cruces es un diccionario fragmento de destino -> destinos
+        """
+        sources, targets = turn_kernel.decide_moves(self, self._infested(use_numpy), key, use_numpy)
+        if use_numpy:
+            targets = np.asarray(targets, dtype=np.int64)
+            outside = (targets < self.start) | (targets >= self.stop)
+            crossing = targets[outside]
+            owners = np.searchsorted(self.bounds, crossing, side="right") - 1
+            crossings = {int(owner): crossing[owners == owner].tobytes() for owner in np.unique(owners)}
+            self._sources, self._targets = sources, targets[~outside]
+            return sources.tobytes(), targets.tobytes(), crossings
+        crossings = {}
+        own = []
+        for target in targets:
+            if self.start <= target < self.stop:
+                own.append(target)
+            else:
+                crossings.setdefault(bisect_right(self.bounds, target) - 1, array("q")).append(target)
+        self._sources, self._targets = sources, own
+        return (array("q", sources).tobytes(), array("q", targets).tobytes(),
+                {owner: crossing.tobytes() for owner, crossing in crossings.items()})
+
+    def apply(self, incoming, use_numpy):
+        """
+        Fase 2: aplica los movimientos del fragmento y los cruces que llegan a él.
+
+        Args:
+            incoming (list): Destinos en bytes int64 que llegan de otros fragmentos
+
+        Returns:
+            tuple: (destinos distintos en orden creciente en bytes int64, alertas nuevas)
+        """
+        stride = self.stride
+        if use_numpy:
+            zombies = np.frombuffer(self.zombies, dtype=np.uint8)
+            alerts = np.frombuffer(self.alerts, dtype=np.uint8)
+            staircases = np.frombuffer(self.staircases, dtype=np.uint8)
+            floor_counts = np.frombuffer(self.floor_counts, dtype=np.int64)
+            infested = np.unique(np.concatenate([self._targets] + [np.frombuffer(data, dtype=np.int64)
+                                                                    for data in incoming]))
+            alerted = infested[(staircases[infested] == 0) & (alerts[infested] == 0)]
+            zombies[self._sources] = 0
+            zombies[infested] = 1
+            alerts[alerted] = 1
+            np.subtract.at(floor_counts, self._sources // stride, 1)
+            np.add.at(floor_counts, infested // stride, 1)
+            return infested.tobytes(), int(alerted.size)
+
+        zombies, alerts, floor_counts = self.zombies, self.alerts, self.floor_counts
+        targets = set(self._targets)
+        for data in incoming:
+            crossing = array("q")
+            crossing.frombytes(data)
+            targets.update(crossing)
+        for index in self._sources:
+            zombies[index] = 0
+            floor_counts[index // stride] -= 1
+        new_alerts = 0
+        infested = sorted(targets)
+        for index in infested:
+            zombies[index] = 1
+            floor_counts[index // stride] += 1
+            if not self.staircases[index] and not alerts[index]:
+                alerts[index] = 1
+                new_alerts += 1
+        return array("q", infested).tobytes(), new_alerts
+
+
+def _run_shard(connection, blocks, floors_count, stride, edges_count, first_floor, stop_floor, bounds):
+    """Bucle de un proceso del motor: atiende las fases de cada turno hasta recibir None."""
+    shard = _Shard(blocks, floors_count, stride, edges_count, first_floor, stop_floor, bounds)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        try:
+            phase, argument, use_numpy = message
+            result = shard.decide(argument, use_numpy) if phase == "decide" else shard.apply(argument, use_numpy)
+            connection.send(("ok", result))
+        except Exception:
+            connection.send(("error", traceback.format_exc()))
+    # Los bloques se liberan al terminar el proceso; el principal los elimina
+    connection.close()
+
+
+def _shutdown(connections, processes, building_ref, views, blocks):
+    """
+    Detiene los procesos, devuelve al edificio su estado en arreglos propios y
+    libera la memoria compartida (también al recolectar el motor).
+    """
+    for connection in connections:
+        try:
+            connection.send(None)
+            connection.close()
+        except OSError:
+            pass
+    for process in processes:
+        process.join(SHUTDOWN_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    building = building_ref()
+    if building is not None:
+        building.detach_state()
+    for block in blocks:
+        block.unlink()
+    # Una vista que alguien conserve (por ejemplo, un arreglo de NumPy sobre el
+    # estado) impide cerrar el bloque; el sistema lo libera al soltarla
+    with contextlib.suppress(BufferError):
+        for view in views:
+            view.release()
+        for block in blocks:
+            block.close()
+
+
+class ShardedKernel:
+    """
+    Núcleo de movimiento de zombis del edificio compacto repartido entre
+    procesos, uno por rango contiguo de pisos. Produce los mismos movimientos
+    y el mismo estado que turn_kernel.advance_zombies.
+    """
+
+    def __init__(self, building, workers=None):
+        """
+        Reparte los pisos del edificio y arranca un proceso por rango.
+
+        Args:
+            building (CompactBuilding): El edificio a simular
+            workers (int): Número de procesos (por defecto, uno por núcleo; nunca
+                más que pisos)
+        """
+        self.building = building
+        # Topología con la que se arrancaron los procesos (cambia si se conectan habitaciones)
+        self.topology = building.topology
+        self.ranges = shard_ranges(building.floors_count, workers or os.cpu_count() or 1)
+        stride = building.stride
+        bounds = [first * stride for first, _ in self.ranges]
+
+        topology = building.topology
+        self._blocks = {
+            "zombies": _block(building.size),
+            "alerts": _block(building.size),
+            "staircases": _share(building.staircases),
+            "floor_counts": _block(8 * building.floors_count),
+        }
+        edges_count = 0
+        if topology is not None:
+            edges_count = len(topology.targets)
+            self._blocks["offsets"] = _share(topology.offsets)
+            self._blocks["targets"] = _share(topology.targets)
+        # El edificio trabaja directamente sobre la memoria compartida mientras
+        # exista el motor, así que los turnos no copian el estado
+        size = building.size
+        self._zombies = self._blocks["zombies"].buf[:size]
+        self._alerts = self._blocks["alerts"].buf[:size]
+        self._floor_counts_bytes = self._blocks["floor_counts"].buf[:8 * building.floors_count]
+        self._floor_counts = self._floor_counts_bytes.cast("q")
+        building.attach_state(self._zombies, self._alerts, self._floor_counts)
+
+        context = multiprocessing.get_context()
+        self._connections = []
+        self._processes = []
+        for first_floor, stop_floor in self.ranges:
+            connection, child = context.Pipe()
+            process = context.Process(target=_run_shard, daemon=True,
+                                      args=(child, self._blocks, building.floors_count, stride,
+                                            edges_count, first_floor, stop_floor, bounds))
+            process.start()
+            child.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+        self._finalizer = weakref.finalize(self, _shutdown, self._connections, self._processes,
+                                           weakref.ref(building),
+                                           [self._floor_counts, self._floor_counts_bytes,
+                                            self._zombies, self._alerts],
+                                           list(self._blocks.values()))
+
+    @property
+    def workers(self):
+        """int: Número de procesos del motor."""
+        return len(self._processes)
+
+    def _exchange(self, messages):
+        """Envía un mensaje a cada proceso y espera todas las respuestas (la barrera de cada fase)."""
+        for connection, message in zip(self._connections, messages):
+            connection.send(message)
+        results = []
+        for shard, connection in enumerate(self._connections):
+            try:
+                status, result = connection.recv()
+            except EOFError as error:
+                raise ShardError(f"El proceso del fragmento {shard} ha terminado") from error
+            if status != "ok":
+                raise ShardError(f"Error en el fragmento {shard}:\n{result}")
+            results.append(result)
+        return results
+
+    def advance(self, seed, turn):
+        """
+        Mueve todos los zombis del edificio un turno.
+
+        Args:
+            seed (int): Semilla del generador de movimientos
+            turn (int): Número de turno que se está simulando
+
+        Returns:
+            tuple: (sources, targets), como turn_kernel.advance_zombies
+
+        Raises:
+            ShardError: Si algún proceso falla
+        """
+        building = self.building
+        if building.infested_count < SHARD_MIN_ZOMBIES:
+            return turn_kernel.advance_zombies(building, seed, turn)
+        use_numpy = turn_kernel.prefers_numpy(building)
+
+        key = turn_kernel.turn_key(seed, turn)
+        decided = self._exchange([("decide", key, use_numpy)] * self.workers)
+        incoming = [[] for _ in decided]
+        for _, _, crossings in decided:
+            for owner, data in crossings.items():
+                incoming[owner].append(data)
+        applied = self._exchange([("apply", data, use_numpy) for data in incoming])
+
+        sources = array("q", b"".join(result[0] for result in decided)).tolist()
+        targets = array("q", b"".join(result[1] for result in decided)).tolist()
+        # Mismo orden de actualización que turn_kernel: destinos distintos en orden
+        # creciente (cada fragmento devuelve los suyos ordenados y los rangos son crecientes)
+        infested = array("q", b"".join(result[0] for result in applied)).tolist()
+        building.infested_count += len(infested) - len(sources)
+        building.alert_count += sum(result[1] for result in applied)
+        turn_kernel.update_room_sets(building, sources, infested)
+        return sources, targets
+
+    def close(self):
+        """Detiene los procesos y libera la memoria compartida."""
+        self._finalizer()
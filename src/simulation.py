@@ -1,28 +1,176 @@
-import random
 from src.models.building import Building
-from src.models.staircase import Staircase
+from src.models.compact_building import CompactBuilding
 from src.models.practicante import Practicante
+from src.models.layout import BuildingLayout, STAIRCASE, ELEVATOR
+from src.occupancy import Occupancy
 from src import logger
+from src import turn_kernel
+from src.sharded import ShardedKernel
+from src.rng import SimulationRandom
+from src.changes import ChangeTracker
+from src import snapshot
+from src import metrics
+from src.profiling import TurnProfiler
+from src.danger import DangerField
+import uuid
+
+# Backends de almacenamiento disponibles para el edificio
+BUILDING_BACKENDS = {
+    "objects": Building,
+    "compact": CompactBuilding,
+}
+
+# Límite de turnos por defecto de advance_turns cuando se avanza hasta el final del juego
+MAX_ADVANCE_TURNS = 100000
+
+# Número máximo de practicantes que se añaden en una sola petición de la API
+MAX_ADDED_PRACTICANTES = 100000
+
+# Generadores aleatorios que se guardan en las instantáneas
+RANDOM_STREAMS = ("rng", "movement_rng", "spawn_rng", "weapon_rng", "practicante_rng")
+
+# Motores de turno: "auto" usa el núcleo vectorizado cuando el edificio lo permite,
+# "reference" usa siempre la implementación por objetos y "sharded" reparte el
+# núcleo entre varios procesos por rangos de pisos (mismos resultados que "auto")
+ENGINES = ("auto", "reference", "sharded")
 
 class Simulation:
     """
     Gestiona la simulación de zombis, incluyendo el movimiento de zombis y el estado del juego.
     """
     
-    def __init__(self):
-        """Inicializa la simulación."""
+    def __init__(self, engine="auto", seed=None, workers=None):
+        """
+        Inicializa la simulación.
+        
+        Args:
+            engine (str): Motor de turno, "auto", "reference" o "sharded"
+            seed (int): Semilla del generador aleatorio de la simulación; con la misma
+                semilla las ejecuciones son reproducibles (por defecto, una al azar)
+            workers (int): Procesos del motor "sharded" (por defecto, uno por núcleo)
+            
+        Raises:
+            ValueError: Si el motor solicitado no existe
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Motor de turno desconocido: {engine}")
+        self.engine = engine
+        self.workers = workers
+        # Procesos del motor repartido (se arrancan en el primer turno que los necesita)
+        self.sharded_kernel = None
+        
+        self.set_seed(seed)
+        self.kernel_seed = None
         self.building = None
         self.turn = 0
         self.zombie_generation_enabled = False
-        self.practicante = None
+        # Practicantes agrupados por habitación (None hasta configurar el edificio)
+        self.occupancy = None
         self.game_over_reason = None
+        self._listeners = []
+        # Versión del estado: identifica esta simulación y aumenta con cada cambio
+        self.state_id = uuid.uuid4().hex
+        self.changes = ChangeTracker(0)
+        # Distancia de cada habitación al zombi más cercano, para mover a los practicantes
+        self.danger = DangerField()
+        # Perfilador de cProfile armado para los próximos turnos (None si no hay)
+        self.profiler = None
         logger.info("Simulación inicializada")
     
+    def set_seed(self, seed=None):
+        """
+        Reinicia el generador aleatorio de la simulación y sus flujos por subsistema.
+        
+        Args:
+            seed (int): Semilla del generador; si es None se elige una al azar
+        """
+        self.rng = SimulationRandom(seed)
+        self.seed = self.rng.seed_value
+        self.movement_rng = self.rng.fork("movement")
+        self.spawn_rng = self.rng.fork("spawning")
+        self.weapon_rng = self.rng.fork("weapon")
+        self.practicante_rng = self.rng.fork("practicante")
+        logger.debug("Generador de la simulación inicializado con semilla %s", self.seed)
+    
+    def add_listener(self, listener):
+        """
+        Registra una función que se llamará tras cada cambio de estado de la simulación.
+        La función recibe el tipo de evento y un diccionario con sus datos:
+        "setup" (edificio nuevo), "turn" (resultado de advance_turn), "rooms"
+        (acción del usuario "action" y lista "rooms" de ubicaciones modificadas),
+        "practicante" y "generation".
+        Se llama de forma síncrona, en el mismo hilo que modifica la simulación.
+        
+        Args:
+            listener (callable): Función listener(event, data)
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        """
+        Elimina una función registrada con add_listener (no hace nada si no estaba).
+        
+        Args:
+            listener (callable): La función a eliminar
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    @property
+    def version(self):
+        """Versión actual del estado; aumenta con cada cambio de la simulación."""
+        return self.changes.version
+
+    @property
+    def practicante(self):
+        """El primer practicante que sigue en el edificio, o None si no hay ninguno."""
+        if self.occupancy is None:
+            return None
+        return self.occupancy.first
+
+    @practicante.setter
+    def practicante(self, practicante):
+        """
+        Sustituye a todos los practicantes por uno solo (o por ninguno con None).
+
+        Raises:
+            ValueError: Si se asigna un practicante sin edificio configurado
+        """
+        if self.occupancy is None:
+            if practicante is not None:
+                raise ValueError("No hay edificio configurado para el practicante")
+            return
+        self.occupancy.clear()
+        if practicante is not None:
+            self.occupancy.add(practicante)
+
+    def _notify(self, event, data):
+        """Registra un cambio de estado en la versión y avisa a las funciones registradas."""
+        if event == "turn":
+            locations = set(data["vacated_rooms"])
+            locations.update(data["newly_infested"])
+            if data["new_zombie_location"]:
+                locations.add(data["new_zombie_location"])
+            self._mark_rooms_changed(locations)
+        elif event == "rooms":
+            self._mark_rooms_changed(data["rooms"])
+        elif event != "setup":
+            self.changes.bump()
+        
+        for listener in list(self._listeners):
+            listener(event, data)
+    
+    def _mark_rooms_changed(self, locations):
+        """Registra una nueva versión en la que cambiaron las habitaciones indicadas."""
+        location_to_index = self.building.location_to_index
+        self.changes.mark(location_to_index(floor_idx, room_idx) for floor_idx, room_idx in locations)
+    
     def toggle_zombie_generation(self):
         """Activa o desactiva la generación aleatoria de zombis."""
         self.zombie_generation_enabled = not self.zombie_generation_enabled
         status = "activada" if self.zombie_generation_enabled else "desactivada"
-        logger.info(f"Generación de zombis {status}")
+        logger.info("Generación de zombis %s", status)
+        self._notify("generation", {"enabled": self.zombie_generation_enabled})
         return self.zombie_generation_enabled
     
     def generate_random_zombie(self):
@@ -30,23 +178,17 @@ class Simulation:
         if not self.building:
             return False, None, None
 
-        # Obtener todas las habitaciones sin zombis
-        available_rooms = []
-        for floor_idx, floor in enumerate(self.building.floors):
-            for room_idx, room in enumerate(floor.get_rooms()):
-                if not room.has_zombies:
-                    available_rooms.append((floor_idx, room_idx))
-
-        if not available_rooms:
+        # Elegir una habitación aleatoria del conjunto de habitaciones libres
+        index = self.building.free_indices.sample(self.spawn_rng)
+        if index is None:
             logger.debug("No hay habitaciones disponibles para generar un nuevo zombi")
             return False, None, None
 
-        # Seleccionar una habitación aleatoria
-        floor_idx, room_idx = random.choice(available_rooms)
-        room = self.building.get_floor(floor_idx).get_room(room_idx)
+        room = self.building.get_room_by_index(index)
+        floor_idx, room_idx = self.building.locate_room(room)
         room.add_zombies()  # Usar el método específico de la clase
         
-        logger.debug(f"Nuevo zombi generado en piso {floor_idx}, habitación {room_idx}")
+        logger.debug("Nuevo zombi generado en piso %s, habitación %s", floor_idx, room_idx)
         return True, floor_idx, room_idx
     
     def add_random_zombie(self):
@@ -58,7 +200,8 @@ class Simulation:
         """
         success, floor_idx, room_idx = self.generate_random_zombie()
         if success:
-            logger.info(f"Usuario agregó un nuevo zombi manualmente en piso {floor_idx}, habitación {room_idx}")
+            logger.info("Usuario agregó un nuevo zombi manualmente en piso %s, habitación %s", floor_idx, room_idx)
+            self._notify("rooms", {"action": "add_zombie", "rooms": [(floor_idx, room_idx)]})
             return {
                 "added": True,
                 "floor": floor_idx,
@@ -80,57 +223,82 @@ class Simulation:
         if not self.building:
             return 0
             
-        cleaned_count = 0
-        zombie_rooms = []
-        
-        # Identificar todas las habitaciones con zombis
-        for floor_idx, floor in enumerate(self.building.floors):
-            for room_idx, room in enumerate(floor.get_rooms()):
-                if room.has_zombies:
-                    zombie_rooms.append((floor_idx, room_idx))
+        cleaned_rooms = []
+        log = logger.turn_budget()
         
         # Para cada habitación con zombis, hay un 50% de probabilidad de eliminarlos
-        for floor_idx, room_idx in zombie_rooms:
-            if random.random() < 0.5:  # 50% de probabilidad
-                room = self.building.get_floor(floor_idx).get_room(room_idx)
+        for index in self.building.infested_indices.sorted():
+            if self.weapon_rng.random() < 0.5:  # 50% de probabilidad
+                room = self.building.get_room_by_index(index)
                 room.has_zombies = False  # Eliminar el zombi pero no resetear el sensor
-                cleaned_count += 1
-                logger.debug(f"Arma secreta eliminó zombi en piso {floor_idx}, habitación {room_idx}")
-        
-        logger.info(f"Arma secreta utilizada: {cleaned_count} habitaciones limpiadas")
-        return cleaned_count
+                cleaned_rooms.append((room.floor_number, room.room_number))
+                if log:
+                    log.debug("Arma secreta eliminó zombi en piso %s, habitación %s", room.floor_number, room.room_number)
+        
+        if log:
+            log.finish(self.turn)
+        logger.info("Arma secreta utilizada: %s habitaciones limpiadas", len(cleaned_rooms))
+        self._notify("rooms", {"action": "secret_weapon", "rooms": cleaned_rooms})
+        return len(cleaned_rooms)
     
-    def setup_building(self, floors_count, rooms_per_floor):
+    def setup_building(self, floors_count=None, rooms_per_floor=None, backend="objects", layout=None):
         """
         Configura un nuevo edificio para la simulación.
         
         Args:
-            floors_count (int): El número de pisos
-            rooms_per_floor (int): El número de habitaciones regulares por piso (sin contar la escalera)
+            floors_count (int): El número de pisos (por defecto, el del plano)
+            rooms_per_floor (int): El número de habitaciones regulares por piso
+                (sin contar la escalera; por defecto, el del plano)
+            backend (str): Almacenamiento del edificio: "objects" (un objeto por habitación)
+                o "compact" (arreglos planos, para edificios muy grandes)
+            layout (BuildingLayout): Plano general del edificio (por defecto, el
+                plano clásico de pasillos con la escalera en la habitación 0)
             
         Returns:
             dict: Un diccionario con información sobre el edificio configurado
+            
+        Raises:
+            ValueError: Si el backend solicitado no existe o el plano no tiene
+                las dimensiones indicadas
         """
-        self.building = Building(floors_count, rooms_per_floor)
-        logger.info(f"Edificio configurado con {floors_count} pisos y {rooms_per_floor} habitaciones regulares por piso")
-        
-        # Cada piso tiene rooms_per_floor habitaciones regulares + 1 escalera
+        if backend not in BUILDING_BACKENDS:
+            raise ValueError(f"Backend de edificio desconocido: {backend}")
+        if layout is not None:
+            floors_count = layout.floors_count if floors_count is None else floors_count
+            rooms_per_floor = layout.rooms_per_floor if rooms_per_floor is None else rooms_per_floor
+        
+        # Los procesos del motor repartido trabajan sobre el edificio anterior
+        self.close()
+        self.building = BUILDING_BACKENDS[backend](floors_count, rooms_per_floor, layout=layout)
+        # Con un edificio nuevo todas las habitaciones cambian en la siguiente versión
+        self.changes = ChangeTracker(self.building.total_rooms, self.changes.version + 1)
+        # Semilla del generador de movimientos del núcleo vectorizado
+        self.kernel_seed = self.movement_rng.getrandbits(64)
+        logger.info("Edificio configurado con %s pisos y %s habitaciones regulares por piso (backend %s)", floors_count, rooms_per_floor, backend)
+        
+        # Cada piso tiene rooms_per_floor + 1 posiciones; en el plano clásico,
+        # rooms_per_floor habitaciones regulares + 1 escalera
         rooms_with_stairs_per_floor = rooms_per_floor + 1
         total_rooms = floors_count * rooms_with_stairs_per_floor
-        staircases_count = floors_count  # Una escalera por piso
-        normal_rooms_count = floors_count * rooms_per_floor  # Total de habitaciones regulares
+        staircases_count = self.building.staircases.count(STAIRCASE)
+        elevators_count = self.building.staircases.count(ELEVATOR)
+        normal_rooms_count = total_rooms - staircases_count - elevators_count  # Total de habitaciones regulares
         
         # Reiniciar variables de estado
-        self.practicante = None
+        self.occupancy = Occupancy(self.building)
         self.game_over_reason = None
         
+        self._notify("setup", {})
+        
         return {
             "floors": floors_count,
             "rooms_per_floor": rooms_per_floor,
             "rooms_with_stairs_per_floor": rooms_with_stairs_per_floor,
             "staircases": staircases_count,
+            "elevators": elevators_count,
             "normal_rooms": normal_rooms_count,
-            "total_rooms": total_rooms
+            "total_rooms": total_rooms,
+            "backend": backend
         }
     
     def add_initial_zombies(self, count=1):
@@ -147,28 +315,40 @@ class Simulation:
             logger.warning("Intento de añadir zombis sin edificio configurado")
             return []
             
-        logger.info(f"Añadiendo {count} zombis iniciales")
+        logger.info("Añadiendo %s zombis iniciales", count)
         zombies_added = []
+        log = logger.turn_budget()
         
-        all_rooms = [(floor_idx, room_idx) 
-                    for floor_idx, floor in enumerate(self.building.floors)
-                    for room_idx, _ in enumerate(floor.get_rooms())]
+        # Elegir ubicaciones aleatorias para los zombis sin construir la lista de habitaciones
+        total_rooms = self.building.total_rooms
+        indices = self.spawn_rng.sample(range(total_rooms), min(count, total_rooms))
         
-        # Elegir ubicaciones aleatorias para los zombis
-        locations = random.sample(all_rooms, min(count, len(all_rooms)))
-        
-        for floor_idx, room_idx in locations:
-            room = self.building.get_floor(floor_idx).get_room(room_idx)
+        for index in indices:
+            room = self.building.get_room_by_index(index)
+            floor_idx, room_idx = self.building.locate_room(room)
             # Usar el método add_zombies que maneja correctamente tanto habitaciones como escaleras
             room.add_zombies()
             zombies_added.append((floor_idx, room_idx))
-            logger.debug(f"Zombi añadido en piso {floor_idx}, habitación {room_idx}")
-            
+            if log:
+                log.debug("Zombi añadido en piso %s, habitación %s", floor_idx, room_idx)
+        
+        if log:
+            log.finish(self.turn)
+        self._notify("rooms", {"action": "initial_zombies", "rooms": zombies_added})
         return zombies_added
     
+    def _practicante_rooms(self):
+        """Índices planos de las habitaciones regulares (no escaleras ni ascensores) sin zombis, en orden."""
+        building = self.building
+        staircases = building.staircases
+        infested = building.infested_indices
+        return [index for index in range(building.total_rooms)
+                if not staircases[index] and index not in infested]
+
     def add_practicante(self):
         """
         Añade un practicante (interno) a una habitación aleatoria sin zombis.
+        Puede haber varios practicantes en el edificio (ver add_practicantes).
         
         Returns:
             dict: Información sobre el practicante añadido, o error si no se pudo añadir
@@ -177,172 +357,203 @@ class Simulation:
             logger.warning("Intento de agregar practicante sin edificio configurado")
             return {"error": "No hay edificio configurado"}
         
-        # Si ya hay un practicante, no añadir otro
-        if self.practicante:
-            logger.warning("Ya existe un practicante en la simulación")
-            return {"error": "Ya existe un practicante en la simulación"}
-        
-        # Obtener todas las habitaciones normales sin zombis
-        available_rooms = []
-        for floor_idx, floor in enumerate(self.building.floors):
-            for room_idx, room in enumerate(floor.get_rooms()):
-                # Solo habitaciones regulares (no escaleras) y sin zombis
-                if room_idx > 0 and not room.has_zombies:
-                    available_rooms.append((floor_idx, room_idx))
-        
+        available_rooms = self._practicante_rooms()
         if not available_rooms:
             logger.warning("No hay habitaciones disponibles para añadir un practicante")
             return {"error": "No hay habitaciones disponibles para añadir un practicante"}
         
         # Seleccionar una habitación aleatoria
-        floor_idx, room_idx = random.choice(available_rooms)
+        floor_idx, room_idx = self.building.index_to_location(self.practicante_rng.choice(available_rooms))
         
         # Crear el practicante
-        self.practicante = Practicante(floor_idx, room_idx)
-        logger.info(f"Practicante añadido en piso {floor_idx}, habitación {room_idx}")
+        self.occupancy.add(Practicante(floor_idx, room_idx))
+        logger.info("Practicante añadido en piso %s, habitación %s", floor_idx, room_idx)
         
-        return {
+        result = {
             "added": True,
             "floor": floor_idx,
             "room": room_idx,
             "message": f"Practicante añadido en piso {floor_idx}, habitación {room_idx}"
         }
+        self._notify("practicante", result)
+        return result
     
-    def move_practicante(self):
+    def add_practicantes(self, count):
+        """
+        Añade varios practicantes a habitaciones aleatorias sin zombis; en una
+        misma habitación puede haber más de uno.
+        
+        Args:
+            count (int): Número de practicantes a añadir
+            
+        Returns:
+            dict: Practicantes añadidos y total en el edificio, o error si no se pudieron añadir
+        """
+        if not self.building:
+            logger.warning("Intento de agregar practicantes sin edificio configurado")
+            return {"error": "No hay edificio configurado"}
+        if count < 1:
+            return {"error": "El número de practicantes debe ser al menos 1"}
+        
+        available_rooms = self._practicante_rooms()
+        if not available_rooms:
+            logger.warning("No hay habitaciones disponibles para añadir practicantes")
+            return {"error": "No hay habitaciones disponibles para añadir un practicante"}
+        
+        index_to_location = self.building.index_to_location
+        for index in self.practicante_rng.choices(available_rooms, k=count):
+            self.occupancy.add(Practicante(*index_to_location(index)))
+        logger.info("Añadidos %s practicantes (%s en el edificio)", count, len(self.occupancy))
+        
+        result = {
+            "added": count,
+            "practicantes": len(self.occupancy),
+            "message": f"Añadidos {count} practicantes"
+        }
+        self._notify("practicante", result)
+        return result
+    
+    def move_practicantes(self):
         """
-        Mueve el practicante a una habitación adyacente aleatoria sin zombis.
-        El practicante intentará evitar habitaciones adyacentes a zombis si es posible.
+        Mueve a todos los practicantes. Cada uno va a la habitación adyacente sin
+        zombis más alejada del zombi más cercano; si varias están a la misma
+        distancia elige una al azar, y se queda donde está si todas están más
+        cerca de los zombis que su habitación actual.
+        
+        El campo de peligro se calcula una sola vez para todos y las opciones de
+        cada habitación ocupada se evalúan una sola vez aunque tenga muchos ocupantes.
         
         Returns:
-            dict: Información sobre el movimiento, o None si no hay practicante
+            dict: Número de practicantes que se han movido ("moved") y que se han
+                quedado ("stayed"), y el movimiento del primero ("practicante",
+                en el formato de move_practicante); o None si no hay practicantes
         """
-        if not self.practicante:
+        occupancy = self.occupancy
+        if not occupancy:
             return None
         
-        floor_idx, room_idx = self.practicante.get_location()
-        current_room = self.building.get_floor(floor_idx).get_room(room_idx)
-        
-        # Obtener todas las habitaciones adyacentes
-        adjacent_rooms = []
-        dangerous_rooms = []  # Habitaciones adyacentes a zombis
-        
-        for adj_room in current_room.get_adjacent_rooms():
-            # Encontrar la ubicación (piso, habitación) de esta habitación adyacente
-            for adj_floor_idx, adj_floor in enumerate(self.building.floors):
-                for adj_room_idx, r in enumerate(adj_floor.get_rooms()):
-                    if r is adj_room:
-                        location = (adj_floor_idx, adj_room_idx)
-                        
-                        # Verificar si esta habitación tiene zombis
-                        if adj_room.has_zombies:
-                            # No incluir habitaciones con zombis
-                            continue
-                        
-                        # Verificar si esta habitación tiene zombis adyacentes
-                        has_adjacent_zombies = False
-                        for zombie_adj_room in adj_room.get_adjacent_rooms():
-                            if zombie_adj_room.has_zombies:
-                                has_adjacent_zombies = True
-                                break
-                        
-                        if has_adjacent_zombies:
-                            dangerous_rooms.append(location)
-                        else:
-                            adjacent_rooms.append(location)
-                        break
-        
-        # Verificar si la habitación actual tiene zombis adyacentes
-        current_has_adjacent_zombies = False
-        for zombie_adj_room in current_room.get_adjacent_rooms():
-            if zombie_adj_room.has_zombies:
-                current_has_adjacent_zombies = True
-                break
-        
-        # Prioridad: 
-        # 1. Habitaciones seguras (sin zombis adyacentes)
-        # 2. Habitaciones peligrosas (con zombis adyacentes) pero solo si la actual también es peligrosa
-        # 3. Quedarse donde está si no hay opción mejor
-        
-        if adjacent_rooms:
-            # Hay habitaciones seguras disponibles
-            new_floor_idx, new_room_idx = random.choice(adjacent_rooms)
-            logger.debug(f"Practicante movido de {floor_idx}-{room_idx} a {new_floor_idx}-{new_room_idx} (habitación segura)")
-        elif dangerous_rooms and current_has_adjacent_zombies:
-            # No hay habitaciones seguras, pero hay opciones menos peligrosas
-            new_floor_idx, new_room_idx = random.choice(dangerous_rooms)
-            logger.debug(f"Practicante movido de {floor_idx}-{room_idx} a {new_floor_idx}-{new_room_idx} (habitación peligrosa)")
-        else:
-            # Mejor quedarse donde está
-            new_floor_idx, new_room_idx = floor_idx, room_idx
-            logger.debug(f"Practicante se queda en {floor_idx}-{room_idx} (no hay rutas más seguras)")
+        building = self.building
+        neighbour_indices = building.neighbour_indices
+        occupied = occupancy.occupied_indices()
+        
+        # Distancias al zombi más cercano: una sola búsqueda por turno, que se
+        # detiene en cuanto alcanza las habitaciones ocupadas y sus vecinas
+        targets = list(occupied)
+        for index in occupied:
+            targets.extend(neighbour_indices(index))
+        self.danger.update(building, targets)
+        distance = self.danger.distance
+        
+        # Habitaciones adyacentes sin zombis (distancia 0) a la mayor distancia de
+        # los zombis, o None si es mejor quedarse donde está
+        options = {}
+        for index in occupied:
+            best_distance = 0
+            best_rooms = []
+            for neighbour in neighbour_indices(index):
+                neighbour_distance = distance(neighbour)
+                if neighbour_distance == 0:
+                    continue
+                if neighbour_distance > best_distance:
+                    best_distance = neighbour_distance
+                    best_rooms = [neighbour]
+                elif neighbour_distance == best_distance:
+                    best_rooms.append(neighbour)
+            if best_rooms and best_distance >= distance(index):
+                options[index] = best_rooms
+            else:
+                options[index] = None
+        
+        moved = 0
+        first_move = None
+        choice = self.practicante_rng.choice
+        for practicante, index in occupancy.items():
+            best_rooms = options[index]
+            location = practicante.get_location()
+            if best_rooms is None:
+                movement = {
+                    "moved": False,
+                    "from": location,
+                    "to": location,
+                    "message": "No hay rutas más seguras disponibles"
+                }
+            else:
+                occupancy.move(practicante, choice(best_rooms))
+                moved += 1
+                movement = {"moved": True, "from": location, "to": practicante.get_location()}
+            if first_move is None:
+                first_move = movement
+        
+        logger.debug("Practicantes movidos: %s de %s", moved, len(occupancy))
+        return {"moved": moved, "stayed": len(occupancy) - moved, "practicante": first_move}
+    
+    def move_practicante(self):
+        """
+        Mueve a los practicantes (ver move_practicantes) y devuelve el movimiento del primero.
         
-        # Si hay que moverse, actualizar posición
-        if new_floor_idx != floor_idx or new_room_idx != room_idx:
-            self.practicante.move_to(new_floor_idx, new_room_idx)
-            return {
-                "moved": True,
-                "from": (floor_idx, room_idx),
-                "to": (new_floor_idx, new_room_idx)
-            }
-        else:
-            return {
-                "moved": False,
-                "from": (floor_idx, room_idx),
-                "to": (floor_idx, room_idx),
-                "message": "No hay rutas más seguras disponibles"
-            }
+        Returns:
+            dict: Información sobre el movimiento del primer practicante, o None si no hay practicantes
+        """
+        moves = self.move_practicantes()
+        return moves["practicante"] if moves else None
     
-    def advance_turn(self):
-        """Avanza la simulación un turno."""
-        if not self.building:
-            return {"error": "No hay edificio configurado"}
-
-        self.turn += 1
-        logger.debug(f"Iniciando turno {self.turn}")
-
-        # Lista para almacenar las habitaciones recién infestadas y las que perdieron zombis
-        newly_infested = []
-        vacated_rooms = []
-        new_zombie_generated = False
-        new_zombie_location = None
-        practicante_moved = None
-
-        # Si hay un practicante, moverlo primero
-        if self.practicante:
-            practicante_moved = self.move_practicante()
-
+    def uses_kernel(self):
+        """
+        Indica si los turnos se calculan con el núcleo vectorizado.
+        Solo el edificio compacto expone el mapa de bits que necesita el núcleo.
+        
+        Returns:
+            bool: True si advance_turn usa el núcleo vectorizado (en uno o varios procesos)
+        """
+        return self.engine != "reference" and isinstance(self.building, CompactBuilding)
+    
+    def _advance_zombies_reference(self, timer=None):
+        """
+        Implementación de referencia del movimiento de zombis: recorre los objetos
+        habitación, decide todos los movimientos y después los aplica.
+        
+        Args:
+            timer (TurnTimer): Cronómetro de las fases del turno, si las métricas están activadas
+        
+        Returns:
+            tuple: (vacated_rooms, newly_infested), listas de coordenadas (piso, habitación)
+        """
         # Para cada piso y habitación con zombis, mover el zombi a UNA habitación adyacente
         zombie_movements = []  # Lista para guardar los movimientos a realizar
 
-        for floor_idx, floor in enumerate(self.building.floors):
-            rooms = floor.get_rooms()
-            for room_idx, room in enumerate(rooms):
-                if room.has_zombies:
-                    # Obtener habitaciones adyacentes directamente del objeto habitación
-                    adjacent_rooms = room.get_adjacent_rooms()
-                    
-                    # Filtrar solo las habitaciones adyacentes sin zombis
-                    available_adj_rooms = []
-                    
-                    for adj_room in adjacent_rooms:
-                        if not adj_room.has_zombies:
-                            # Encontrar los índices para esta habitación adyacente
-                            for adj_floor_idx, adj_floor in enumerate(self.building.floors):
-                                for adj_room_idx, r in enumerate(adj_floor.get_rooms()):
-                                    if r is adj_room:
-                                        available_adj_rooms.append((adj_floor_idx, adj_room_idx))
-                                        break
-                    
-                    # Si hay movimientos posibles, elegir uno al azar
-                    if available_adj_rooms:
-                        target_floor, target_room = random.choice(available_adj_rooms)
-                        # Guardar este movimiento para ejecutarlo después
-                        zombie_movements.append({
-                            'from': (floor_idx, room_idx),
-                            'to': (target_floor, target_room)
-                        })
+        # Solo se recorren las habitaciones infestadas, en orden de piso y habitación
+        for index in self.building.infested_indices.sorted():
+            room = self.building.get_room_by_index(index)
+            floor_idx, room_idx = self.building.locate_room(room)
+            
+            # Obtener habitaciones adyacentes directamente del objeto habitación
+            adjacent_rooms = room.get_adjacent_rooms()
+            
+            # Filtrar solo las habitaciones adyacentes sin zombis
+            available_adj_rooms = []
+            
+            for adj_room in adjacent_rooms:
+                if not adj_room.has_zombies:
+                    # Obtener los índices desde el índice de coordenadas del edificio
+                    available_adj_rooms.append(self.building.locate_room(adj_room))
+            
+            # Si hay movimientos posibles, elegir uno al azar
+            if available_adj_rooms:
+                target_floor, target_room = self.movement_rng.choice(available_adj_rooms)
+                # Guardar este movimiento para ejecutarlo después
+                zombie_movements.append({
+                    'from': (floor_idx, room_idx),
+                    'to': (target_floor, target_room)
+                })
 
+        if timer:
+            timer.lap("decide")
+        
         # Ejecutar los movimientos (después de decidir todos para evitar interferencias)
+        vacated_rooms = []
+        newly_infested = []
+        # Registro de movimientos limitado por turno (None si DEBUG está desactivado)
+        log = logger.turn_budget()
         for move in zombie_movements:
             from_floor, from_room = move['from']
             to_floor, to_room = move['to']
@@ -359,12 +570,114 @@ class Simulation:
             vacated_rooms.append((from_floor, from_room))
             newly_infested.append((to_floor, to_room))
             
-            logger.debug(f"Zombi movido de piso {from_floor}, habitación {from_room} a piso {to_floor}, habitación {to_room}")
-            
-            # Verificar si el zombi ha alcanzado al practicante
-            if self.practicante and self.practicante.floor_number == to_floor and self.practicante.room_number == to_room:
+            if log:
+                log.debug("Zombi movido de piso %s, habitación %s a piso %s, habitación %s", from_floor, from_room, to_floor, to_room)
+        
+        if log:
+            log.finish(self.turn)
+        if timer:
+            timer.lap("apply")
+        return vacated_rooms, newly_infested
+    
+    def _advance_zombies_kernel(self):
+        """
+        Movimiento de zombis con el núcleo vectorizado sobre el edificio compacto.
+        
+        Returns:
+            tuple: (vacated_rooms, newly_infested), listas de coordenadas (piso, habitación)
+        """
+        if self.engine == "sharded":
+            sources, targets = self._sharded_kernel().advance(self.kernel_seed, self.turn)
+        else:
+            sources, targets = turn_kernel.advance_zombies(self.building, self.kernel_seed, self.turn)
+        to_location = self.building.index_to_location
+        vacated_rooms = [to_location(index) for index in sources]
+        newly_infested = [to_location(index) for index in targets]
+        logger.debug("Núcleo vectorizado: %s zombis movidos en el turno %s", len(sources), self.turn)
+        return vacated_rooms, newly_infested
+    
+    def _sharded_kernel(self):
+        """
+        Obtiene el motor repartido del edificio actual, arrancando sus procesos
+        la primera vez (y de nuevo si el edificio o su topología han cambiado).
+        
+        Returns:
+            ShardedKernel: El motor repartido
+        """
+        kernel = self.sharded_kernel
+        if kernel is None or kernel.building is not self.building or kernel.topology is not self.building.topology:
+            self.close()
+            self.sharded_kernel = ShardedKernel(self.building, self.workers)
+            logger.info("Motor repartido en %s procesos: pisos %s", self.sharded_kernel.workers, self.sharded_kernel.ranges)
+        return self.sharded_kernel
+    
+    def close(self):
+        """Detiene los procesos del motor repartido, si los hay."""
+        if self.sharded_kernel is not None:
+            self.sharded_kernel.close()
+            self.sharded_kernel = None
+    
+    def _count_rooms(self):
+        """
+        Obtiene las habitaciones infestadas y el total de habitaciones del edificio
+        a partir de los contadores que el edificio mantiene de forma incremental.
+        
+        Returns:
+            tuple: (total_infested, total_rooms)
+        """
+        return self.building.infested_count, self.building.total_rooms
+    
+    def advance_turn(self):
+        """Avanza la simulación un turno."""
+        if not self.building:
+            return {"error": "No hay edificio configurado"}
+        if self.profiler is not None:
+            return self.profiler.run(self._advance_turn)
+        return self._advance_turn()
+
+    def _advance_turn(self):
+        """Avanza la simulación un turno (con el edificio ya configurado)."""
+
+        self.turn += 1
+        logger.debug("Iniciando turno %s", self.turn)
+        # Cronómetro de fases (None si las métricas están desactivadas)
+        timer = metrics.turn_timer()
+
+        new_zombie_generated = False
+        new_zombie_location = None
+        practicante_moved = None
+        practicantes_moved = 0
+        practicantes_captured = 0
+
+        # Si hay practicantes, moverlos primero
+        if self.occupancy:
+            moves = self.move_practicantes()
+            practicante_moved = moves["practicante"]
+            practicantes_moved = moves["moved"]
+        if timer:
+            timer.lap("practicante")
+
+        # Mover los zombis: núcleo vectorizado sobre el mapa de bits del edificio
+        # compacto, o la implementación de referencia que recorre los objetos
+        if self.uses_kernel():
+            vacated_rooms, newly_infested = self._advance_zombies_kernel()
+            if timer:
+                timer.lap("kernel")
+        else:
+            vacated_rooms, newly_infested = self._advance_zombies_reference(timer)
+        
+        # Capturar a los practicantes de las habitaciones en las que han entrado zombis;
+        # el juego termina cuando no queda ninguno
+        if self.occupancy:
+            location_to_index = self.building.location_to_index
+            for to_floor, to_room in newly_infested:
+                captured = self.occupancy.capture(location_to_index(to_floor, to_room))
+                if captured:
+                    practicantes_captured += captured
+                    logger.debug("Un zombi ha capturado a %s practicantes en piso %s, habitación %s", captured, to_floor, to_room)
+            if practicantes_captured and not self.occupancy:
                 self.game_over_reason = "practicante_capturado"
-                logger.info(f"¡Juego terminado! Un zombi ha capturado al practicante en piso {to_floor}, habitación {to_room}")
+                logger.info("¡Juego terminado! Los zombis han capturado a todos los practicantes (turno %s)", self.turn)
 
         # Generar un nuevo zombi si está activada la generación
         if self.zombie_generation_enabled:
@@ -372,14 +685,16 @@ class Simulation:
             new_zombie_generated = success
             if success:
                 new_zombie_location = (floor_idx, room_idx)
+        if timer:
+            timer.lap("spawn")
 
         # Verificar si todas las habitaciones están infestadas
-        total_infested = sum(1 for floor in self.building.floors 
-                           for room in floor.get_rooms() if room.has_zombies)
-        total_rooms = sum(len(floor.get_rooms()) for floor in self.building.floors)
+        total_infested, total_rooms = self._count_rooms()
         game_over = total_infested == total_rooms or self.game_over_reason is not None
+        if timer:
+            timer.lap("recount")
 
-        return {
+        result = {
             "turn": self.turn,
             "newly_infested": newly_infested,
             "vacated_rooms": vacated_rooms,
@@ -388,8 +703,105 @@ class Simulation:
             "game_over_reason": self.game_over_reason,
             "new_zombie_generated": new_zombie_generated,
             "new_zombie_location": new_zombie_location,
-            "practicante_moved": practicante_moved
+            "practicante_moved": practicante_moved,
+            "practicantes_moved": practicantes_moved,
+            "practicantes_captured": practicantes_captured
         }
+        self._notify("turn", result)
+        if timer:
+            timer.lap("notify")
+            timer.finish()
+            metrics.TURNS.inc()
+            metrics.MOVES.inc(amount=len(vacated_rooms))
+            if new_zombie_generated:
+                metrics.SPAWNS.inc()
+        return result
+    
+    def start_profiling(self, turns=None, seconds=None):
+        """
+        Arma un perfilador de cProfile para los próximos turnos, sustituyendo
+        al anterior si lo había.
+        
+        Args:
+            turns (int): Número de turnos a perfilar
+            seconds (float): Segundos durante los que se perfilan los turnos
+            
+        Returns:
+            dict: Estado del perfilador
+            
+        Raises:
+            ValueError: Si no se indica exactamente uno de los dos límites o no es positivo
+        """
+        self.profiler = TurnProfiler(turns, seconds)
+        logger.info("Perfilador armado (turnos: %s, segundos: %s)", turns, seconds)
+        return self.profiler.status()
+    
+    def stop_profiling(self):
+        """
+        Desarma el perfilador.
+        
+        Returns:
+            TurnProfiler: El perfilador que estaba armado, o None
+        """
+        profiler, self.profiler = self.profiler, None
+        return profiler
+    
+    def advance_turns(self, count=1, until_game_over=False, max_turns=MAX_ADVANCE_TURNS, include_series=False):
+        """
+        Avanza la simulación varios turnos y devuelve un resumen agregado.
+        Se detiene antes si el juego termina.
+        
+        Args:
+            count (int): Número de turnos a avanzar (se ignora si until_game_over es True)
+            until_game_over (bool): Avanzar hasta que termine el juego
+            max_turns (int): Límite de turnos cuando until_game_over es True
+            include_series (bool): Incluir la serie por turno de habitaciones
+                infestadas, movimientos y zombis generados
+            
+        Returns:
+            dict: Turnos ejecutados, estado final, turno en que terminó el juego
+                (None si no terminó) y, opcionalmente, la serie por turno
+        """
+        if not self.building:
+            return {"error": "No hay edificio configurado"}
+        
+        limit = max_turns if until_game_over else count
+        start_turn = self.turn
+        game_over_turn = None
+        zombies_generated = 0
+        series = {"turn": [], "infested": [], "moves": [], "generated": []} if include_series else None
+        
+        while self.turn - start_turn < limit and not self.is_game_over():
+            result = self.advance_turn()
+            if result["new_zombie_generated"]:
+                zombies_generated += 1
+            if result["game_over"]:
+                game_over_turn = self.turn
+            if series is not None:
+                series["turn"].append(result["turn"])
+                series["infested"].append(result["total_infested"])
+                series["moves"].append(len(result["vacated_rooms"]))
+                series["generated"].append(int(result["new_zombie_generated"]))
+        
+        total_infested, total_rooms = self._count_rooms()
+        summary = {
+            "turns_executed": self.turn - start_turn,
+            "start_turn": start_turn,
+            "turn": self.turn,
+            "total_infested": total_infested,
+            "total_rooms": total_rooms,
+            "alerting_sensors": self.building.alert_count,
+            "new_zombies_generated": zombies_generated,
+            "game_over": self.is_game_over(),
+            "game_over_reason": self.game_over_reason,
+            "game_over_turn": game_over_turn,
+            "practicante": self.practicante.get_location() if self.practicante else None,
+            "practicantes": len(self.occupancy)
+        }
+        if series is not None:
+            summary["series"] = series
+        logger.info("Avanzados %s turnos (turno %s, %s/%s infestadas)", summary['turns_executed'], self.turn, total_infested, total_rooms)
+        return summary
     
     def clean_room(self, floor_number, room_number):
         """
@@ -410,7 +822,7 @@ class Simulation:
             room = self.building.get_floor(floor_number).get_room(room_number)
             
             if not room.has_zombies:
-                logger.info(f"Intento de limpiar habitación sin zombis: {floor_number}-{room_number}")
+                logger.info("Intento de limpiar habitación sin zombis: %s-%s", floor_number, room_number)
                 return {"cleaned": False, "message": "No hay zombis en esta habitación"}
                 
             # Usar el método remove_zombies() para manejar correctamente tanto habitaciones como escaleras
@@ -419,11 +831,12 @@ class Simulation:
             # Nombre del tipo de habitación para el mensaje
             room_type = "Escalera" if hasattr(room, 'connected_floors') else "Habitación"
             
-            logger.info(f"{room_type} limpiada: {floor_number}-{room_number}")
+            logger.info("%s limpiada: %s-%s", room_type, floor_number, room_number)
+            self._notify("rooms", {"action": "clean_room", "rooms": [(floor_number, room_number)]})
             return {"cleaned": True, "message": f"{room_type} limpiada correctamente"}
             
         except Exception as e:
-            logger.error(f"Error al limpiar habitación: {str(e)}")
+            logger.error("Error al limpiar habitación: %s", e)
             return {"error": f"Error al limpiar habitación: {str(e)}"}
     
     def reset_sensor(self, floor_number, room_number):
@@ -446,20 +859,21 @@ class Simulation:
             
             # Verificar si la habitación es una escalera (no tiene sensor)
             if hasattr(room, 'connected_floors'):
-                logger.info(f"Intento de restablecer sensor en una escalera: {floor_number}-{room_number}")
+                logger.info("Intento de restablecer sensor en una escalera: %s-%s", floor_number, room_number)
                 return {"reset": False, "message": "Las escaleras no tienen sensores"}
             
             if not room.sensor.is_alert():
-                logger.info(f"Intento de restablecer sensor que ya está normal: {floor_number}-{room_number}")
+                logger.info("Intento de restablecer sensor que ya está normal: %s-%s", floor_number, room_number)
                 return {"reset": False, "message": "El sensor ya está en estado normal"}
                 
             room.reset_sensor()
             
-            logger.info(f"Sensor restablecido: {floor_number}-{room_number}")
+            logger.info("Sensor restablecido: %s-%s", floor_number, room_number)
+            self._notify("rooms", {"action": "reset_sensor", "rooms": [(floor_number, room_number)]})
             return {"reset": True, "message": "Sensor restablecido correctamente"}
             
         except Exception as e:
-            logger.error(f"Error al restablecer sensor: {str(e)}")
+            logger.error("Error al restablecer sensor: %s", e)
             return {"error": f"Error al restablecer sensor: {str(e)}"}
     
     def get_building_state(self):
@@ -473,9 +887,7 @@ class Simulation:
             logger.warning("Intento de obtener estado sin un edificio configurado")
             return {"error": "No hay edificio configurado"}
         
-        total_infested = sum(1 for floor in self.building.floors 
-                           for room in floor.get_rooms() if room.has_zombies)
-        total_rooms = sum(len(floor.get_rooms()) for floor in self.building.floors)
+        total_infested, total_rooms = self._count_rooms()
         
         state = {
             "turn": self.turn,
@@ -483,17 +895,19 @@ class Simulation:
             "rooms_per_floor": len(self.building.floors[0].get_rooms()) if self.building.floors else 0,
             "total_rooms": total_rooms,
             "infested_rooms": total_infested,
+            "alerting_sensors": self.building.alert_count,
             "game_over": total_infested == total_rooms or self.game_over_reason is not None,
             "game_over_reason": self.game_over_reason,
-            "practicante": self.practicante.get_location() if self.practicante else None
+            "practicante": self.practicante.get_location() if self.practicante else None,
+            "practicantes": len(self.occupancy)
         }
         
-        logger.debug(f"Estado actual del edificio: {state}")
+        logger.debug("Estado actual del edificio: %s", state)
         return state
     
     def is_game_over(self):
         """
-        Comprueba si el juego ha terminado (todas las habitaciones infestadas o el practicante ha sido capturado).
+        Comprueba si el juego ha terminado (todas las habitaciones infestadas o todos los practicantes capturados).
         
         Returns:
             bool: True si el juego ha terminado, False en caso contrario
@@ -504,7 +918,87 @@ class Simulation:
         if self.game_over_reason is not None:
             return True
             
-        total_infested = sum(1 for floor in self.building.floors 
-                           for room in floor.get_rooms() if room.has_zombies)
-        total_rooms = sum(len(floor.get_rooms()) for floor in self.building.floors)
-        return total_infested == total_rooms 
\ No newline at end of file
+        total_infested, total_rooms = self._count_rooms()
+        return total_infested == total_rooms 
+    
+    def save_snapshot(self, path, compress=False):
+        """
+        Guarda el estado completo de la simulación en un archivo de instantánea:
+        dimensiones y plano del edificio, mapas de bits de zombis y alertas, turno,
+        practicante, generación de zombis y estado de los generadores aleatorios,
+        de modo que la simulación cargada continúa exactamente igual.
+        
+        Args:
+            path (str): Ruta del archivo (se sustituye de forma atómica)
+            compress (bool): Comprimir los mapas de bits con zlib
+            
+        Returns:
+            dict: Ruta y tamaño del archivo, o error si no hay edificio
+        """
+        if not self.building:
+            logger.warning("Intento de guardar una instantánea sin edificio configurado")
+            return {"error": "No hay edificio configurado"}
+        
+        floors_count = len(self.building.floors)
+        header = {
+            "floors": floors_count,
+            "rooms_per_floor": self.building.total_rooms // floors_count - 1,
+            "backend": next(name for name, cls in BUILDING_BACKENDS.items() if isinstance(self.building, cls)),
+            "layout": self.building.layout.to_dict() if self.building.layout is not None else None,
+            "engine": self.engine,
+            "seed": self.seed,
+            "kernel_seed": self.kernel_seed,
+            "turn": self.turn,
+            "zombie_generation_enabled": self.zombie_generation_enabled,
+            "practicantes": [practicante.get_location() for practicante in self.occupancy],
+            "practicantes_captured": self.occupancy.captured,
+            "game_over_reason": self.game_over_reason,
+            "random_state": {name: getattr(self, name).getstate() for name in RANDOM_STREAMS},
+        }
+        zombies, alerts = self.building.get_state_arrays()
+        free_order = self.building.free_indices.members()
+        size = snapshot.write_snapshot(path, header, zombies, alerts, free_order, compress)
+        logger.info("Instantánea guardada en %s (%s bytes, turno %s)", path, size, self.turn)
+        return {"saved": True, "path": str(path), "bytes": size}
+    
+    @classmethod
+    def load_snapshot(cls, path, use_mmap=True):
+        """
+        Crea una simulación a partir de un archivo guardado con save_snapshot.
+        
+        Args:
+            path (str): Ruta del archivo
+            use_mmap (bool): Proyectar el archivo en memoria en lugar de leerlo entero
+            
+        Returns:
+            Simulation: La simulación restaurada
+            
+        Raises:
+            SnapshotError: Si el archivo no es una instantánea válida
+        """
+        header, zombies, alerts, free_order = snapshot.read_snapshot(path, use_mmap)
+        simulation = cls(engine=header["engine"], seed=header["seed"])
+        layout = header.get("layout")
+        if layout is not None:
+            layout = BuildingLayout.from_dict(layout)
+        simulation.setup_building(header["floors"], header["rooms_per_floor"], header["backend"], layout)
+        simulation.building.load_state(zombies, alerts, free_order)
+        
+        simulation.kernel_seed = header["kernel_seed"]
+        simulation.turn = header["turn"]
+        simulation.zombie_generation_enabled = header["zombie_generation_enabled"]
+        simulation.game_over_reason = header["game_over_reason"]
+        # Las instantáneas anteriores guardan un solo practicante
+        locations = header.get("practicantes")
+        if locations is None:
+            locations = [header["practicante"]] if header["practicante"] is not None else []
+        for location in locations:
+            simulation.occupancy.add(Practicante(*location))
+        simulation.occupancy.captured = header.get("practicantes_captured", 0)
+        for name in RANDOM_STREAMS:
+            version, internal, gauss = header["random_state"][name]
+            getattr(simulation, name).setstate((version, tuple(internal), gauss))
+        
+        simulation.changes.bump()
+        logger.info("Instantánea cargada desde %s (turno %s)", path, simulation.turn)
+        return simulation
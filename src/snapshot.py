@@ -0,0 +1,211 @@
+"""
+Formato de archivo de las instantáneas de una simulación.
+
+Una instantánea guarda una cabecera JSON con las dimensiones del edificio y el
+estado escalar de la simulación (turno, practicante, generadores aleatorios...)
+seguida de dos mapas de bits con los zombis y las alertas de los sensores, un
+bit por habitación, y del orden interno del conjunto de habitaciones libres
+(del que depende en qué habitación aparece cada zombi generado), todo ello
+opcionalmente comprimido con zlib. Las secciones se leen directamente del
+archivo proyectado en memoria, sin copiarlo entero.
+
+    MAGIC, longitud de la cabecera (uint32), cabecera JSON, zombis, alertas,
+    orden de las habitaciones libres (uint32 o uint64 little-endian)
+
+La captura y restauración del estado están en Simulation.save_snapshot y
+Simulation.load_snapshot; este módulo solo lee y escribe el formato.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+MAGIC = b"ZFS1"
+FORMAT_VERSION = 1
+
+_HEADER_LENGTH = struct.Struct("<I")
+
+# Conversión entre bytes 0/1 y dígitos binarios para empaquetar sin NumPy
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class SnapshotError(ValueError):
+    """Error al leer un archivo que no es una instantánea válida."""
+
+
+def pack_bits(flags):
+    """
+    Empaqueta un byte 0/1 por habitación en un mapa de bits (bit i = habitación i).
+
+    Args:
+        flags: Bytes 0/1, uno por habitación
+
+    Returns:
+        bytes: El mapa de bits, de (len(flags) + 7) // 8 bytes
+    """
+    if np is not None:
+        return np.packbits(np.frombuffer(flags, dtype=np.uint8), bitorder="little").tobytes()
+    # Sin NumPy: convertir a un entero en base 2, que Python hace en tiempo lineal
+    digits = bytes(flags).translate(_TO_DIGITS)[::-1]
+    value = int(digits, 2) if digits else 0
+    return value.to_bytes((len(flags) + 7) // 8, "little")
+
+
+def unpack_bits(packed, count):
+    """
+    Desempaqueta un mapa de bits en un byte 0/1 por habitación.
+
+    Args:
+        packed: El mapa de bits
+        count (int): Número de habitaciones
+
+    Returns:
+        bytes: Bytes 0/1, uno por habitación
+    """
+    if np is not None:
+        return np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=count, bitorder="little").tobytes()
+    value = int.from_bytes(packed, "little")
+    return format(value, f"0{count}b")[::-1].encode("ascii").translate(_FROM_DIGITS) if count else b""
+
+
+def pack_indices(indices, wide):
+    """
+    Codifica índices de habitaciones como enteros sin signo little-endian.
+
+    Args:
+        indices (array): Índices de 64 bits (array "q")
+        wide (bool): Usar 8 bytes por índice en lugar de 4
+
+    Returns:
+        bytes: Los índices codificados
+    """
+    if np is not None:
+        return np.frombuffer(indices, dtype=np.int64).astype("<u8" if wide else "<u4").tobytes()
+    packed = array("q" if wide else "I", indices)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_indices(data, wide):
+    """
+    Decodifica índices codificados con pack_indices.
+
+    Args:
+        data: Los índices codificados
+        wide (bool): Si se usaron 8 bytes por índice
+
+    Returns:
+        array: Índices de 64 bits (array "q")
+    """
+    if np is not None:
+        result = array("q")
+        result.frombytes(memoryview(np.frombuffer(data, dtype="<u8" if wide else "<u4").astype(np.int64)).cast("B"))
+        return result
+    packed = array("q" if wide else "I")
+    packed.frombytes(data)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed if wide else array("q", packed)
+
+
+def write_snapshot(path, header, zombies, alerts, free_order, compress=False):
+    """
+    Escribe una instantánea. El archivo se sustituye de forma atómica, así que
+    una instantánea anterior no se pierde si la escritura falla a medias.
+
+    Args:
+        path (str): Ruta del archivo
+        header (dict): Estado escalar serializable a JSON
+        zombies: Un byte 0/1 por habitación con la presencia de zombis
+        alerts: Un byte 0/1 por habitación con el estado de los sensores
+        free_order (array): Habitaciones libres en el orden interno del conjunto
+        compress (bool): Comprimir las secciones con zlib
+
+    Returns:
+        int: Tamaño del archivo en bytes
+    """
+    wide = len(zombies) > 0xFFFFFFFF
+    sections = [pack_bits(zombies), pack_bits(alerts), pack_indices(free_order, wide)]
+    if compress:
+        sections = [zlib.compress(section, 1) for section in sections]
+    header = dict(header, format=FORMAT_VERSION, rooms=len(zombies), wide_indices=wide,
+                  compression="zlib" if compress else None,
+                  sections=[len(section) for section in sections])
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(encoded)))
+        f.write(encoded)
+        for section in sections:
+            f.write(section)
+        size = f.tell()
+    os.replace(temporary, path)
+    return size
+
+
+def _parse(data):
+    """Lee la cabecera y los mapas de bits de los datos de una instantánea."""
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise SnapshotError("El archivo no es una instantánea de la simulación")
+    offset = len(MAGIC) + _HEADER_LENGTH.size
+    try:
+        (length,) = _HEADER_LENGTH.unpack_from(data, len(MAGIC))
+        header = json.loads(bytes(data[offset:offset + length]))
+    except (struct.error, ValueError) as e:
+        raise SnapshotError(f"Cabecera de instantánea no válida: {e}") from None
+    if header.get("format") != FORMAT_VERSION:
+        raise SnapshotError(f"Versión de instantánea no soportada: {header.get('format')}")
+
+    offset += length
+    sections = []
+    for size in header["sections"]:
+        section = data[offset:offset + size]
+        if len(section) != size:
+            raise SnapshotError("Instantánea truncada")
+        if header["compression"] == "zlib":
+            section = zlib.decompress(section)
+        sections.append(section)
+        offset += size
+    rooms = header["rooms"]
+    zombies, alerts, free_order = sections
+    return (header, unpack_bits(zombies, rooms), unpack_bits(alerts, rooms),
+            unpack_indices(free_order, header["wide_indices"]))
+
+
+def read_snapshot(path, use_mmap=True):
+    """
+    Lee una instantánea.
+
+    Args:
+        path (str): Ruta del archivo
+        use_mmap (bool): Proyectar el archivo en memoria en lugar de leerlo entero
+
+    Returns:
+        tuple: (cabecera, zombis, alertas, orden de las habitaciones libres),
+            con un byte 0/1 por habitación en zombis y alertas
+
+    Raises:
+        SnapshotError: Si el archivo no es una instantánea válida
+    """
+    with open(path, "rb") as f:
+        if not use_mmap or os.fstat(f.fileno()).st_size == 0:
+            return _parse(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _parse(view)
+            finally:
+                view.release()
@@ -0,0 +1,239 @@
+"""
+Serialización del estado de la simulación para la interfaz web.
+"""
+
+
+def room_state(floor_number, room):
+    """
+    Obtiene el estado de una habitación tal como lo muestra el frontend.
+
+    Args:
+        floor_number (int): Número del piso de la habitación
+        room: La habitación o escalera
+
+    Returns:
+        dict: Piso, número, zombis, si es escalera y, en habitaciones normales, la alerta del sensor
+    """
+    data = {
+        'floor': floor_number,
+        'room': room.room_number,
+        'has_zombies': room.has_zombies,
+        'is_staircase': hasattr(room, 'connected_floors'),
+    }
+    # Solo las habitaciones normales tienen sensor
+    if not data['is_staircase']:
+        data['sensor_alert'] = room.sensor.is_alert()
+    return data
+
+
+def practicante_state(simulation):
+    """
+    Obtiene la posición del primer practicante tal como la muestra el frontend.
+
+    Args:
+        simulation (Simulation): La simulación
+
+    Returns:
+        dict: Piso y habitación del practicante, o None si no hay practicante
+    """
+    if not simulation.practicante:
+        return None
+    return {
+        'floor': simulation.practicante.floor_number,
+        'room': simulation.practicante.room_number
+    }
+
+
+def occupants_state(simulation):
+    """
+    Obtiene la ocupación del edificio agregada por habitación, en lugar de un
+    diccionario por practicante.
+
+    Args:
+        simulation (Simulation): La simulación, con un edificio configurado
+
+    Returns:
+        dict: Número de practicantes, capturados y lista de [piso, habitación, ocupantes]
+    """
+    return simulation.occupancy.summary()
+
+
+def simulation_state(simulation):
+    """
+    Obtiene el estado completo de la simulación para el frontend.
+    La simulación debe tener un edificio configurado.
+
+    Args:
+        simulation (Simulation): La simulación
+
+    Returns:
+        dict: El estado de get_building_state() junto con el final del juego, la
+            generación de zombis, el practicante, la ocupación, la versión del estado y la
+            estructura del edificio
+    """
+    state = simulation.get_building_state()
+    state['game_over'] = simulation.is_game_over()
+    state['game_over_reason'] = simulation.game_over_reason
+    state['zombie_generation_enabled'] = simulation.zombie_generation_enabled
+    state['practicante'] = practicante_state(simulation)
+    state['occupants'] = occupants_state(simulation)
+    state['version'] = simulation.version
+    state['state_id'] = simulation.state_id
+    state['building'] = [
+        [room_state(floor_idx, room) for room in floor.get_rooms()]
+        for floor_idx, floor in enumerate(simulation.building.floors)
+    ]
+    return state
+
+
+def simulation_diff(simulation, event, data):
+    """
+    Obtiene los cambios de estado producidos por un evento de la simulación
+    (ver Simulation.add_listener). Solo incluye las habitaciones afectadas por el
+    evento, con su estado actual, además de los contadores globales.
+
+    Args:
+        simulation (Simulation): La simulación, con un edificio configurado
+        event (str): Tipo de evento ("turn", "rooms", "practicante" o "generation")
+        data (dict): Datos del evento
+
+    Returns:
+        dict: El evento, las habitaciones modificadas y el estado global actual;
+            en los eventos "turn" incluye también el resultado de advance_turn
+    """
+    if event == "turn":
+        diff = dict(data)
+        locations = set(data['vacated_rooms'])
+        locations.update(data['newly_infested'])
+        if data['new_zombie_location']:
+            locations.add(data['new_zombie_location'])
+    else:
+        diff = {}
+        locations = set(data.get('rooms', ()))
+
+    building = simulation.building
+    diff['event'] = event
+    diff['version'] = simulation.version
+    diff['state_id'] = simulation.state_id
+    diff['turn'] = simulation.turn
+    diff['infested_rooms'] = building.infested_count
+    diff['alerting_sensors'] = building.alert_count
+    diff['game_over'] = simulation.is_game_over()
+    diff['game_over_reason'] = simulation.game_over_reason
+    diff['zombie_generation_enabled'] = simulation.zombie_generation_enabled
+    diff['practicante'] = practicante_state(simulation)
+    diff['occupants'] = occupants_state(simulation)
+    diff['rooms'] = [
+        room_state(floor_idx, building.get_floor(floor_idx).get_room(room_idx))
+        for floor_idx, room_idx in sorted(locations)
+    ]
+    return diff
+
+
+def state_token(simulation):
+    """
+    Obtiene el identificador de la versión actual del estado, "<state_id>-<versión>".
+    Incluye el identificador de la simulación, así que no coincide con el de
+    otra simulación (por ejemplo, tras reiniciarla) aunque tenga la misma versión.
+
+    Args:
+        simulation (Simulation): La simulación
+
+    Returns:
+        str: El identificador
+    """
+    return f"{simulation.state_id}-{simulation.version}"
+
+
+def state_etag(simulation):
+    """
+    Obtiene la etiqueta HTTP (ETag) de la versión actual del estado (ver state_token).
+
+    Args:
+        simulation (Simulation): La simulación
+
+    Returns:
+        str: La etiqueta, entre comillas
+    """
+    return f'"{state_token(simulation)}"'
+
+
+def since_version(simulation, since):
+    """
+    Obtiene la versión de un identificador "<state_id>-<versión>" (ver
+    state_token) si corresponde a la simulación. Se aceptan también la
+    etiqueta ETag tal como se recibió (entre comillas, con o sin W/).
+
+    Args:
+        simulation (Simulation): La simulación
+        since (str): Identificador conocido por el cliente
+
+    Returns:
+        int: La versión, o None si el identificador no es válido o es de otra simulación
+    """
+    since = since.strip()
+    if since.startswith("W/"):
+        since = since[2:]
+    state_id, _, version = since.strip('"').rpartition("-")
+    if state_id != simulation.state_id or not version.isdigit():
+        return None
+    return int(version)
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Comprueba si una cabecera If-None-Match coincide con una etiqueta.
+
+    Args:
+        if_none_match (str): Valor de la cabecera (puede ser None o una lista separada por comas)
+        etag (str): La etiqueta actual
+
+    Returns:
+        bool: True si el cliente ya tiene esta versión
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Comparación débil: se ignora el prefijo W/
+    return "*" in candidates or etag in [c[2:] if c.startswith("W/") else c for c in candidates]
+
+
+def simulation_changes(simulation, since):
+    """
+    Obtiene el estado global y solo las habitaciones que han cambiado
+    (zombis o sensor) después de una versión. Si la versión es de otra
+    simulación (por ejemplo, de antes de reiniciarla) o no corresponde al
+    edificio actual se devuelve el estado completo.
+
+    Args:
+        simulation (Simulation): La simulación, con un edificio configurado
+        since (str): Versión conocida por el cliente, como "<state_id>-<versión>"
+            (ver state_token)
+
+    Returns:
+        dict: Con "full": False, el estado de get_building_state(), la versión y
+            la lista "rooms" de habitaciones modificadas; o el estado completo de
+            simulation_state() con "full": True
+    """
+    version = since_version(simulation, since)
+    changed = simulation.changes.changed_since(version) if version is not None else None
+    if changed is None:
+        state = simulation_state(simulation)
+        state['full'] = True
+        return state
+
+    building = simulation.building
+    state = simulation.get_building_state()
+    state['game_over'] = simulation.is_game_over()
+    state['zombie_generation_enabled'] = simulation.zombie_generation_enabled
+    state['practicante'] = practicante_state(simulation)
+    state['occupants'] = occupants_state(simulation)
+    state['version'] = simulation.version
+    state['state_id'] = simulation.state_id
+    state['since'] = version
+    state['full'] = False
+    state['rooms'] = []
+    for index in changed:
+        room = building.get_room_by_index(index)
+        state['rooms'].append(room_state(building.index_to_location(index)[0], room))
+    return state
@@ -0,0 +1,222 @@
+"""
+Difusión del estado de la simulación como Server-Sent Events.
+
+Un StateBroadcaster se registra como listener de una Simulation y, tras cada
+turno o acción sobre las habitaciones, construye una sola vez el mensaje con los
+cambios (ver src.state.simulation_diff) y lo reparte entre todos los clientes
+suscritos. Cada cliente recibe primero una instantánea completa y después solo
+los cambios, en lugar de pedir el estado completo cada segundo.
+"""
+
+import asyncio
+import contextlib
+import json
+import threading
+
+from src.state import simulation_state, simulation_diff
+from src import logger
+
+# Mensajes pendientes por cliente antes de descartarlos y reenviar una instantánea
+DEFAULT_QUEUE_SIZE = 256
+
+# Segundos entre comentarios de mantenimiento cuando no hay cambios
+HEARTBEAT_SECONDS = 15.0
+
+# Marca en la cola de un cliente para que reciba una instantánea completa
+RESYNC = object()
+
+# Marca en la cola de un cliente para terminar su flujo
+CLOSED = object()
+
+HEARTBEAT = ": keep-alive\n\n"
+
+
+def format_event(name, data):
+    """
+    Da formato de Server-Sent Event a un mensaje.
+
+    Args:
+        name (str): Nombre del evento
+        data: Datos serializables a JSON
+
+    Returns:
+        str: El evento listo para enviarse
+    """
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    """
+    Cola de mensajes pendientes de un cliente, ligada a su bucle de eventos.
+    """
+
+    def __init__(self, loop, maxsize):
+        """
+        Inicializa la suscripción.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Bucle en el que se consume la cola
+            maxsize (int): Número máximo de mensajes pendientes
+        """
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def put(self, message):
+        """
+        Encola un mensaje; debe llamarse desde el bucle de la suscripción.
+        Si el cliente no da abasto se descartan sus mensajes pendientes y se le
+        reenvía una instantánea completa.
+
+        Args:
+            message: Mensaje ya formateado, RESYNC o CLOSED
+        """
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            if message is not CLOSED:
+                message = RESYNC
+        self.queue.put_nowait(message)
+
+
+class StateBroadcaster:
+    """
+    Reparte el estado de una simulación entre los clientes suscritos.
+    """
+
+    def __init__(self, simulation=None, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        Inicializa el difusor.
+
+        Args:
+            simulation (Simulation): Simulación a difundir (opcional, ver attach)
+            queue_size (int): Mensajes pendientes por cliente
+        """
+        self.queue_size = queue_size
+        self.simulation = None
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        if simulation is not None:
+            self.attach(simulation)
+
+    def attach(self, simulation):
+        """
+        Empieza a difundir otra simulación (por ejemplo, tras reiniciarla).
+        Todos los clientes reciben una instantánea de la nueva simulación.
+
+        Args:
+            simulation (Simulation): La simulación a difundir
+        """
+        if self.simulation is not None:
+            self.simulation.remove_listener(self._on_event)
+        self.simulation = simulation
+        simulation.add_listener(self._on_event)
+        self._publish(RESYNC)
+
+    def subscribe(self, loop):
+        """
+        Suscribe un cliente.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Bucle en el que el cliente consume sus mensajes
+
+        Returns:
+            Subscription: La suscripción del cliente
+        """
+        subscription = Subscription(loop, self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Da de baja a un cliente.
+
+        Args:
+            subscription (Subscription): La suscripción a eliminar
+        """
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def close(self):
+        """
+        Deja de difundir la simulación y termina el flujo de todos los clientes.
+        """
+        if self.simulation is not None:
+            self.simulation.remove_listener(self._on_event)
+            self.simulation = None
+        self._publish(CLOSED)
+
+    @property
+    def subscriber_count(self):
+        """Número de clientes suscritos."""
+        return len(self._subscriptions)
+
+    def snapshot_message(self):
+        """
+        Construye el evento con la instantánea completa de la simulación.
+        Debe llamarse con el cerrojo de la simulación tomado.
+
+        Returns:
+            str: Evento "snapshot" con el estado completo (o null si no hay edificio)
+        """
+        simulation = self.simulation
+        state = simulation_state(simulation) if simulation is not None and simulation.building else None
+        return format_event("snapshot", state)
+
+    def _locked_snapshot(self, lock):
+        """Construye la instantánea completa tomando el cerrojo de la simulación."""
+        with lock:
+            return self.snapshot_message()
+
+    def _on_event(self, event, data):
+        """Listener de la simulación: difunde los cambios de cada evento."""
+        if not self._subscriptions:
+            return
+        if event == "setup":
+            # Un edificio nuevo cambia toda la estructura: reenviar la instantánea
+            self._publish(RESYNC)
+        elif self.simulation.building:
+            self._publish(format_event("diff", simulation_diff(self.simulation, event, data)))
+
+    def _publish(self, message):
+        """Entrega un mensaje a todos los clientes, cada uno en su propio bucle."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # El bucle del cliente ya está cerrado
+                self.unsubscribe(subscription)
+
+    async def stream(self, lock=None, heartbeat=HEARTBEAT_SECONDS):
+        """
+        Generador asíncrono de Server-Sent Events para un cliente: una
+        instantánea inicial y después los cambios de cada evento.
+
+        Args:
+            lock: Cerrojo de la simulación, tomado al construir instantáneas
+            heartbeat (float): Segundos entre mensajes de mantenimiento
+
+        Yields:
+            str: Eventos formateados, hasta que se llama a close()
+        """
+        lock = lock or contextlib.nullcontext()
+        # Suscribirse antes de la instantánea para no perder cambios intermedios
+        subscription = self.subscribe(asyncio.get_running_loop())
+        logger.debug("Cliente suscrito al flujo de estado (%s en total)", self.subscriber_count)
+        try:
+            message = RESYNC
+            while message is not CLOSED:
+                if message is RESYNC:
+                    # La instantánea se construye en un hilo para que esperar el
+                    # cerrojo mientras otro hilo avanza turnos no bloquee el bucle
+                    message = await asyncio.to_thread(self._locked_snapshot, lock)
+                yield message
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    message = HEARTBEAT
+        finally:
+            self.unsubscribe(subscription)
+            logger.debug("Cliente desconectado del flujo de estado (%s en total)", self.subscriber_count)
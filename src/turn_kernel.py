@@ -0,0 +1,327 @@
+"""
+Núcleo vectorizado del movimiento de zombis para el edificio compacto.
+
+En lugar de recorrer objetos Room, el núcleo trabaja directamente sobre el mapa
+de bits de infestación de CompactBuilding: calcula para todas las habitaciones
+infestadas qué vecinos están libres, elige un destino por zombi y aplica todos
+los movimientos de una sola pasada. Se conserva la semántica de
+Simulation.advance_turn: primero se deciden todos los movimientos a partir del
+estado inicial del turno y después se aplican (dos zombis pueden llegar a la
+misma habitación).
+
+Los destinos se eligen con un generador basado en contador: el número aleatorio
+de cada zombi depende solo de (semilla, turno, habitación de origen). Así el
+resultado no depende del orden de recorrido ni de si NumPy está instalado, y
+ambas implementaciones producen exactamente los mismos movimientos.
+
+Con el plano clásico los vecinos se calculan aritméticamente; con un plano
+general (building.topology) se leen como tramos del arreglo CSR de
+adyacencias, en el mismo orden, así que un plano de pasillos equivalente al
+clásico produce los mismos movimientos.
+
+decide_moves toma las decisiones sin aplicarlas para cualquier subconjunto de
+habitaciones; el motor repartido (sharded.py) la usa en cada proceso con sus pisos.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+# Por debajo de este número de zombis la versión en Python puro es más rápida
+NUMPY_MIN_ZOMBIES = 256
+
+
+def _mix64(value):
+    """Función de mezcla de SplitMix64 sobre un entero de 64 bits."""
+    value = (value + GOLDEN_GAMMA) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def turn_key(seed, turn):
+    """
+    Deriva la clave de un turno a partir de la semilla del generador.
+
+    Args:
+        seed (int): Semilla del generador de movimientos
+        turn (int): Número de turno
+
+    Returns:
+        int: Clave de 64 bits del turno
+    """
+    return _mix64((seed + turn * GOLDEN_GAMMA) & MASK64)
+
+
+def draw(key, index):
+    """
+    Obtiene el número aleatorio de 64 bits de una habitación en un turno.
+
+    Args:
+        key (int): Clave del turno (ver turn_key)
+        index (int): Índice plano de la habitación de origen
+
+    Returns:
+        int: Número pseudoaleatorio de 64 bits
+    """
+    return _mix64(key ^ index)
+
+
+def _draw_array(key, indices):
+    """Versión vectorizada de draw() sobre un arreglo de índices."""
+    with np.errstate(over="ignore"):
+        value = indices.astype(np.uint64) ^ np.uint64(key)
+        value = value + np.uint64(GOLDEN_GAMMA)
+        value = (value ^ (value >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        value = (value ^ (value >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return value ^ (value >> np.uint64(31))
+
+
+def advance_zombies(building, seed, turn, use_numpy=None):
+    """
+    Mueve todos los zombis del edificio compacto un turno.
+
+    Args:
+        building (CompactBuilding): El edificio a actualizar
+        seed (int): Semilla del generador de movimientos
+        turn (int): Número de turno que se está simulando
+        use_numpy (bool): Forzar (True) o evitar (False) la versión NumPy;
+            por defecto se usa NumPy si está instalado y hay suficientes zombis
+
+    Returns:
+        tuple: (sources, targets), listas de índices planos de origen y destino
+            de cada movimiento, en orden creciente de origen
+    """
+    if use_numpy is None:
+        use_numpy = prefers_numpy(building)
+    key = turn_key(seed, turn)
+    if use_numpy:
+        if not building.infested_indices:
+            return [], []
+        src = np.sort(np.frombuffer(building.infested_indices.members(), dtype=np.int64))
+        return _apply_numpy(building, *decide_moves(building, src, key, True))
+    sources, targets = decide_moves(building, building.infested_indices.sorted(), key, False)
+    _apply_python(building, sources, targets)
+    return sources, targets
+
+
+def prefers_numpy(building):
+    """
+    Indica si advance_zombies usa por defecto la versión NumPy con este edificio.
+
+    Args:
+        building (CompactBuilding): El edificio
+
+    Returns:
+        bool: True si NumPy está instalado y hay suficientes zombis
+    """
+    return np is not None and building.infested_count >= NUMPY_MIN_ZOMBIES
+
+
+def decide_moves(building, sources, key, use_numpy):
+    """
+    Decide, sin aplicarlos, los movimientos de los zombis de las habitaciones
+    dadas a partir del estado actual del mapa de bits. Cada decisión depende solo
+    de (clave, habitación) y de qué vecinos están libres, así que puede tomarse
+    por separado para cualquier subconjunto de habitaciones (por ejemplo, los
+    pisos de un proceso del motor repartido) con el mismo resultado.
+
+    Args:
+        building: Edificio con zombies, stride, size, floors_count y topology
+            (CompactBuilding o la vista de un fragmento de pisos)
+        sources: Índices planos infestados en orden creciente (lista, o arreglo
+            int64 de NumPy si use_numpy)
+        key (int): Clave del turno (ver turn_key)
+        use_numpy (bool): Usar la versión NumPy
+
+    Returns:
+        tuple: (sources, targets) de los zombis que se mueven, en orden creciente
+            de origen; listas, o arreglos de NumPy si use_numpy
+    """
+    if building.topology is not None:
+        return (_decide_csr_numpy if use_numpy else _decide_csr_python)(building, sources, key)
+    return (_decide_numpy if use_numpy else _decide_python)(building, sources, key)
+
+
+def _decide_python(building, indices, key):
+    """Implementación en Python puro del núcleo."""
+    zombies = building.zombies
+    stride = building.stride
+    last_room = stride - 1
+    size = building.size
+
+    sources = []
+    targets = []
+    for index in indices:
+        room_number = index % stride
+        if room_number == 0:
+            candidates = []
+            if stride > 1 and not zombies[index + 1]:
+                candidates.append(index + 1)
+            if index >= stride and not zombies[index - stride]:
+                candidates.append(index - stride)
+            if index + stride < size and not zombies[index + stride]:
+                candidates.append(index + stride)
+        else:
+            candidates = []
+            if not zombies[index - 1]:
+                candidates.append(index - 1)
+            if room_number < last_room and not zombies[index + 1]:
+                candidates.append(index + 1)
+        if candidates:
+            sources.append(index)
+            targets.append(candidates[_mix64(key ^ index) % len(candidates)])
+    return sources, targets
+
+
+def _decide_csr_python(building, indices, key):
+    """Implementación en Python puro del núcleo sobre la topología CSR de un plano general."""
+    zombies = building.zombies
+    offsets = building.topology.offsets
+    neighbours = building.topology.targets
+
+    sources = []
+    targets = []
+    for index in indices:
+        candidates = [neighbour for neighbour in neighbours[offsets[index]:offsets[index + 1]]
+                      if not zombies[neighbour]]
+        if candidates:
+            sources.append(index)
+            targets.append(candidates[_mix64(key ^ index) % len(candidates)])
+    return sources, targets
+
+
+def update_room_sets(building, sources, infested):
+    """
+    Actualiza los conjuntos de habitaciones infestadas y libres tras los
+    movimientos de un turno. El orden interno del conjunto de habitaciones libres
+    decide dónde aparecen los zombis generados, así que se actualiza siempre en
+    el mismo orden: primero los orígenes y después los destinos.
+
+    Args:
+        building (CompactBuilding): El edificio
+        sources: Índices de origen en orden creciente
+        infested: Índices distintos de los destinos, en el orden de aplicación
+    """
+    # Los orígenes no estaban libres y los destinos no están infestados
+    building.infested_indices.discard_many(sources)
+    building.free_indices.extend(sources)
+    building.infested_indices.extend(infested)
+    building.free_indices.discard_many(infested)
+
+
+def _apply_python(building, sources, targets):
+    """Aplica todos los movimientos y actualiza los contadores del edificio."""
+    zombies = building.zombies
+    alerts = building.alerts
+    staircases = building.staircases
+    stride = building.stride
+    floor_counts = building.floor_infested_counts
+    for index in sources:
+        zombies[index] = 0
+        floor_counts[index // stride] -= 1
+    new_alerts = 0
+    infested = sorted(set(targets))
+    for index in infested:
+        zombies[index] = 1
+        floor_counts[index // stride] += 1
+        if not staircases[index] and not alerts[index]:
+            alerts[index] = 1
+            new_alerts += 1
+    building.infested_count += len(infested) - len(sources)
+    building.alert_count += new_alerts
+    update_room_sets(building, sources, infested)
+
+
+def _decide_numpy(building, src, key):
+    """Implementación vectorizada con NumPy del núcleo."""
+    stride = building.stride
+    floors_count = building.floors_count
+    zombies = np.frombuffer(building.zombies, dtype=np.uint8)
+
+    room = src % stride
+    floor = src // stride
+    is_stair = room == 0
+    free = zombies == 0
+
+    # Candidatos en el mismo orden que Building.get_adjacent_rooms():
+    # escalera -> [habitación 1, escalera inferior, escalera superior]
+    # habitación -> [izquierda, derecha]
+    cand0 = np.where(is_stair, src + 1, src - 1)
+    ok0 = ~is_stair | (stride > 1)
+    cand1 = np.where(is_stair, src - stride, src + 1)
+    ok1 = np.where(is_stair, floor > 0, room < stride - 1)
+    cand2 = src + stride
+    ok2 = is_stair & (floor < floors_count - 1)
+
+    limit = building.size - 1
+    free0 = ok0 & free[np.clip(cand0, 0, limit)]
+    free1 = ok1 & free[np.clip(cand1, 0, limit)]
+    free2 = ok2 & free[np.clip(cand2, 0, limit)]
+    count = free0.astype(np.int64) + free1 + free2
+
+    moving = count > 0
+    src = src[moving]
+    free0, free1, free2 = free0[moving], free1[moving], free2[moving]
+    cand0, cand1, cand2 = cand0[moving], cand1[moving], cand2[moving]
+    pick = (_draw_array(key, src) % count[moving].astype(np.uint64)).astype(np.int64)
+
+    # Elegir el candidato libre número `pick` en orden
+    take0 = free0 & (pick == 0)
+    take1 = ~take0 & free1 & (pick - free0 == 0)
+    target = np.where(take0, cand0, np.where(take1, cand1, cand2))
+    return src, target
+
+
+def _decide_csr_numpy(building, src, key):
+    """Implementación vectorizada con NumPy del núcleo sobre la topología CSR de un plano general."""
+    zombies = np.frombuffer(building.zombies, dtype=np.uint8)
+    offsets = np.frombuffer(building.topology.offsets, dtype=np.int64)
+    neighbours = np.frombuffer(building.topology.targets, dtype=np.int64)
+
+    # Todas las aristas de las habitaciones infestadas, agrupadas por origen y en orden
+    start = offsets[src]
+    degree = offsets[src + 1] - start
+    owner = np.repeat(np.arange(src.size), degree)
+    group_start = np.cumsum(degree) - degree
+    candidates = neighbours[np.arange(owner.size) - group_start[owner] + start[owner]]
+    free = zombies[candidates] == 0
+
+    # Posición de cada candidato libre entre los libres de su origen
+    free_before = np.cumsum(free) - free
+    rank = free_before - free_before[group_start[owner]]
+    count = np.bincount(owner[free], minlength=src.size)
+
+    moving = count > 0
+    pick = np.zeros(src.size, dtype=np.int64)
+    pick[moving] = (_draw_array(key, src[moving])
+                    % count[moving].astype(np.uint64)).astype(np.int64)
+    chosen = free & (rank == pick[owner])
+    # Un candidato elegido por origen que se mueve, en orden creciente de origen
+    return src[moving], candidates[chosen]
+
+
+def _apply_numpy(building, src, target):
+    """Aplica todos los movimientos de una vez y actualiza los contadores del edificio."""
+    stride = building.stride
+    zombies = np.frombuffer(building.zombies, dtype=np.uint8)
+    alerts = np.frombuffer(building.alerts, dtype=np.uint8)
+    staircases = np.frombuffer(building.staircases, dtype=np.uint8)
+    infested = np.unique(target)
+    alerted = infested[(staircases[infested] == 0) & (alerts[infested] == 0)]
+    zombies[src] = 0
+    zombies[infested] = 1
+    alerts[alerted] = 1
+    floor_counts = np.frombuffer(building.floor_infested_counts, dtype=np.int64)
+    np.subtract.at(floor_counts, src // stride, 1)
+    np.add.at(floor_counts, infested // stride, 1)
+    building.infested_count += int(infested.size) - int(src.size)
+    building.alert_count += int(alerted.size)
+
+    sources = src.tolist()
+    update_room_sets(building, sources, infested.tolist())
+    return sources, target.tolist()
@@ -0,0 +1,251 @@
+import json
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from src import metrics
+
+# Importar el API activa las métricas; el resto de pruebas las espera como estaban
+METRICS_ENABLED = metrics.is_enabled()
+from src import api, session_api
+metrics.set_enabled(METRICS_ENABLED)
+
+def layout_file(records):
+    """Sube un plano JSON Lines con los registros dados."""
+    content = "".join(json.dumps(record) + "\n" for record in records)
+    return {"file": ("plano.jsonl", content, "application/x-ndjson")}
+
+def corridor_records(floors, rooms):
+    """Registros de un plano con un pasillo por piso y una escalera en la posición 0."""
+    records = []
+    for floor in range(floors):
+        records.append({"type": "room", "floor": floor, "room": 0, "kind": "staircase"})
+        for room in range(rooms):
+            records.append({"type": "edge", "floor": floor, "room": room, "to_floor": floor, "to_room": room + 1})
+    for floor in range(floors - 1):
+        records.append({"type": "edge", "floor": floor, "room": 0, "to_floor": floor + 1, "to_room": 0})
+    return records
+
+@pytest.fixture
+def client():
+    """Cliente del API que deja la simulación global, las sesiones y las métricas como estaban."""
+    metrics.set_enabled(True)
+    with TestClient(api.app) as client:
+        client.post("/api/simulation/reset")
+        yield client
+        client.post("/api/simulation/auto-run", json={"run": False})
+        client.post("/api/simulation/reset")
+    session_api.registry.close_all()
+    metrics.set_enabled(METRICS_ENABLED)
+
+def setup_building(client, prefix="/api/simulation", **config):
+    """Configura un edificio reproducible y devuelve la respuesta."""
+    response = client.post(f"{prefix}/setup", json=dict({"floors": 3, "roomsPerFloor": 4, "initialZombies": 2, "seed": 5}, **config))
+    assert response.status_code == 200
+    return response.json()
+
+def test_state_etag_and_since(client):
+    """Prueba para verificar el ETag, el 304 con If-None-Match y los cambios desde una versión."""
+    assert client.get("/api/simulation/state").status_code == 404
+    setup_building(client)
+
+    response = client.get("/api/simulation/state")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    state = response.json()
+    assert client.get("/api/simulation/state", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/api/simulation/advance")
+    changes = client.get("/api/simulation/state", params={"since": etag}).json()
+    assert not changes["full"] and changes["version"] > state["version"]
+    assert client.get("/api/simulation/state", headers={"If-None-Match": etag}).status_code == 200
+
+def test_since_after_reset_returns_full_state(client):
+    """Prueba para verificar que una versión anterior a un reinicio devuelve el estado completo."""
+    setup_building(client)
+    for _ in range(3):
+        client.post("/api/simulation/advance")
+    etag = client.get("/api/simulation/state").headers["ETag"]
+
+    assert client.post("/api/simulation/reset").json() == {"success": True}
+    setup_building(client, floors=2)
+    response = client.get("/api/simulation/state", params={"since": etag})
+    changes = response.json()
+    assert changes["full"] and len(changes["building"]) == 2
+    assert response.headers["ETag"] != etag
+    assert client.get("/api/simulation/state", headers={"If-None-Match": etag}).status_code == 200
+
+def test_advance_several_turns(client):
+    """Prueba para verificar que ?turns=N avanza N turnos y devuelve un resumen."""
+    setup_building(client)
+    summary = client.post("/api/simulation/advance", params={"turns": 4, "series": True}).json()
+    assert summary["turns_executed"] == len(summary["series"]) == 4
+    assert client.get("/api/simulation/state").json()["turn"] == 4
+    assert client.post("/api/simulation/advance", params={"turns": 0}).status_code == 422
+
+def test_metrics(client):
+    """Prueba para verificar que /metrics expone los turnos y las peticiones en formato Prometheus."""
+    setup_building(client)
+    client.post("/api/simulation/advance", params={"turns": 2})
+    response = client.get("/metrics")
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    assert "zombie_turns_total" in response.text and "zombie_api_requests_total" in response.text
+
+def test_profile(client):
+    """Prueba para verificar que el perfilador se arma, perfila los turnos pedidos y se desarma."""
+    setup_building(client)
+    assert client.get("/api/simulation/profile").status_code == 404
+    assert client.post("/api/simulation/profile", json={}).status_code == 400
+    assert client.post("/api/simulation/profile", json={"turns": 2}).json()["turns_profiled"] == 0
+
+    client.post("/api/simulation/advance", params={"turns": 3})
+    profile = client.get("/api/simulation/profile", params={"limit": 5}).json()
+    assert profile["turns_profiled"] == 2 and profile["done"] and profile["stats"]
+    assert client.get("/api/simulation/profile", params={"format": "collapsed"}).text
+    assert client.delete("/api/simulation/profile").json() == {"success": True}
+    assert client.get("/api/simulation/profile").status_code == 404
+
+@pytest.mark.parametrize("session", [False, True])
+def test_setup_layout_upload(client, session):
+    """Prueba para verificar que un plano válido configura el edificio y uno inválido devuelve 400."""
+    prefix = "/api/simulation"
+    if session:
+        prefix = f"/api/sessions/{client.post('/api/sessions').json()['session_id']}"
+
+    response = client.post(f"{prefix}/setup-layout", files=layout_file(corridor_records(2, 3)), params={"initialZombies": 1})
+    assert response.status_code == 200
+    assert response.json()["building"]["floors"] == 2 and len(response.json()["zombies_added"]) == 1
+    assert len(client.get(f"{prefix}/state").json()["building"]) == 2
+
+    # Una arista hacia sí misma y una línea que no es JSON son planos inválidos
+    invalid = [{"type": "edge", "floor": 0, "room": 1, "to_floor": 0, "to_room": 1}]
+    response = client.post(f"{prefix}/setup-layout", files=layout_file(invalid))
+    assert response.status_code == 400 and response.json()["detail"]
+    response = client.post(f"{prefix}/setup-layout", files={"file": ("plano.jsonl", "{no es json\n", "application/x-ndjson")})
+    assert response.status_code == 400
+    huge = [{"type": "room", "floor": 100000000000, "room": 100000000000}]
+    assert client.post(f"{prefix}/setup-layout", files=layout_file(huge)).status_code == 400
+    assert client.post(f"{prefix}/setup-layout", files=layout_file(corridor_records(2, 3)),
+                       params={"floors": 100000, "roomsPerFloor": 100000}).status_code == 400
+    # El edificio anterior se conserva
+    assert len(client.get(f"{prefix}/state").json()["building"]) == 2
+
+def test_sessions_are_independent(client):
+    """Prueba para verificar que cada sesión tiene su propia simulación."""
+    first = client.post("/api/sessions", json={"seed": 3}).json()["session_id"]
+    second = client.post("/api/sessions").json()["session_id"]
+    assert {session["session_id"] for session in client.get("/api/sessions").json()} >= {first, second}
+
+    setup_building(client, f"/api/sessions/{first}")
+    assert client.get(f"/api/sessions/{second}/state").status_code == 404
+    client.post(f"/api/sessions/{first}/advance", params={"turns": 2})
+    assert client.get(f"/api/sessions/{first}/state").json()["turn"] == 2
+    assert client.get("/api/simulation/state").status_code == 404
+
+    assert client.delete(f"/api/sessions/{first}").json() == {"success": True}
+    assert client.get(f"/api/sessions/{first}/state").status_code == 404
+    assert client.delete(f"/api/sessions/{first}").status_code == 404
+
+def test_running_session_is_not_evicted(client, monkeypatch):
+    """Prueba para verificar que una sesión con el avance automático en marcha no se expulsa por inactividad."""
+    session_id = client.post("/api/sessions").json()["session_id"]
+    prefix = f"/api/sessions/{session_id}"
+    setup_building(client, prefix)
+    assert client.post(f"{prefix}/auto-run", json={"run": True, "ticksPerSecond": 0.001}).json()["auto_running"]
+
+    # Sin peticiones durante más que el tiempo de inactividad
+    registry = session_api.registry
+    clock = registry._clock
+    monkeypatch.setattr(registry, "_clock", lambda: clock() + registry.idle_timeout + 1)
+    registry.evict_idle()
+    assert client.get(f"{prefix}/auto-run").json()["auto_running"]
+
+    assert not client.post(f"{prefix}/auto-run", json={"run": False}).json()["auto_running"]
+    monkeypatch.setattr(registry, "_clock", lambda: clock() + 2 * registry.idle_timeout + 2)
+    registry.evict_idle()
+    assert client.get(f"{prefix}/state").status_code == 404
+
+def test_session_stream(client):
+    """Prueba para verificar que el flujo empieza con la instantánea y termina al borrar la sesión."""
+    session_id = client.post("/api/sessions").json()["session_id"]
+    setup_building(client, f"/api/sessions/{session_id}")
+    session = session_api.registry.get(session_id)
+
+    responses = []
+    reader = threading.Thread(target=lambda: responses.append(client.get(f"/api/sessions/{session_id}/stream")))
+    reader.start()
+    deadline = time.monotonic() + 5
+    while session.broadcaster.subscriber_count == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    client.post(f"/api/sessions/{session_id}/advance")
+    client.delete(f"/api/sessions/{session_id}")
+    reader.join(5)
+
+    assert not reader.is_alive()
+    response = responses[0]
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block.split("\n", 1)[0] for block in response.text.split("\n\n") if block.startswith("event:")]
+    assert events[0] == "event: snapshot" and "event: diff" in events
+
+def in_thread(results, call):
+    """Lanza una petición en otro hilo y guarda su respuesta en results."""
+    thread = threading.Thread(target=lambda: results.append(call()))
+    thread.start()
+    return thread
+
+def test_busy_session_does_not_block_the_server(client):
+    """Prueba para verificar que las peticiones que esperan el cerrojo de una sesión ocupada no bloquean el servidor."""
+    busy, other = (client.post("/api/sessions").json()["session_id"] for _ in range(2))
+    for session_id in (busy, other):
+        setup_building(client, f"/api/sessions/{session_id}")
+    session = session_api.registry.get(busy)
+
+    waiting, served = [], []
+    # Tener el cerrojo equivale a un avance largo en otro hilo
+    with session.lock:
+        threads = [in_thread(waiting, lambda: client.get(f"/api/sessions/{busy}/state")),
+                   in_thread(waiting, lambda: client.get(f"/api/sessions/{busy}/stream"))]
+        time.sleep(0.1)
+        checker = in_thread(served, lambda: [client.post(f"/api/sessions/{busy}/auto-run", json={"run": True, "fastForward": True, "turns": 3}).status_code,
+                                             client.get("/metrics").status_code,
+                                             client.get(f"/api/sessions/{other}/state").status_code])
+        checker.join(5)
+        blocked = checker.is_alive()
+        assert not waiting
+    assert not blocked and served == [[200, 200, 200]]
+
+    deadline = time.monotonic() + 5
+    checker.join(5)
+    while client.get(f"/api/sessions/{busy}/auto-run").json()["auto_running"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    client.delete(f"/api/sessions/{busy}")
+    for thread in threads:
+        thread.join(5)
+    assert sorted(response.status_code for response in waiting) == [200, 200]
+    assert session.simulation.turn == 3
+
+def test_session_actions_wait_off_the_event_loop(client):
+    """Prueba para verificar que las acciones sobre una sesión ocupada no bloquean a las demás sesiones."""
+    busy, other = (client.post("/api/sessions").json()["session_id"] for _ in range(2))
+    for session_id in (busy, other):
+        setup_building(client, f"/api/sessions/{session_id}")
+    session = session_api.registry.get(busy)
+    prefix = f"/api/sessions/{busy}"
+
+    waiting, served = [], []
+    with session.lock:
+        threads = [in_thread(waiting, lambda: client.post(f"{prefix}/setup", json={"floors": 2, "roomsPerFloor": 3})),
+                   in_thread(waiting, lambda: client.post(f"{prefix}/setup-layout", files=layout_file(corridor_records(2, 3)))),
+                   in_thread(waiting, lambda: client.post(f"{prefix}/add-practicante", params={"count": 2})),
+                   in_thread(waiting, lambda: client.post(f"{prefix}/use-secret-weapon"))]
+        time.sleep(0.1)
+        checker = in_thread(served, lambda: [client.post(f"/api/sessions/{other}/add-zombie").status_code,
+                                             client.get(f"/api/sessions/{other}/state").status_code])
+        checker.join(5)
+        blocked = checker.is_alive()
+        assert not waiting
+    assert not blocked and served == [[200, 200]]
+
+    for thread in threads + [checker]:
+        thread.join(5)
+    assert [response.status_code for response in waiting] == [200] * 4
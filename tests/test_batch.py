@@ -0,0 +1,39 @@
+import pytest
+from src.batch import build_tasks, run_single, run_batch, write_columnar, read_columnar, RESULT_COLUMNS
+
+def test_build_tasks_covers_grid():
+    """Prueba para verificar que se genera una ejecución por combinación y repetición."""
+    tasks = build_tasks([2, 3], [4], [1, 2], [True, False], runs=3, seed=5)
+    assert len(tasks) == 2 * 1 * 2 * 2 * 3
+    # Las semillas se derivan de la semilla base de forma reproducible
+    assert [t["seed"] for t in tasks] == [t["seed"] for t in build_tasks([2, 3], [4], [1, 2], [True, False], runs=3, seed=5)]
+
+def test_run_single_is_reproducible():
+    """Prueba para verificar que una ejecución con la misma semilla da el mismo resultado."""
+    task = build_tasks([3], [4], [1], [True], runs=1, seed=9, max_turns=200)[0]
+    first = run_single(task)
+    assert first == run_single(task)
+    assert first["turns"] <= 200
+    # Con generación activada el juego termina por captura o por infestación total
+    assert first["turns_to_full_infestation"] != -1 or first["practicante_survival_turn"] != -1
+
+def test_run_batch_and_columnar_roundtrip(tmp_path):
+    """Prueba para verificar que el lote se ejecuta en paralelo y se guarda en formato columnar."""
+    tasks = build_tasks([2], [3], [1], [True], runs=4, seed=1, max_turns=100)
+    columns = run_batch(tasks, workers=2)
+    assert list(columns) == [name for name, _ in RESULT_COLUMNS]
+    assert len(columns["turns"]) == 4
+    # Los resultados llegan en el orden de las tareas
+    assert list(columns["seed"]) == [t["seed"] for t in tasks]
+    assert list(columns["turns"]) == [run_single(t)["turns"] for t in tasks]
+    
+    path = tmp_path / "resultados.zcol"
+    write_columnar(str(path), columns)
+    assert read_columnar(str(path)) == columns
+
+def test_read_columnar_rejects_other_files(tmp_path):
+    """Prueba para verificar que no se aceptan archivos con otro formato."""
+    path = tmp_path / "otro.txt"
+    path.write_text("hola\n")
+    with pytest.raises(ValueError):
+        read_columnar(str(path))
@@ -0,0 +1,32 @@
+import pytest
+from src.benchmark import run_benchmarks, compare_results, write_results, read_results, building_shape
+
+def test_building_shape_matches_size():
+    """Prueba para verificar que las dimensiones dan el número de habitaciones pedido."""
+    for exponent in range(2, 7):
+        floors, rooms_per_floor = building_shape(exponent)
+        assert floors * (rooms_per_floor + 1) == 10 ** exponent
+
+def test_run_and_compare_with_baseline(tmp_path):
+    """Prueba para verificar que las mediciones se guardan y se comparan con una línea base."""
+    cases = ["building_construction", "advance_turn", "get_building_state"]
+    results = run_benchmarks(sizes=[2], densities=[0.1], backends=["compact"], cases=cases, repeat=2)
+    assert [result["case"] for result in results] == cases
+    assert all(result["rooms"] == 100 and result["min"] > 0 for result in results)
+
+    path = tmp_path / "resultados.json"
+    write_results(path, results)
+    baseline = read_results(path)
+    assert baseline == results
+
+    # Una medición el doble de lenta que la línea base es una regresión
+    slower = [dict(result, min=result["min"] * 2) for result in results]
+    comparison = compare_results(slower, baseline, threshold=0.5)
+    assert len(comparison) == len(cases)
+    assert all(entry["regression"] and entry["ratio"] == pytest.approx(2) for entry in comparison)
+    assert not any(entry["regression"] for entry in compare_results(results, baseline))
+
+def test_unknown_case():
+    """Prueba para verificar que se rechazan los casos desconocidos."""
+    with pytest.raises(ValueError):
+        run_benchmarks(sizes=[2], cases=["no_existe"])
@@ -0,0 +1,61 @@
+import random
+from collections import deque
+import pytest
+from src.danger import DangerField
+from src.models.building import Building
+from src.models.compact_building import CompactBuilding
+from src.models.practicante import Practicante
+from src.simulation import Simulation
+
+def brute_force_distances(building):
+    """Distancias al zombi más cercano con una BFS independiente desde cada zombi."""
+    distances = [None] * building.total_rooms
+    for source in building.infested_indices:
+        seen = {source: 0}
+        queue = deque([source])
+        while queue:
+            index = queue.popleft()
+            for neighbour in building.neighbour_indices(index):
+                if neighbour not in seen:
+                    seen[neighbour] = seen[index] + 1
+                    queue.append(neighbour)
+        for index, distance in seen.items():
+            if distances[index] is None or distance < distances[index]:
+                distances[index] = distance
+    return distances
+
+@pytest.mark.parametrize("backend", [Building, CompactBuilding])
+def test_danger_field_matches_brute_force(backend):
+    """Prueba para verificar que el campo coincide con la distancia real, truncada al radio."""
+    rng = random.Random(7)
+    building = backend(6, 9)
+    for index in rng.sample(range(building.total_rooms), 5):
+        building.get_room_by_index(index).add_zombies()
+    expected = brute_force_distances(building)
+
+    field = DangerField(radius=4)
+    modes = [False, True] if backend is CompactBuilding else [False]
+    for use_numpy in modes:
+        field.update(building, use_numpy=use_numpy)
+        for index, distance in enumerate(expected):
+            assert field.distance(index) == (distance if distance <= 4 else 5)
+
+    # Al recalcular se olvidan las habitaciones de la búsqueda anterior
+    for index in list(building.infested_indices):
+        building.get_room_by_index(index).remove_zombies()
+    field.update(building)
+    assert all(field.distance(index) == field.far for index in range(building.total_rooms))
+
+def test_practicante_moves_away_from_nearest_zombie():
+    """Prueba para verificar que el practicante elige la habitación más alejada de los zombis."""
+    simulation = Simulation(seed=1)
+    simulation.setup_building(1, 8)
+    simulation.building.get_room(0, 2).add_zombies()
+    simulation.practicante = Practicante(0, 4)
+
+    # Los vecinos son la habitación 3 (a 1 paso del zombi) y la 5 (a 3 pasos)
+    assert simulation.move_practicante()["to"] == (0, 5)
+
+    # Con zombis a ambos lados a igual distancia se queda donde está
+    simulation.building.get_room(0, 8).add_zombies()
+    assert not simulation.move_practicante()["moved"]
@@ -0,0 +1,104 @@
+import pytest
+from src.simulation import Simulation
+from src.state import simulation_state
+from src.journal import TurnJournal, JournalReader, JournalError, load_journal
+
+def comparable_state(simulation):
+    """Estado de la simulación sin los campos que identifican la instancia."""
+    state = simulation_state(simulation)
+    state.pop("version")
+    state.pop("state_id")
+    return state
+
+@pytest.mark.parametrize("backend", ["objects", "compact"])
+def test_seek_reproduces_recorded_states(backend, tmp_path):
+    """Prueba para verificar que volver a un turno reconstruye el estado registrado."""
+    simulation = Simulation(seed=11)
+    simulation.setup_building(4, 6, backend)
+    journal = TurnJournal(simulation, keyframe_interval=4)
+    simulation.add_initial_zombies(2)
+    simulation.add_practicante()
+    simulation.toggle_zombie_generation()
+
+    states = {}
+    for turn in range(1, 13):
+        simulation.advance_turn()
+        if turn == 5:
+            simulation.use_secret_weapon()
+            for floor in simulation.building.floors:
+                for room in floor.get_rooms()[1:]:
+                    if room.has_zombies:
+                        simulation.clean_room(room.floor_number, room.room_number)
+                        simulation.reset_sensor(room.floor_number, room.room_number)
+                        break
+        states[turn] = comparable_state(simulation)
+        if simulation.is_game_over():
+            break
+    journal.close()
+
+    assert len(journal.keyframes) > 1
+    for turn, state in states.items():
+        assert comparable_state(journal.seek(turn)) == state
+
+    # El diario guardado se reproduce sin la simulación
+    path = tmp_path / "diario.bin"
+    journal.save(path)
+    reader = load_journal(path)
+    assert reader.keyframes == journal.keyframes
+    last = max(states)
+    assert comparable_state(reader.seek(last)) == states[last]
+
+    actions = [entry["action"] for entry in reader.replay(stop_turn=5)]
+    assert actions[:3] == ["initial_zombies", "practicante", "generation"]
+    assert actions.count("turn") == 5
+    assert "secret_weapon" in actions and "clean_room" in actions
+    assert all(entry["turn"] >= 8 for entry in reader.replay(start_turn=8))
+
+def test_journal_errors():
+    """Prueba para verificar los errores de datos no válidos y turnos no registrados."""
+    simulation = Simulation(seed=3)
+    simulation.setup_building(2, 2)
+    simulation.advance_turn()
+    journal = TurnJournal(simulation)
+    with pytest.raises(JournalError):
+        journal.seek(0)
+    with pytest.raises(JournalError):
+        JournalReader(b"otro formato")
+    with pytest.raises(ValueError):
+        TurnJournal(simulation, keyframe_interval=0)
+
+def test_seek_restores_every_practicante():
+    """Prueba para verificar que volver a un turno restaura a todos los practicantes y los capturados."""
+    simulation = Simulation(seed=5)
+    simulation.setup_building(5, 8, "compact")
+    journal = TurnJournal(simulation, keyframe_interval=3)
+    simulation.add_initial_zombies(3)
+    simulation.add_practicantes(5)
+
+    states = {}
+    for turn in range(1, 9):
+        simulation.advance_turn()
+        states[turn] = comparable_state(simulation), [index for _, index in simulation.occupancy.items()]
+        if simulation.is_game_over():
+            break
+    journal.close()
+
+    assert states[1][0]["occupants"]["count"] == 5
+    for turn, (state, practicantes) in states.items():
+        restored = journal.seek(turn)
+        assert comparable_state(restored) == state
+        assert [index for _, index in restored.occupancy.items()] == practicantes
+
+@pytest.mark.parametrize("seed", [-5, 0, 2 ** 64 + 3])
+def test_journal_keeps_any_seed(seed):
+    """Prueba para verificar que el diario guarda semillas negativas y grandes y las recupera al leerlo."""
+    simulation = Simulation(seed=seed)
+    simulation.setup_building(2, 3)
+    journal = TurnJournal(simulation)
+    simulation.add_initial_zombies(1)
+    simulation.advance_turn()
+    journal.close()
+
+    reader = JournalReader(bytes(journal.buffer))
+    assert reader.seed == seed
+    assert comparable_state(reader.seek(1)) == comparable_state(simulation)
@@ -0,0 +1,87 @@
+import random
+import pytest
+from src import turn_kernel
+from src.models.building import Building
+from src.models.compact_building import CompactBuilding, CompactElevator, CompactStaircase
+from src.models.elevator import Elevator
+from src.models.layout import BuildingLayout, LayoutError
+from src.models.staircase import Staircase
+from src.simulation import Simulation
+
+def make_layout():
+    """Plano de 4 pisos con un atajo por piso, dos escaleras y un ascensor que salta pisos."""
+    layout = BuildingLayout(4, 6)
+    for floor_number in range(4):
+        layout.add_corridor(floor_number)
+        layout.connect(floor_number, 1, floor_number, 5)
+    layout.add_staircase(0)
+    layout.add_staircase(6, floors=[1, 2])
+    layout.add_elevator(3, [0, 3])
+    return layout
+
+def test_corridor_layout_matches_default_topology():
+    """Prueba para verificar que el plano de pasillos reproduce la topología y los movimientos del edificio clásico."""
+    layout = BuildingLayout.corridors(5, 7)
+    regular, general = Building(5, 7), Building(5, 7, layout=layout)
+    for index in range(regular.total_rooms):
+        assert list(general.neighbour_indices(index)) == list(regular.neighbour_indices(index))
+
+    for use_numpy in (False, True):
+        plain, csr = CompactBuilding(5, 7), CompactBuilding(5, 7, layout=layout)
+        for index in random.Random(2).sample(range(plain.size), 12):
+            plain.get_room_by_index(index).add_zombies()
+            csr.get_room_by_index(index).add_zombies()
+        for turn in range(20):
+            assert (turn_kernel.advance_zombies(plain, 11, turn, use_numpy)
+                    == turn_kernel.advance_zombies(csr, 11, turn, use_numpy))
+        assert plain.zombies == csr.zombies and plain.alerts == csr.alerts
+
+@pytest.mark.parametrize("backend", [Building, CompactBuilding])
+def test_general_layout_rooms_and_adjacency(backend):
+    """Prueba para verificar las escaleras, los ascensores y las adyacencias de un plano general."""
+    building = backend(4, 6, layout=make_layout())
+    elevator = building.get_room(3, 3)
+    assert isinstance(elevator, (Elevator, CompactElevator))
+    assert elevator.sensor is None
+    assert [floor.floor_number for floor in elevator.get_connected_floors()] == [0]
+    assert [room.get_location() for room in building.get_room(0, 3).get_adjacent_rooms()] == [(0, 2), (0, 4), (3, 3)]
+    assert [room.get_location() for room in building.get_room(2, 1).get_adjacent_rooms()] == [(2, 0), (2, 2), (2, 5)]
+    assert building.get_room(3, 6).sensor is not None
+    assert isinstance(building.get_room(1, 6), (Staircase, CompactStaircase))
+    assert [floor.floor_number for floor in building.get_room(1, 6).get_connected_floors()] == [2]
+
+def test_layout_validation():
+    """Prueba para verificar que no se aceptan planos no válidos ni cambios en un plano en uso."""
+    layout = BuildingLayout(2, 3)
+    with pytest.raises(LayoutError):
+        layout.connect(0, 1, 2, 1)
+    with pytest.raises(LayoutError):
+        layout.add_edge(2, 2)
+    with pytest.raises(LayoutError):
+        layout.add_elevator(1, [0])
+    layout.add_staircase(0)
+    with pytest.raises(LayoutError):
+        layout.add_elevator(0, [0, 1])
+    with pytest.raises(LayoutError):
+        BuildingLayout.from_dict({"floors": 2, "rooms_per_floor": 3, "edges": [0, 1, 2]})
+    with pytest.raises(ValueError):
+        Building(3, 3, layout=layout)
+    layout.topology()
+    with pytest.raises(LayoutError):
+        layout.add_corridor(0)
+
+def test_simulation_with_layout_survives_snapshot(tmp_path):
+    """Prueba para verificar que la simulación usa el plano y lo conserva en las instantáneas."""
+    simulation = Simulation(seed=6)
+    info = simulation.setup_building(backend="compact", layout=make_layout())
+    assert (info["staircases"], info["elevators"], info["normal_rooms"]) == (6, 2, 20)
+    simulation.add_initial_zombies(3)
+    simulation.add_practicantes(5)
+    for _ in range(5):
+        simulation.advance_turn()
+
+    path = tmp_path / "plano.snap"
+    simulation.save_snapshot(path)
+    loaded = Simulation.load_snapshot(path)
+    assert loaded.building.layout.to_dict() == simulation.building.layout.to_dict()
+    assert [loaded.advance_turn() for _ in range(5)] == [simulation.advance_turn() for _ in range(5)]
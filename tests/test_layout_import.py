@@ -0,0 +1,95 @@
+import json
+import pytest
+from src import layout_import
+from src.layout_import import read_layout
+from src.models.layout import BuildingLayout, LayoutError
+from src.simulation import Simulation
+
+def plan_records():
+    """Registros de un plano de 3 pisos: pasillos, una escalera en la posición 0 y un ascensor entre los pisos 0 y 2."""
+    records = []
+    for floor in range(3):
+        records.append({"type": "room", "floor": floor, "room": 0, "kind": "staircase"})
+        records.append({"type": "room", "floor": floor, "room": 1, "sensor": f"P{floor}H1"})
+        for room in range(3):
+            records.append({"type": "edge", "floor": floor, "room": room, "to_floor": floor, "to_room": room + 1})
+    for floor in range(2):
+        records.append({"type": "edge", "floor": floor, "room": 0, "to_floor": floor + 1, "to_room": 0})
+    records.append({"type": "room", "floor": 0, "room": 3, "kind": "elevator"})
+    records.append({"type": "room", "floor": 2, "room": 3, "kind": "elevator"})
+    records.append({"type": "edge", "floor": 0, "room": 3, "to_floor": 2, "to_room": 3})
+    return records
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return path
+
+def write_csv(path, records):
+    rows = [",".join(str(record.get(column, "")) for column in layout_import.CSV_COLUMNS) for record in records]
+    path.write_text("\n".join([",".join(layout_import.CSV_COLUMNS)] + rows) + "\n")
+    return path
+
+def test_jsonl_and_csv_build_the_same_layout(tmp_path):
+    """Prueba para verificar que los dos formatos dan el mismo plano y que la simulación lo usa."""
+    expected = BuildingLayout(3, 3)
+    for floor in range(3):
+        expected.add_corridor(floor)
+    expected.add_staircase(0)
+    expected.add_elevator(3, [0, 2])
+
+    records = plan_records()
+    layouts = [read_layout(write_jsonl(tmp_path / "plano.jsonl", records)),
+               read_layout(write_csv(tmp_path / "plano.csv", records)),
+               read_layout(write_csv(tmp_path / "plano.txt", records))]
+    for layout in layouts:
+        assert (layout.floors_count, layout.rooms_per_floor) == (3, 3)
+        assert layout.kinds == expected.kinds
+        for index in range(layout.size):
+            assert sorted(layout.topology().neighbours(index)) == sorted(expected.topology().neighbours(index))
+
+    simulation = Simulation(seed=1)
+    info = simulation.setup_building(backend="compact", layout=layouts[0])
+    assert (info["staircases"], info["elevators"], info["normal_rooms"]) == (3, 2, 7)
+    simulation.add_initial_zombies(2)
+    simulation.advance_turns(5)
+
+@pytest.mark.parametrize("record, message", [
+    ({"type": "door", "floor": 0, "room": 1}, "tipo de registro"),
+    ({"type": "room", "floor": -1, "room": 1}, "entero no negativo"),
+    ({"type": "room", "floor": 0, "room": 2, "kind": "tunnel"}, "tipo de habitación"),
+    ({"type": "room", "floor": 0, "room": 2, "sensor": "P9H9"}, "no corresponde"),
+    ({"type": "room", "floor": 0, "room": 1}, "aparece dos veces"),
+    ({"type": "edge", "floor": 0, "room": 2, "to_floor": 1, "to_room": 2}, "une dos pisos"),
+    ({"type": "edge", "floor": 0, "room": 0, "to_floor": 2, "to_room": 3}, "une dos pisos"),
+    ({"type": "room", "floor": 100000000000, "room": 100000000000}, "tamaño máximo"),
+    ({"type": "edge", "floor": 0, "room": 1, "to_floor": 2 ** 70, "to_room": 1}, "tamaño máximo"),
+    ({"type": "room", "floor": 100000, "room": 100000}, "tamaño máximo"),
+])
+def test_invalid_records_are_rejected(tmp_path, record, message):
+    """Prueba para verificar que los registros no válidos se rechazan con un mensaje claro."""
+    path = write_jsonl(tmp_path / "plano.jsonl", plan_records() + [record])
+    with pytest.raises(LayoutError, match=message):
+        read_layout(path)
+
+def test_dimensions_and_progress(tmp_path, monkeypatch):
+    """Prueba para verificar las dimensiones indicadas, los errores de formato y el informe de progreso."""
+    path = write_jsonl(tmp_path / "plano.jsonl", plan_records())
+    layout = read_layout(path, floors_count=5, rooms_per_floor=4)
+    assert (layout.floors_count, layout.rooms_per_floor) == (5, 4)
+    with pytest.raises(LayoutError):
+        read_layout(path, rooms_per_floor=2)
+    with pytest.raises(LayoutError, match="tamaño máximo"):
+        read_layout(path, floors_count=layout_import.MAX_LAYOUT_ROOMS)
+
+    monkeypatch.setattr(layout_import, "PROGRESS_INTERVAL", 5)
+    reports = []
+    read_layout(path, progress=reports.append)
+    assert [report["records"] for report in reports] == [5, 10, 15, 20, 20]
+    assert reports[-1]["bytes"] == reports[-1]["total_bytes"] == path.stat().st_size
+
+    (tmp_path / "vacio.csv").write_text("")
+    (tmp_path / "roto.jsonl").write_text('{"type": "room", "floor": 0,\n')
+    (tmp_path / "columnas.csv").write_text("type,floor,room,door\nroom,0,1,x\n")
+    for name in ("vacio.csv", "roto.jsonl", "columnas.csv"):
+        with pytest.raises(LayoutError):
+            read_layout(tmp_path / name)
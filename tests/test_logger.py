@@ -0,0 +1,78 @@
+import gzip
+import logging
+import os
+import pytest
+import time
+from src import logger
+from src.logger import CompressingRotatingFileHandler, TurnLogBudget
+
+def make_record(message):
+    """Crea un registro de log con el mensaje dado."""
+    return logging.LogRecord("prueba", logging.INFO, __file__, 0, message, None, None)
+
+def test_rotation_by_size_compresses(tmp_path):
+    """Prueba para verificar que el archivo se rota por tamaño y se comprime con gzip."""
+    path = tmp_path / "logs" / "prueba.log"
+    handler = CompressingRotatingFileHandler(str(path), max_bytes=100, max_age=0, backup_count=2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        for i in range(30):
+            handler.emit(make_record(f"mensaje {i:02d}"))
+    finally:
+        handler.close()
+
+    rotated = sorted(p.name for p in path.parent.iterdir())
+    assert rotated == ["prueba.log", "prueba.log.1.gz", "prueba.log.2.gz"]
+    with gzip.open(path.parent / "prueba.log.1.gz", "rt") as f:
+        assert "mensaje" in f.read()
+    assert path.stat().st_size <= 100
+
+def test_rotation_by_age(tmp_path):
+    """Prueba para verificar que un archivo más antiguo que max_age se rota al escribir."""
+    path = tmp_path / "prueba.log"
+    path.write_text("antiguo\n")
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    handler = CompressingRotatingFileHandler(str(path), max_bytes=0, max_age=60)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        handler.emit(make_record("nuevo"))
+    finally:
+        handler.close()
+
+    assert path.read_text() == "nuevo\n"
+    with gzip.open(tmp_path / "prueba.log.1.gz", "rt") as f:
+        assert f.read() == "antiguo\n"
+
+def test_turn_budget_limits_messages():
+    """Prueba para verificar que el presupuesto por turno descarta los mensajes sobrantes."""
+    previous = logger.logger.level
+    try:
+        logger.logger.setLevel(logging.INFO)
+        assert logger.turn_budget() is None
+
+        logger.logger.setLevel(logging.DEBUG)
+        budget = logger.turn_budget(limit=3)
+        assert isinstance(budget, TurnLogBudget)
+        for i in range(10):
+            budget.debug("mensaje %d", i)
+        assert budget.remaining == 0 and budget.suppressed == 7
+    finally:
+        logger.logger.setLevel(previous)
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere os.fork")
+def test_forked_children_write_to_the_file():
+    """Prueba para verificar que un proceso hijo creado con fork escribe sus mensajes en el archivo."""
+    message = f"mensaje del hijo {os.getpid()} {time.time()}"
+    pid = os.fork()
+    if pid == 0:
+        # Sin el hilo del QueueListener, el mensaje solo llega al archivo si se escribe directamente
+        code = 0 if logger.queue_handler not in logger.logger.handlers else 1
+        logger.info(message)
+        os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    with open(logger.file_handler.baseFilename, encoding="utf-8") as f:
+        assert message in f.read()
+    assert logger.queue_handler in logger.logger.handlers
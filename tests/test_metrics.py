@@ -0,0 +1,56 @@
+from src import metrics
+from src.simulation import Simulation
+
+def test_disabled_metrics_record_nothing():
+    """Prueba para verificar que con las métricas desactivadas no se registra nada."""
+    metrics.reset()
+    assert metrics.turn_timer() is None
+    simulation = Simulation(seed=2)
+    simulation.setup_building(3, 4)
+    simulation.add_initial_zombies(2)
+    simulation.advance_turns(3)
+    assert metrics.TURNS.value() == 0
+    assert metrics.TURN_SECONDS.count() == 0
+
+def test_turn_phases_and_counters():
+    """Prueba para verificar que cada turno registra sus fases y los contadores."""
+    metrics.set_enabled(True)
+    metrics.reset()
+    try:
+        simulation = Simulation(seed=4)
+        simulation.setup_building(3, 4, "compact")
+        simulation.add_initial_zombies(3)
+        simulation.add_practicante()
+        simulation.toggle_zombie_generation()
+        simulation.advance_turns(5)
+
+        assert metrics.TURNS.value() == 5
+        assert metrics.TURN_SECONDS.count() == 5
+        assert metrics.MOVES.value() > 0
+        for phase in ("practicante", "spawn", "recount", "notify"):
+            assert metrics.TURN_PHASE_SECONDS.count(phase) == 5
+        text = metrics.render()
+        assert "# TYPE zombie_turn_phase_seconds histogram" in text
+        assert 'zombie_turn_phase_seconds_bucket{phase="spawn",le="+Inf"} 5' in text
+        assert "zombie_turns_total 5" in text
+    finally:
+        metrics.set_enabled(False)
+        metrics.reset()
+
+def test_timed_lock_and_label_escaping():
+    """Prueba para verificar la espera del cerrojo y el escape de las etiquetas."""
+    metrics.set_enabled(True)
+    metrics.reset()
+    try:
+        lock = metrics.TimedLock("prueba")
+        with lock:
+            assert lock.locked()
+        assert lock.acquire(timeout=0)
+        lock.release()
+        assert metrics.LOCK_WAIT_SECONDS.count("prueba") == 2
+
+        metrics.API_REQUESTS.inc("GET", 'ruta "rara"\n', "200")
+        assert 'route="ruta \\"rara\\"\\n"' in metrics.render()
+    finally:
+        metrics.set_enabled(False)
+        metrics.reset()
@@ -1,9 +1,14 @@
 import pytest
+import random
 from src.models.building import Building
 from src.models.floor import Floor
 from src.models.room import Room
 from src.models.sensor import Sensor
 from src.models.staircase import Staircase
+from src.models.compact_building import CompactBuilding
+from src.models.room_set import RoomIndexSet
+from src.models import topology
+from src.models.topology import BuildingTopology, building_topology, neighbour_indices
 
 def test_room_creation():
     room = Room(0, 1)  # floor_number, room_number
@@ -193,4 +198,146 @@ def test_building_room_connections():
     
     # Verificar conexiones verticales (escaleras)
     assert staircase_1 in staircase_0.get_adjacent_rooms()
-    assert staircase_0 in staircase_1.get_adjacent_rooms() 
\ No newline at end of file
+    assert staircase_0 in staircase_1.get_adjacent_rooms() 
+
+def test_building_coordinate_index():
+    """Prueba para verificar que el índice de coordenadas del edificio localiza habitaciones en ambos sentidos."""
+    building = Building(3, 4)
+    
+    for floor_idx, floor in enumerate(building.floors):
+        for room_idx, room in enumerate(floor.get_rooms()):
+            assert building.locate_room(room) == (floor_idx, room_idx)
+            assert room.get_location() == (floor_idx, room_idx)
+            assert floor.get_room_position(room) == room_idx
+            assert building.get_room_by_index(room.index) is room
+    
+    # Una habitación ajena al edificio no tiene coordenadas
+    assert building.locate_room(Room(0, 1)) is None
+    assert building.get_room_by_index(len(building.rooms)) is None
+
+
+def test_room_sensor_view_shares_room_state():
+    """Prueba para verificar que el sensor es una vista del estado de la habitación y que los modelos no tienen __dict__."""
+    building = Building(2, 3)
+    room = building.get_room(1, 2)
+    assert room.sensor.id == "P1H2"
+    assert room.sensor.state == "normal"
+    
+    room.sensor.set_alert()
+    assert room.sensor.is_alert() and room.sensor.state == "alert"
+    assert building.alert_count == 1
+    room.sensor.state = "normal"
+    assert not room.sensor.is_alert() and building.alert_count == 0
+    
+    for model in (room, building.get_room(1, 0), building.get_floor(1), room.sensor):
+        assert not hasattr(model, "__dict__")
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_building_topology_is_cached_and_shared(use_numpy, monkeypatch):
+    """Prueba para verificar que la topología en CSR coincide con las adyacencias y se comparte entre edificios."""
+    if not use_numpy:
+        monkeypatch.setattr(topology, "np", None)
+    for floors, rooms_per_floor in [(3, 4), (1, 0), (4, 0), (1, 3)]:
+        shape = BuildingTopology(floors, rooms_per_floor)
+        for index in range(shape.size):
+            assert shape.neighbours(index).tolist() == neighbour_indices(index, shape.stride, shape.size)
+    
+    first, second = Building(3, 4), Building(3, 4)
+    assert first.topology is second.topology is building_topology(3, 4)
+    # Cada edificio tiene sus propias habitaciones aunque compartan la topología
+    room = second.get_room(1, 2)
+    assert [r.get_location() for r in room.get_adjacent_rooms()] == [(1, 1), (1, 3)]
+    assert all(r in second.rooms for r in room.get_adjacent_rooms())
+    
+    # Una conexión nueva pasa por un plano propio y no cambia la topología compartida
+    room.add_adjacent_room(second.get_room(0, 1))
+    assert [r.get_location() for r in room.get_adjacent_rooms()] == [(1, 1), (1, 3), (0, 1)]
+    assert room in second.get_room(0, 1).get_adjacent_rooms()
+    assert second.topology is not first.topology and second.layout is not None
+    assert first.get_room(1, 2).get_adjacent_rooms()[-1].get_location() == (1, 3)
+    with pytest.raises(ValueError):
+        room.add_adjacent_room(first.get_room(0, 1))
+    with pytest.raises(ValueError):
+        room.add_adjacent_room(room)
+
+
+def test_compact_rooms_can_be_connected():
+    """Prueba para verificar que las habitaciones compactas se conectan a través del plano del edificio."""
+    building = CompactBuilding(3, 4)
+    staircase = building.get_room(2, 0)
+    staircase.add_adjacent_room(building.get_room(0, 0))
+    assert building.neighbour_indices(staircase.index).tolist() == [11, 5, 0]
+    assert [floor.floor_number for floor in staircase.get_connected_floors()] == [1, 0]
+    assert building.get_room(1, 2).get_adjacent_rooms() == [building.get_room(1, 1), building.get_room(1, 3)]
+    with pytest.raises(ValueError):
+        staircase.add_adjacent_room(CompactBuilding(3, 4).get_room(0, 1))
+
+
+def test_compact_building_matches_building_topology():
+    """Prueba para verificar que el edificio compacto tiene la misma topología que Building."""
+    building = Building(3, 4)
+    compact = CompactBuilding(3, 4)
+    
+    assert len(compact.floors) == len(building.floors)
+    for floor, compact_floor in zip(building.floors, compact.floors):
+        assert len(compact_floor.get_rooms()) == len(floor.get_rooms())
+        for room, compact_room in zip(floor.get_rooms(), compact_floor.get_rooms()):
+            assert compact_room.get_location() == room.get_location()
+            assert hasattr(compact_room, 'connected_floors') == hasattr(room, 'connected_floors')
+            assert ([r.get_location() for r in compact_room.get_adjacent_rooms()]
+                    == [r.get_location() for r in room.get_adjacent_rooms()])
+
+def test_compact_building_room_state():
+    """Prueba para verificar que las vistas del edificio compacto leen y escriben el estado en los arreglos."""
+    building = CompactBuilding(2, 3)
+    room = building.get_room(1, 2)
+    staircase = building.get_room(1, 0)
+    
+    assert staircase.sensor is None
+    assert room.sensor.id == "P1H2"
+    assert not room.sensor.is_alert()
+    
+    room.add_zombies()
+    assert building.get_room(1, 2).has_zombies
+    assert building.zombies[room.index] == 1
+    assert room.sensor.is_alert()
+    
+    room.remove_zombies()
+    assert not room.has_zombies
+    assert room.sensor.is_alert()
+    room.reset_sensor()
+    assert not room.sensor.is_alert()
+    
+    # Las escaleras nunca activan un sensor
+    staircase.add_zombies()
+    assert staircase.has_zombies
+    assert building.alerts[staircase.index] == 0
+    
+    assert building.get_room(1, 2) == room
+    assert building.locate_room(room) == (1, 2)
+    assert building.get_room(2, 0) is None
+    assert building.get_floor(1).get_rooms_with_zombies() == [staircase]
+
+
+def test_room_index_set():
+    """Prueba para verificar las operaciones del conjunto de índices de habitaciones."""
+    rooms = RoomIndexSet(6)
+    assert len(rooms) == 0
+    assert rooms.sample(random) is None
+    
+    for index in (4, 1, 5, 1):
+        rooms.add(index)
+    assert len(rooms) == 3
+    assert rooms.sorted() == [1, 4, 5]
+    
+    rooms.discard(1)
+    rooms.discard(3)
+    assert 1 not in rooms
+    assert 4 in rooms and 5 in rooms
+    assert rooms.sorted() == [4, 5]
+    for _ in range(10):
+        assert rooms.sample(random) in (4, 5)
+    
+    full = RoomIndexSet(4, full=True)
+    assert full.sorted() == [0, 1, 2, 3]
@@ -0,0 +1,80 @@
+import pytest
+from src.models.building import Building
+from src.models.practicante import Practicante
+from src.occupancy import Occupancy
+from src.simulation import Simulation
+from src.state import simulation_state
+
+def test_occupancy_index_moves_and_captures():
+    """Prueba para verificar que el índice agrupa a los practicantes por habitación."""
+    building = Building(2, 4)
+    occupancy = Occupancy(building)
+    first, second, third = Practicante(0, 1), Practicante(0, 1), Practicante(1, 3)
+    for practicante in (first, second, third):
+        occupancy.add(practicante)
+    assert len(occupancy) == 3 and occupancy.first is first
+    assert occupancy.count(building.location_to_index(0, 1)) == 2
+
+    occupancy.move(second, building.location_to_index(1, 3))
+    assert second.get_location() == (1, 3)
+    assert occupancy.summary() == {"count": 3, "captured": 0, "rooms": [[0, 1, 1], [1, 3, 2]]}
+
+    # Un zombi que entra en la habitación captura a todos sus ocupantes
+    assert occupancy.capture(building.location_to_index(1, 3)) == 2
+    assert occupancy.capture(building.location_to_index(1, 3)) == 0
+    assert list(occupancy) == [first] and occupancy.captured == 2
+
+def test_many_practicantes_share_one_danger_update():
+    """Prueba para verificar que todos los practicantes se mueven con un solo campo de peligro por turno."""
+    simulation = Simulation(seed=3)
+    simulation.setup_building(4, 10, backend="compact")
+    simulation.add_initial_zombies(3)
+    result = simulation.add_practicantes(500)
+    assert result["added"] == 500 and len(simulation.occupancy) == 500
+
+    updates = []
+    update = simulation.danger.update
+    simulation.danger.update = lambda *args, **kwargs: updates.append(args) or update(*args, **kwargs)
+    turn = simulation.advance_turn()
+    assert len(updates) == 1
+    assert 0 < turn["practicantes_moved"] <= 500
+    # Los zombis capturan a quien esté en las habitaciones en las que entran
+    infested = simulation.building.infested_indices
+    assert not any(index in infested for index in simulation.occupancy.occupied_indices())
+
+    state = simulation_state(simulation)
+    assert state["occupants"]["count"] == len(simulation.occupancy)
+    assert sum(room[2] for room in state["occupants"]["rooms"]) == len(simulation.occupancy)
+
+def test_game_over_only_when_all_practicantes_captured(tmp_path):
+    """Prueba para verificar que el juego termina cuando los zombis capturan al último practicante."""
+    simulation = Simulation(seed=4)
+    simulation.setup_building(1, 6)
+    simulation.building.get_room(0, 1).add_zombies()
+    simulation.practicante = Practicante(0, 3)
+    simulation.occupancy.add(Practicante(0, 6))
+
+    captured = 0
+    while simulation.occupancy and simulation.turn < 200:
+        result = simulation.advance_turn()
+        captured += result["practicantes_captured"]
+        if simulation.occupancy:
+            assert simulation.game_over_reason is None
+    assert captured == 2 and simulation.game_over_reason == "practicante_capturado"
+
+    # Las instantáneas guardan a todos los practicantes
+    other = Simulation(seed=5)
+    other.setup_building(3, 5)
+    other.add_practicantes(20)
+    path = tmp_path / "ocupacion.snap"
+    other.save_snapshot(path)
+    loaded = Simulation.load_snapshot(path)
+    assert [p.get_location() for p in loaded.occupancy] == [p.get_location() for p in other.occupancy]
+
+def test_practicante_setter_without_building():
+    """Prueba para verificar que quitar el practicante de una simulación sin edificio no falla."""
+    simulation = Simulation()
+    simulation.practicante = None
+    assert simulation.practicante is None
+    with pytest.raises(ValueError):
+        simulation.practicante = Practicante(0, 1)
@@ -0,0 +1,50 @@
+import marshal
+import pytest
+from src.simulation import Simulation
+
+def make_simulation():
+    """Crea una simulación compacta con practicante y generación de zombis."""
+    simulation = Simulation(seed=9)
+    simulation.setup_building(4, 8, "compact")
+    simulation.add_initial_zombies(3)
+    simulation.add_practicante()
+    simulation.toggle_zombie_generation()
+    return simulation
+
+def test_profiles_only_the_requested_turns():
+    """Prueba para verificar que solo se perfilan los turnos pedidos y sin cambiar el resultado."""
+    simulation = make_simulation()
+    reference = make_simulation()
+    status = simulation.start_profiling(turns=3)
+    assert status["turns_profiled"] == 0 and not status["done"]
+
+    assert simulation.advance_turns(6, include_series=True) == reference.advance_turns(6, include_series=True)
+    profiler = simulation.profiler
+    assert profiler.status()["turns_profiled"] == 3 and profiler.done
+
+    stats = profiler.stats(limit=5)
+    assert stats[0]["function"].startswith("_advance_turn") and stats[0]["calls"] == 3
+    assert [row["cumtime"] for row in stats] == sorted((row["cumtime"] for row in stats), reverse=True)
+    assert any(key[2] == "_advance_turn" for key in marshal.loads(profiler.pstats_bytes()))
+
+    # Cada pila colapsada empieza en el turno y termina con su peso en microsegundos
+    lines = profiler.collapsed().splitlines()
+    assert lines and all(line.startswith("_advance_turn") for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+
+    assert simulation.stop_profiling() is profiler and simulation.profiler is None
+
+def test_profiler_limits():
+    """Prueba para verificar la validación de los límites y el perfilado por duración."""
+    simulation = make_simulation()
+    with pytest.raises(ValueError):
+        simulation.start_profiling()
+    with pytest.raises(ValueError):
+        simulation.start_profiling(turns=2, seconds=1)
+    with pytest.raises(ValueError):
+        simulation.start_profiling(seconds=0)
+
+    simulation.start_profiling(seconds=60)
+    simulation.advance_turns(4)
+    status = simulation.profiler.status()
+    assert status["turns_profiled"] == 4 and not status["done"] and status["seconds_remaining"] > 0
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import pytest
+from src.simulation import Simulation
+from src.scheduler import AutoRunner
+
+def make_simulation(seed=2):
+    """Crea una simulación pequeña con un zombi."""
+    simulation = Simulation(seed=seed)
+    simulation.setup_building(3, 4)
+    simulation.add_initial_zombies(1)
+    return simulation
+
+def test_paced_run_stops_at_turn_limit():
+    """Prueba para verificar que el ritmo fijo ejecuta exactamente el número de turnos pedido."""
+    async def scenario():
+        simulation = make_simulation()
+        runner = AutoRunner(lambda: simulation, threading.Lock())
+        await runner.start(ticks_per_second=500, turns=5)
+        assert runner.running
+        await asyncio.wait_for(runner._task, 2)
+        assert simulation.turn == 5
+        assert runner.status()["stop_reason"] == "turn_limit"
+        assert not runner.running
+
+    asyncio.run(scenario())
+
+def test_fast_forward_runs_in_slices():
+    """Prueba para verificar que el avance rápido ejecuta muchos turnos cediendo el bucle."""
+    async def scenario():
+        simulation = make_simulation()
+        runner = AutoRunner(lambda: simulation, slice_seconds=0.001)
+        ticks = 0
+        await runner.start(fast_forward=True, turns=3000)
+        while runner.running:
+            ticks += 1
+            await asyncio.sleep(0)
+        assert simulation.turn == runner.turns_run == 3000
+        assert runner.stop_reason == "turn_limit"
+        # Otras tareas se han ejecutado mientras avanzaba
+        assert ticks > 1
+
+    asyncio.run(scenario())
+
+def test_run_stops_at_game_over():
+    """Prueba para verificar que la ejecución termina cuando termina el juego."""
+    async def scenario():
+        simulation = Simulation(seed=1)
+        simulation.setup_building(1, 1)
+        simulation.add_initial_zombies(2)
+        runner = AutoRunner(lambda: simulation)
+        await runner.start(fast_forward=True)
+        await asyncio.wait_for(runner._task, 2)
+        assert runner.stop_reason == "game_over" and runner.turns_run == 0
+
+    asyncio.run(scenario())
+
+def test_stop_cancels_and_follows_replaced_simulation():
+    """Prueba para verificar que detener cancela la tarea y que se usa la simulación actual."""
+    async def scenario():
+        holder = {"simulation": make_simulation()}
+        runner = AutoRunner(lambda: holder["simulation"])
+        await runner.start(ticks_per_second=1000)
+        await asyncio.sleep(0.02)
+
+        # Sustituir la simulación (como hace el reinicio del API)
+        first = holder["simulation"]
+        holder["simulation"] = make_simulation(seed=3)
+        await asyncio.sleep(0.02)
+        await runner.stop()
+
+        turns = holder["simulation"].turn
+        assert first.turn > 0 and turns > 0
+        assert runner.stop_reason == "stopped" and not runner.running
+        await asyncio.sleep(0.01)
+        assert holder["simulation"].turn == turns
+
+    asyncio.run(scenario())
+
+def test_invalid_configuration():
+    """Prueba para verificar que se rechazan ritmos y límites no válidos."""
+    async def scenario():
+        runner = AutoRunner(lambda: None)
+        with pytest.raises(ValueError):
+            await runner.start(ticks_per_second=0)
+        with pytest.raises(ValueError):
+            await runner.start(turns=0)
+        assert not runner.running
+
+    asyncio.run(scenario())
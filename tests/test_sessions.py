@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from src.sessions import SimulationRegistry, RegistryFullError
+from src.state import simulation_state
+
+class FakeClock:
+    """Reloj manual para controlar el paso del tiempo en las pruebas."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_sessions_are_independent():
+    """Prueba para verificar que cada sesión tiene su propia simulación."""
+    registry = SimulationRegistry(capacity=4)
+    first = registry.create(seed=1)
+    second = registry.create(seed=2)
+    assert first.id != second.id
+    assert registry.get(first.id) is first
+
+    first.simulation.setup_building(2, 3)
+    assert second.simulation.building is None
+    assert simulation_state(first.simulation)["total_rooms"] == 8
+
+    assert registry.remove(first.id)
+    assert registry.get(first.id) is None
+    assert not registry.remove(first.id)
+
+def test_idle_sessions_are_evicted():
+    """Prueba para verificar que las sesiones inactivas se eliminan, salvo si están en uso."""
+    clock = FakeClock()
+    registry = SimulationRegistry(capacity=4, idle_timeout=10, clock=clock)
+    idle = registry.create()
+    busy = registry.create()
+    active = registry.create()
+
+    clock.now = 8
+    assert registry.get(active.id) is active
+    clock.now = 15
+    with busy.lock:
+        assert registry.evict_idle() == [idle.id]
+    assert idle.id not in registry
+    assert busy.id in registry and active.id in registry
+
+    # Una sesión caducada no se puede recuperar
+    clock.now = 30
+    assert registry.get(active.id) is None
+
+def test_running_sessions_are_not_evicted():
+    """Prueba para verificar que una sesión en ejecución automática sin clientes no se elimina."""
+    async def scenario():
+        clock = FakeClock()
+        registry = SimulationRegistry(capacity=4, idle_timeout=10, clock=clock)
+        session = registry.create(seed=3)
+        session.simulation.setup_building(3, 4)
+        session.simulation.add_initial_zombies(1)
+        await session.runner.start(ticks_per_second=0.001)
+
+        clock.now = 60
+        assert registry.evict_idle() == []
+        assert session.runner.running and session.id in registry
+
+        await session.runner.stop()
+        assert registry.evict_idle() == [session.id]
+
+    asyncio.run(scenario())
+
+def test_capacity_limit():
+    """Prueba para verificar que no se crean más sesiones que la capacidad del registro."""
+    clock = FakeClock()
+    registry = SimulationRegistry(capacity=2, idle_timeout=10, clock=clock)
+    registry.create()
+    registry.create()
+    with pytest.raises(RegistryFullError):
+        registry.create()
+
+    # Al caducar las sesiones antiguas vuelve a haber sitio
+    clock.now = 11
+    registry.create()
+    assert len(registry) == 1
+    assert [s["turn"] for s in registry.list_sessions()] == [0]
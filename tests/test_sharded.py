@@ -0,0 +1,77 @@
+import pytest
+from src import sharded, turn_kernel
+from src.models.layout import BuildingLayout
+from src.sharded import shard_ranges
+from src.simulation import Simulation
+
+def test_shard_ranges_cover_all_floors():
+    """Prueba para verificar que los pisos se reparten en rangos contiguos y equilibrados."""
+    assert shard_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert shard_ranges(2, 8) == [(0, 1), (1, 2)]
+    assert shard_ranges(5, 1) == [(0, 5)]
+
+def run(engine, layout=None, workers=None, turns=30):
+    """Ejecuta una simulación compacta con generación de zombis y practicantes y devuelve su historia."""
+    simulation = Simulation(engine=engine, seed=8, workers=workers)
+    simulation.setup_building(12, 20, backend="compact", layout=layout)
+    simulation.add_initial_zombies(60)
+    simulation.add_practicantes(10)
+    simulation.toggle_zombie_generation()
+    history = [simulation.advance_turn() for _ in range(turns)]
+    building = simulation.building
+    state = (bytes(building.zombies), bytes(building.alerts), building.free_indices.members().tobytes(),
+             building.floor_infested_counts.tolist(), building.infested_count, building.alert_count)
+    simulation.close()
+    return history, state
+
+@pytest.mark.parametrize("use_layout", [False, True])
+def test_sharded_engine_matches_single_process(monkeypatch, use_layout):
+    """Prueba para verificar que el motor repartido da los mismos turnos que el núcleo en un solo proceso."""
+    monkeypatch.setattr(sharded, "SHARD_MIN_ZOMBIES", 1)
+    layout = None
+    if use_layout:
+        layout = BuildingLayout(12, 20)
+        for floor_number in range(12):
+            layout.add_corridor(floor_number)
+        layout.add_staircase(0)
+        layout.add_staircase(20, floors=range(3, 9))
+        layout.add_elevator(10, [0, 5, 11])
+    expected = run("auto", layout)
+    for workers in (1, 4, 5):
+        assert run("sharded", layout, workers) == expected
+
+def test_sharded_engine_without_numpy_matches_numpy(monkeypatch):
+    """Prueba para verificar que el motor repartido sin NumPy da los mismos turnos que el núcleo con NumPy."""
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(sharded, "SHARD_MIN_ZOMBIES", 1)
+    monkeypatch.setattr(turn_kernel, "NUMPY_MIN_ZOMBIES", 0)
+    expected = run("auto")
+    monkeypatch.setattr(turn_kernel, "np", None)
+    monkeypatch.setattr(sharded, "np", None)
+    assert run("sharded", workers=3) == expected
+
+def test_sharded_engine_lifecycle(monkeypatch):
+    """Prueba para verificar que los procesos se arrancan por edificio y se detienen al cerrar la simulación."""
+    monkeypatch.setattr(sharded, "SHARD_MIN_ZOMBIES", 1)
+    simulation = Simulation(engine="sharded", seed=2, workers=3)
+    simulation.setup_building(6, 5, backend="compact")
+    simulation.add_initial_zombies(4)
+    simulation.advance_turn()
+    kernel = simulation.sharded_kernel
+    assert kernel.workers == 3 and kernel.ranges == [(0, 2), (2, 4), (4, 6)]
+    # El edificio trabaja sobre la memoria compartida del motor en lugar de copiarla en cada turno
+    building = simulation.building
+    assert building.zombies.obj is kernel._blocks["zombies"].buf.obj
+    assert building.zombies.tolist().count(1) == building.infested_count
+
+    simulation.setup_building(2, 5, backend="compact")
+    assert isinstance(building.zombies, bytearray) and building.zombies.count(1) == building.infested_count
+    simulation.add_initial_zombies(2)
+    simulation.advance_turn()
+    assert simulation.sharded_kernel is not kernel and simulation.sharded_kernel.workers == 2
+    assert not any(process.is_alive() for process in kernel._processes)
+
+    processes = simulation.sharded_kernel._processes
+    simulation.close()
+    assert simulation.sharded_kernel is None
+    assert not any(process.is_alive() for process in processes)
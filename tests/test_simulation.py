@@ -44,8 +44,8 @@ def test_zombie_moves_to_one_room_at_a_time(simulation, monkeypatch):
     # Add a zombie to floor 1, room 1
     simulation.building.get_floor(1).get_room(1).add_zombie()
     
-    # Mock random.choice to always return the same room (stay)
-    monkeypatch.setattr(random, "choice", lambda x: (1, 1))
+    # Mock the movement stream's choice to always return the same room (stay)
+    monkeypatch.setattr(simulation.movement_rng, "choice", lambda x: (1, 1))
     
     # Advance the turn
     result = simulation.advance_turn()
@@ -62,8 +62,8 @@ def test_zombie_moves_to_one_room_at_a_time(simulation, monkeypatch):
     # Add a zombie to floor 1, room 1
     simulation.building.get_floor(1).get_room(1).add_zombie()
     
-    # Mock random.choice to move left
-    monkeypatch.setattr(random, "choice", lambda x: (1, 0))
+    # Mock the movement stream's choice to move left
+    monkeypatch.setattr(simulation.movement_rng, "choice", lambda x: (1, 0))
     
     # Advance the turn
     result = simulation.advance_turn()
@@ -81,8 +81,8 @@ def test_zombie_moves_to_one_room_at_a_time(simulation, monkeypatch):
     # Add a zombie to floor 1, room 1
     simulation.building.get_floor(1).get_room(1).add_zombie()
     
-    # Mock random.choice to move right
-    monkeypatch.setattr(random, "choice", lambda x: (1, 2))
+    # Mock the movement stream's choice to move right
+    monkeypatch.setattr(simulation.movement_rng, "choice", lambda x: (1, 2))
     
     # Advance the turn
     result = simulation.advance_turn()
@@ -100,8 +100,8 @@ def test_zombie_moves_to_one_room_at_a_time(simulation, monkeypatch):
     # Add a zombie to floor 0, room 0 (staircase)
     simulation.building.get_floor(0).get_room(0).add_zombie()
     
-    # Mock random.choice to move up a floor
-    monkeypatch.setattr(random, "choice", lambda x: (1, 0))
+    # Mock the movement stream's choice to move up a floor
+    monkeypatch.setattr(simulation.movement_rng, "choice", lambda x: (1, 0))
     
     # Advance the turn
     result = simulation.advance_turn()
@@ -119,8 +119,8 @@ def test_zombie_moves_to_one_room_at_a_time(simulation, monkeypatch):
     # Add a zombie to floor 1, room 0 (staircase)
     simulation.building.get_floor(1).get_room(0).add_zombie()
     
-    # Mock random.choice to move down a floor
-    monkeypatch.setattr(random, "choice", lambda x: (0, 0))
+    # Mock the movement stream's choice to move down a floor
+    monkeypatch.setattr(simulation.movement_rng, "choice", lambda x: (0, 0))
     
     # Advance the turn
     result = simulation.advance_turn()
@@ -208,8 +208,8 @@ def test_sensor_alerts_when_zombie_enters_room(simulation, monkeypatch):
     # Verify room 2 sensor is not in alert
     assert not simulation.building.get_floor(0).get_room(2).sensor.is_alert()
     
-    # Mock random.choice to move the zombie to room 2
-    monkeypatch.setattr(random, "choice", lambda x: (0, 2))
+    # Mock the movement stream's choice to move the zombie to room 2
+    monkeypatch.setattr(simulation.movement_rng, "choice", lambda x: (0, 2))
     
     # Advance the turn
     simulation.advance_turn()
@@ -250,8 +250,8 @@ def test_zombie_moves_through_staircase(simulation, monkeypatch):
     staircase_0.add_zombies()
     assert staircase_0.has_zombies
     
-    # Configurar random.choice para que siempre elija el piso 1, habitación 0 (escalera)
-    monkeypatch.setattr(random, "choice", lambda x: (1, 0))
+    # Configurar el flujo de movimiento para que siempre elija el piso 1, habitación 0 (escalera)
+    monkeypatch.setattr(simulation.movement_rng, "choice", lambda x: (1, 0))
     
     # Avanzar un turno
     result = simulation.advance_turn()
@@ -282,12 +282,12 @@ def test_two_zombies_one_room(simulation, monkeypatch):
     initial_infested_count = len(simulation.building.get_all_rooms_with_zombies())
     assert initial_infested_count == 1
     
-    # Configurar random.choice para que devuelva diferentes destinos para cada zombi
-    # Esto requiere modificar cómo simulation.advance_turn usa random.choice
+    # Configurar el flujo de movimiento para que devuelva diferentes destinos para cada zombi
+    # Esto requiere modificar cómo simulation.advance_turn usa el flujo de movimiento
     # para poder controlar el comportamiento de múltiples zombis
     
     # Avanzar un turno
-    monkeypatch.setattr(random, "choice", lambda x: (0, 2))  # Mover a habitación 2
+    monkeypatch.setattr(simulation.movement_rng, "choice", lambda x: (0, 2))  # Mover a habitación 2
     result = simulation.advance_turn()
     
     # Verificar que el zombi se movió y que la habitación original ya no tiene zombis
@@ -296,4 +296,164 @@ def test_two_zombies_one_room(simulation, monkeypatch):
     
     # Verificar que solo se movió un zombi (no implementamos conteo de zombis por habitación)
     final_infested_count = len(simulation.building.get_all_rooms_with_zombies())
-    assert final_infested_count == 1  # Todavía solo hay una habitación infestada 
\ No newline at end of file
+    assert final_infested_count == 1  # Todavía solo hay una habitación infestada 
+
+def test_compact_backend_simulation():
+    """Prueba para verificar que la simulación funciona con el backend compacto del edificio."""
+    sim = Simulation()
+    result = sim.setup_building(3, 4, backend="compact")
+    assert result['backend'] == "compact"
+    assert result['total_rooms'] == 15
+    
+    sim.add_initial_zombies(2)
+    sim.add_practicante()
+    for _ in range(5):
+        result = sim.advance_turn()
+        assert 'error' not in result
+    
+    state = sim.get_building_state()
+    assert state['total_rooms'] == 15
+    assert state['infested_rooms'] == sim.building.zombies.count(1)
+
+def test_unknown_backend_is_rejected():
+    """Prueba para verificar que no se acepta un backend de edificio desconocido."""
+    sim = Simulation()
+    with pytest.raises(ValueError):
+        sim.setup_building(2, 3, backend="desconocido")
+
+def test_kernel_matches_reference_implementation(monkeypatch):
+    """
+    Prueba para verificar que el núcleo vectorizado produce los mismos turnos que la
+    implementación de referencia cuando ambos toman las mismas decisiones.
+    """
+    for seed in range(5):
+        rng = random.Random(seed)
+        kernel_sim = Simulation()
+        kernel_sim.setup_building(4, 6, backend="compact")
+        reference_sim = Simulation(engine="reference")
+        reference_sim.setup_building(4, 6)
+        assert kernel_sim.uses_kernel()
+        assert not reference_sim.uses_kernel()
+        
+        for floor_idx, room_idx in rng.sample([(f, r) for f in range(4) for r in range(7)], 6):
+            kernel_sim.building.get_room(floor_idx, room_idx).add_zombies()
+            reference_sim.building.get_room(floor_idx, room_idx).add_zombies()
+        
+        for _ in range(10):
+            kernel_result = kernel_sim.advance_turn()
+            
+            # La referencia elige, en el mismo orden, los destinos que eligió el núcleo
+            decisions = iter(kernel_result['newly_infested'])
+            def choose(options):
+                target = next(decisions)
+                assert target in options
+                return target
+            monkeypatch.setattr(reference_sim.movement_rng, "choice", choose)
+            reference_result = reference_sim.advance_turn()
+            monkeypatch.undo()
+            
+            assert kernel_result['vacated_rooms'] == reference_result['vacated_rooms']
+            assert kernel_result['newly_infested'] == reference_result['newly_infested']
+            assert kernel_result['total_infested'] == reference_result['total_infested']
+            for room in reference_sim.building.get_all_rooms():
+                compact_room = kernel_sim.building.get_room(*room.get_location())
+                assert compact_room.has_zombies == room.has_zombies
+                if room.sensor:
+                    assert compact_room.sensor.is_alert() == room.sensor.is_alert()
+
+def _assert_counters_match_rooms(sim):
+    building = sim.building
+    rooms = [room for floor in building.floors for room in floor.get_rooms()]
+    assert building.total_rooms == len(rooms)
+    assert building.infested_count == sum(1 for room in rooms if room.has_zombies)
+    assert building.alert_count == sum(1 for room in rooms if room.sensor and room.sensor.is_alert())
+    for floor_idx, floor in enumerate(building.floors):
+        assert building.floor_infested_counts[floor_idx] == len(floor.get_rooms_with_zombies())
+    # La frontera activa contiene exactamente las habitaciones infestadas y libres
+    assert building.infested_indices.sorted() == [room.index for room in rooms if room.has_zombies]
+    assert building.free_indices.sorted() == [room.index for room in rooms if not room.has_zombies]
+
+@pytest.mark.parametrize("backend", ["objects", "compact"])
+def test_incremental_counters_match_full_scan(backend):
+    """Prueba para verificar que los contadores incrementales coinciden con un recorrido completo."""
+    sim = Simulation(seed=11)
+    sim.setup_building(4, 5, backend=backend)
+    sim.add_initial_zombies(6)
+    sim.toggle_zombie_generation()
+    _assert_counters_match_rooms(sim)
+    
+    for turn in range(12):
+        sim.advance_turn()
+        _assert_counters_match_rooms(sim)
+        if turn % 3 == 0:
+            sim.use_secret_weapon()
+            _assert_counters_match_rooms(sim)
+        for room in sim.building.get_all_rooms_with_zombies()[:1]:
+            sim.clean_room(*room.get_location())
+            sim.reset_sensor(*room.get_location())
+            _assert_counters_match_rooms(sim)
+    
+    state = sim.get_building_state()
+    assert state['infested_rooms'] == sim.building.infested_count
+    assert state['alerting_sensors'] == sim.building.alert_count
+
+
+def test_same_seed_reproduces_run():
+    """Prueba para verificar que dos simulaciones con la misma semilla evolucionan igual."""
+    def run(seed, backend):
+        sim = Simulation(seed=seed)
+        sim.setup_building(4, 6, backend=backend)
+        zombies = sim.add_initial_zombies(3)
+        practicante = sim.add_practicante()
+        sim.toggle_zombie_generation()
+        turns = [sim.advance_turn() for _ in range(15)]
+        return zombies, practicante, turns, sim.use_secret_weapon()
+    
+    for backend in ("objects", "compact"):
+        assert run(123, backend) == run(123, backend)
+        assert run(123, backend) != run(124, backend)
+
+def test_rng_streams_are_independent():
+    """Prueba para verificar que los flujos por subsistema no dependen del uso de los demás."""
+    first = Simulation(seed=5)
+    second = Simulation(seed=5)
+    # Consumir números del flujo del arma secreta no altera el flujo de generación
+    for _ in range(100):
+        second.weapon_rng.random()
+    assert first.spawn_rng.random() == second.spawn_rng.random()
+    assert first.rng.fork("movement").random() == Simulation(seed=5).movement_rng.random()
+
+def test_advance_turns_matches_single_turns():
+    """Prueba para verificar que avanzar varios turnos equivale a avanzarlos uno a uno."""
+    batch = Simulation(seed=31)
+    single = Simulation(seed=31)
+    for sim in (batch, single):
+        sim.setup_building(3, 4)
+        sim.add_initial_zombies(2)
+        sim.toggle_zombie_generation()
+    
+    summary = batch.advance_turns(6, include_series=True)
+    results = [single.advance_turn() for _ in range(6)]
+    assert summary['turns_executed'] == 6 and summary['turn'] == 6
+    assert summary['total_infested'] == results[-1]['total_infested']
+    assert summary['series']['infested'] == [r['total_infested'] for r in results]
+    assert summary['series']['moves'] == [len(r['vacated_rooms']) for r in results]
+    assert summary['new_zombies_generated'] == sum(r['new_zombie_generated'] for r in results)
+
+def test_advance_turns_until_game_over():
+    """Prueba para verificar que se avanza hasta el final del juego o hasta el límite de turnos."""
+    sim = Simulation(seed=8)
+    sim.setup_building(2, 2)
+    sim.add_initial_zombies(1)
+    sim.add_practicante()
+    sim.toggle_zombie_generation()
+    
+    summary = sim.advance_turns(until_game_over=True, max_turns=500)
+    assert summary['game_over']
+    assert summary['game_over_turn'] == summary['turn'] == sim.turn
+    # Una vez terminado el juego no se avanzan más turnos
+    assert sim.advance_turns(10)['turns_executed'] == 0
+    
+    capped = Simulation(seed=8)
+    capped.setup_building(3, 3)
+    assert capped.advance_turns(until_game_over=True, max_turns=7)['turns_executed'] == 7
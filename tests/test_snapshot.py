@@ -0,0 +1,50 @@
+import pytest
+from src import snapshot
+from src.simulation import Simulation
+from src.snapshot import SnapshotError
+
+def make_simulation(backend):
+    """Crea una simulación con practicante y generación de zombis tras unos turnos."""
+    simulation = Simulation(seed=17)
+    simulation.setup_building(5, 6, backend)
+    simulation.add_initial_zombies(3)
+    simulation.add_practicante()
+    simulation.toggle_zombie_generation()
+    simulation.advance_turns(4)
+    simulation.use_secret_weapon()
+    return simulation
+
+@pytest.mark.parametrize("backend", ["objects", "compact"])
+@pytest.mark.parametrize("compress,use_mmap", [(False, True), (True, True), (True, False)])
+def test_snapshot_round_trip_continues_identically(backend, compress, use_mmap, tmp_path):
+    """Prueba para verificar que la simulación restaurada tiene el mismo estado y continúa igual."""
+    original = make_simulation(backend)
+    path = tmp_path / "simulacion.zfs"
+    result = original.save_snapshot(path, compress=compress)
+    assert result["saved"] and result["bytes"] == path.stat().st_size
+
+    restored = Simulation.load_snapshot(path, use_mmap=use_mmap)
+    assert restored.get_building_state() == original.get_building_state()
+    assert restored.building.get_state_arrays() == original.building.get_state_arrays()
+    assert restored.zombie_generation_enabled and restored.building.alert_count == original.building.alert_count
+
+    # Los generadores aleatorios y el orden de las habitaciones libres se conservan
+    assert restored.advance_turns(5, include_series=True) == original.advance_turns(5, include_series=True)
+    assert restored.building.get_state_arrays() == original.building.get_state_arrays()
+
+def test_bit_packing_without_numpy(monkeypatch):
+    """Prueba para verificar que el empaquetado sin NumPy produce los mismos bytes."""
+    flags = bytes([1, 0, 0, 1, 1, 0, 1, 0, 1, 1, 0])
+    packed = snapshot.pack_bits(flags)
+    monkeypatch.setattr(snapshot, "np", None)
+    assert snapshot.pack_bits(flags) == packed
+    assert snapshot.unpack_bits(packed, len(flags)) == flags
+    assert snapshot.unpack_indices(snapshot.pack_indices([5, 0, 3], False), False).tolist() == [5, 0, 3]
+
+def test_invalid_snapshot(tmp_path):
+    """Prueba para verificar los errores al guardar sin edificio y al cargar un archivo no válido."""
+    assert "error" in Simulation().save_snapshot(tmp_path / "vacio.zfs")
+    path = tmp_path / "otro.bin"
+    path.write_bytes(b"no es una instantanea")
+    with pytest.raises(SnapshotError):
+        Simulation.load_snapshot(path)
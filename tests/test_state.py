@@ -0,0 +1,78 @@
+import pytest
+from src.simulation import Simulation
+from src.state import simulation_state, simulation_changes, state_etag, etag_matches, state_token
+
+@pytest.mark.parametrize("backend", ["objects", "compact"])
+def test_changes_since_version_match_full_states(backend):
+    """Prueba para verificar que since=<versión> devuelve exactamente las habitaciones modificadas."""
+    simulation = Simulation(seed=21)
+    simulation.setup_building(4, 5, backend)
+    simulation.add_initial_zombies(3)
+    simulation.add_practicante()
+    simulation.toggle_zombie_generation()
+
+    before = simulation_state(simulation)
+    since = state_token(simulation)
+    for _ in range(3):
+        simulation.advance_turn()
+    simulation.use_secret_weapon()
+    after = simulation_state(simulation)
+    assert after["version"] > before["version"]
+
+    changes = simulation_changes(simulation, since)
+    assert not changes["full"]
+    assert changes["version"] == after["version"]
+    assert changes["infested_rooms"] == after["infested_rooms"]
+
+    # Las habitaciones devueltas incluyen todas las que difieren entre ambos estados
+    changed = {(room["floor"], room["room"]): room for room in changes["rooms"]}
+    for floor_before, floor_after in zip(before["building"], after["building"]):
+        for room_before, room_after in zip(floor_before, floor_after):
+            location = (room_after["floor"], room_after["room"])
+            if room_before != room_after:
+                assert changed[location] == room_after
+            elif location in changed:
+                assert changed[location] == room_after
+
+    # Sin cambios desde la versión actual no se devuelve ninguna habitación
+    assert simulation_changes(simulation, state_token(simulation))["rooms"] == []
+    assert simulation_changes(simulation, state_etag(simulation))["rooms"] == []
+
+def test_unknown_version_returns_full_state():
+    """Prueba para verificar que una versión de otro edificio devuelve el estado completo."""
+    simulation = Simulation(seed=4)
+    simulation.setup_building(2, 2)
+    old_token = state_token(simulation)
+    simulation.setup_building(3, 2)
+
+    changes = simulation_changes(simulation, old_token)
+    assert changes["full"] and len(changes["building"]) == 3
+    assert simulation_changes(simulation, f"{simulation.state_id}-{simulation.version + 10}")["full"]
+    assert simulation_changes(simulation, str(simulation.version))["full"]
+
+    # Una versión de otra simulación (por ejemplo, antes de reiniciarla) no se
+    # confunde con la de la actual aunque esté en su rango de versiones
+    other = Simulation(seed=4)
+    other.setup_building(3, 2)
+    for _ in range(3):
+        other.advance_turn()
+    changes = simulation_changes(simulation, f"{other.state_id}-1")
+    assert changes["full"] and changes["state_id"] == simulation.state_id
+
+def test_state_etag():
+    """Prueba para verificar que la etiqueta cambia con el estado y distingue simulaciones."""
+    simulation = Simulation(seed=8)
+    simulation.setup_building(2, 2)
+    etag = state_etag(simulation)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'W/{etag}, "otra"', etag)
+    assert not etag_matches(None, etag)
+
+    simulation.advance_turn()
+    assert state_etag(simulation) != etag
+    assert not etag_matches(etag, state_etag(simulation))
+
+    # Otra simulación con la misma versión tiene otra etiqueta
+    other = Simulation(seed=8)
+    other.setup_building(2, 2)
+    assert state_etag(other) != etag
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from src.simulation import Simulation
+from src.state import simulation_state
+from src.stream import StateBroadcaster
+
+def parse_event(message):
+    """Convierte un Server-Sent Event en (nombre, datos)."""
+    lines = message.strip().split("\n")
+    return lines[0][len("event: "):], json.loads(lines[1][len("data: "):])
+
+def test_simulation_notifies_listeners():
+    """Prueba para verificar que la simulación avisa de sus cambios a los listeners."""
+    simulation = Simulation(seed=3)
+    events = []
+    simulation.add_listener(lambda event, data: events.append((event, data)))
+    simulation.setup_building(2, 3)
+    zombies = simulation.add_initial_zombies(2)
+    result = simulation.advance_turn()
+    simulation.clean_room(*result["newly_infested"][0])
+
+    assert [event for event, _ in events] == ["setup", "rooms", "turn", "rooms"]
+    assert events[1][1]["rooms"] == zombies
+    assert events[2][1] is result
+
+def test_stream_sends_snapshot_then_diffs():
+    """Prueba para verificar que el flujo envía una instantánea y después solo los cambios."""
+    async def scenario():
+        simulation = Simulation(seed=11)
+        simulation.setup_building(3, 4)
+        simulation.add_initial_zombies(3)
+        broadcaster = StateBroadcaster(simulation)
+        stream = broadcaster.stream()
+
+        name, snapshot = parse_event(await stream.__anext__())
+        assert name == "snapshot"
+        assert snapshot == json.loads(json.dumps(simulation_state(simulation)))
+
+        result = simulation.advance_turn()
+        name, diff = parse_event(await stream.__anext__())
+        assert name == "diff" and diff["event"] == "turn"
+        assert diff["turn"] == 1
+        assert diff["infested_rooms"] == result["total_infested"]
+
+        # Aplicar los cambios a la instantánea reproduce el estado completo
+        for room in diff["rooms"]:
+            snapshot["building"][room["floor"]][room["room"]] = room
+        expected = json.loads(json.dumps(simulation_state(simulation)))
+        assert snapshot["building"] == expected["building"]
+
+        # Al cerrar el difusor el flujo termina
+        broadcaster.close()
+        assert [message async for message in stream] == []
+        assert broadcaster.subscriber_count == 0
+
+    asyncio.run(scenario())
+
+def test_stream_resyncs_on_new_building():
+    """Prueba para verificar que un edificio nuevo provoca una nueva instantánea."""
+    async def scenario():
+        simulation = Simulation(seed=5)
+        broadcaster = StateBroadcaster(simulation)
+        stream = broadcaster.stream()
+
+        assert parse_event(await stream.__anext__()) == ("snapshot", None)
+        simulation.setup_building(2, 2)
+        name, snapshot = parse_event(await stream.__anext__())
+        assert name == "snapshot" and snapshot["total_rooms"] == 6
+        await stream.aclose()
+        assert broadcaster.subscriber_count == 0
+
+    asyncio.run(scenario())
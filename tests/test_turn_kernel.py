@@ -0,0 +1,66 @@
+import random
+import pytest
+from src import turn_kernel
+from src.models.compact_building import CompactBuilding
+
+def _infested_building(floors, rooms, count, seed):
+    building = CompactBuilding(floors, rooms)
+    for index in random.Random(seed).sample(range(building.size), count):
+        building.get_room_by_index(index).add_zombies()
+    return building
+
+def test_kernel_moves_each_zombie_to_a_free_neighbour():
+    """Prueba para verificar que cada zombi se mueve a una habitación adyacente que estaba libre."""
+    building = _infested_building(5, 8, 12, seed=1)
+    before = bytes(building.zombies)
+    
+    sources, targets = turn_kernel.advance_zombies(building, seed=42, turn=1, use_numpy=False)
+    
+    assert sources == sorted(sources)
+    for source, target in zip(sources, targets):
+        assert before[source] == 1
+        assert before[target] == 0
+        assert target in building.neighbour_indices(source)
+        assert building.zombies[target] == 1
+        if not building.staircases[target]:
+            assert building.alerts[target] == 1
+    
+    # Los zombis que no se movieron siguen donde estaban
+    moved = set(sources)
+    for index, value in enumerate(before):
+        if value and index not in moved:
+            assert building.zombies[index] == 1
+
+def test_kernel_is_deterministic_for_a_seed():
+    """Prueba para verificar que la misma semilla produce los mismos movimientos."""
+    first = _infested_building(6, 10, 20, seed=3)
+    second = _infested_building(6, 10, 20, seed=3)
+    for turn in range(1, 6):
+        assert (turn_kernel.advance_zombies(first, 7, turn, use_numpy=False)
+                == turn_kernel.advance_zombies(second, 7, turn, use_numpy=False))
+    assert first.zombies == second.zombies
+
+def test_kernel_numpy_matches_python():
+    """Prueba para verificar que la versión NumPy del núcleo coincide con la de Python puro."""
+    pytest.importorskip("numpy")
+    python_building = _infested_building(40, 30, 60, seed=5)
+    numpy_building = _infested_building(40, 30, 60, seed=5)
+    for turn in range(1, 11):
+        assert (turn_kernel.advance_zombies(python_building, 99, turn, use_numpy=False)
+                == turn_kernel.advance_zombies(numpy_building, 99, turn, use_numpy=True))
+        assert python_building.zombies == numpy_building.zombies
+        assert python_building.alerts == numpy_building.alerts
+        # El orden de las habitaciones libres decide dónde aparecen los zombis generados
+        assert python_building.free_indices.members() == numpy_building.free_indices.members()
+
+def test_kernel_collisions_infest_target_once():
+    """Prueba para verificar que dos zombis que eligen la misma habitación la dejan infestada."""
+    building = CompactBuilding(1, 3)
+    building.get_room(0, 1).add_zombies()
+    building.get_room(0, 3).add_zombies()
+    
+    # Ambos zombis solo pueden moverse a la habitación 2 o a la escalera
+    sources, targets = turn_kernel.advance_zombies(building, 0, 1, use_numpy=False)
+    assert sources == [1, 3]
+    assert targets[1] == 2
+    assert building.zombies.count(1) == len(set(targets))